@@ -1,5 +1,6 @@
 from django.contrib import admin
 from . import models
+from .athletes import normalize_athlete_name
 
 
 @admin.register(models.ParsingSession)
@@ -11,7 +12,7 @@ class ParsingSessionAdmin(admin.ModelAdmin):
     )
     search_fields = ('created', 'file_name')
     list_filter = ('created', 'pool_length', 'swim_length')
-    readonly_fields = ['created']
+    readonly_fields = ['created', 'updated', 'version']
     fieldsets = (
         (None, {
             'fields': (
@@ -21,9 +22,31 @@ class ParsingSessionAdmin(admin.ModelAdmin):
         ('Время создания', {
             'fields': ('created',)
         }),
+        ('Версия', {
+            'fields': ('version', 'updated')
+        }),
     )
 
 
+@admin.register(models.Athlete)
+class AthleteAdmin(admin.ModelAdmin):
+    """
+    Описание модели Спортсмены
+    """
+    list_display = ('id', 'name', 'year_of_birth')
+    search_fields = ('name_key',)
+    readonly_fields = ['name_key']
+
+    def get_search_results(self, request, queryset, search_term):
+        return super().get_search_results(
+            request, queryset, normalize_athlete_name(search_term)
+        )
+
+    def save_model(self, request, obj, form, change):
+        obj.name_key = normalize_athlete_name(obj.name)
+        super().save_model(request, obj, form, change)
+
+
 @admin.register(models.ProtocolData)
 class ProtocolDataAdmin(admin.ModelAdmin):
     """
@@ -37,20 +60,16 @@ class ProtocolDataAdmin(admin.ModelAdmin):
     )
     search_fields = ('initials', 'year_of_birth', 'final_category')
     list_filter = ['final_position']
+    raw_id_fields = ['athlete']
 
     def formatted_reaction_time(self, obj):
-        return self.format_time(obj.reaction_time)
+        return obj.reaction_time_display
     formatted_reaction_time.short_description = 'Время реакции'
 
     def formatted_result(self, obj):
-        return self.format_time(obj.result)
+        return obj.result_display
     formatted_result.short_description = 'Результат'
 
-    def format_time(self, time_field):
-        if time_field:
-            return time_field.strftime('%M:%S.%f')[:-4]
-        return None
-
 
 @admin.register(models.SwimSplitTime)
 class SwimSplitTimeAdmin(admin.ModelAdmin):
@@ -63,14 +82,9 @@ class SwimSplitTimeAdmin(admin.ModelAdmin):
     search_fields = ('protocol_data', 'distance')
 
     def formatted_split_time(self, obj):
-        return self.format_time(obj.split_time)
+        return obj.split_time_display
     formatted_split_time.short_description = 'Время на промежуточной дистанции'
 
-    def format_time(self, time_field):
-        if time_field:
-            return time_field.strftime('%M:%S.%f')[:-4]
-        return None
-
 
 @admin.register(models.ParsingSettings)
 class ParsingSettingsAdmin(admin.ModelAdmin):
@@ -149,3 +163,10 @@ class HeatMapAdmin(admin.ModelAdmin):
     list_display = ('parsing_session', 'status')
     search_fields = ('parsing_session__file_name',)
     list_filter = ('status',)
+
+
+@admin.register(models.SessionMetrics)
+class SessionMetricsAdmin(admin.ModelAdmin):
+    list_display = ('parsing_session', 'pool_length', 'swim_length', 'updated')
+    search_fields = ('parsing_session__file_name',)
+    readonly_fields = ['updated']
@@ -0,0 +1,279 @@
+"""Parsing Split Analytics"""
+import math
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+from django.db.models import (
+    Case, Count, F, FloatField, Max, Min, OuterRef, Prefetch, Q, QuerySet, Subquery, Sum,
+    Value, When, Window
+)
+from django.db.models.functions import Cast, Coalesce, FirstValue, Lag, NullIf, Replace
+
+from swim_graph_utils.time_utils import CENTISECONDS
+
+from .models import ParsingSession, ProtocolData, SwimSplitTime
+from .splits import MISSING_SPLIT, unpack_splits
+
+
+# Показатели отрезков, которые усредняются по нескольким сессиям
+AGGREGATED_FIELDS = ('lap_seconds', 'lap_speed', 'leader_gap', 'cumulative_gap', 'speed_drop')
+
+# Поля строки отрезка, возвращаемые для одной сессии
+SPLIT_FIELDS = (
+    'protocol_data_id', 'protocol_data__final_position', 'protocol_data__initials',
+    'distance', 'lap_seconds', 'cumulative_seconds', 'lap_speed',
+    'leader_lap_seconds', 'leader_gap', 'cumulative_gap', 'speed_drop',
+)
+
+
+def annotate_split_metrics(splits: QuerySet) -> QuerySet:
+    """
+    Добавляет к отрезкам показатели, рассчитанные в базе данных оконными функциями:
+    время отрезка и накопленное время с начала заплыва, скорость на отрезке
+    по длине бассейна сессии, отставание от лидера (финишная позиция 1)
+    на отрезке и по накопленному времени, падение скорости относительно первого отрезка.
+
+    Хранимое время отрезка - накопленное время с начала заплыва, поэтому время
+    отрезка - разность с предыдущим отрезком участника (LAG), для первого отрезка -
+    само хранимое время. Время лидера на предыдущей дистанции выбирается
+    вложенным запросом. Отрезки без времени не учитываются.
+    Расчет выполняется по строкам SwimSplitTime, упакованные отрезки
+    (ProtocolData.packed_splits) считаются так же в get_packed_split_metrics.
+
+    :param splits: Отрезки (SwimSplitTime).
+    :return: Отрезки с показателями.
+    """
+    by_participant = {
+        'partition_by': [F('protocol_data_id')],
+        'order_by': F('distance').asc(),
+    }
+    by_distance = {
+        'partition_by': [F('protocol_data__parsing_session_id'), F('distance')],
+    }
+    is_leader = Q(protocol_data__final_position=1)
+    leader_split_time = Max(Case(When(is_leader, then=F('split_time'))))
+    pool_length = Cast(
+        Replace(F('protocol_data__parsing_session__pool_length'), Value('m'), Value('')),
+        FloatField()
+    )
+
+    # Время лидера на предыдущей дистанции: накопленное время растет с дистанцией,
+    # поэтому это максимум его отрезков на меньших дистанциях
+    previous_leader_split = Subquery(
+        SwimSplitTime.objects.filter(
+            protocol_data__parsing_session_id=OuterRef('protocol_data__parsing_session_id'),
+            protocol_data__final_position=1,
+            distance__lt=OuterRef('distance'),
+        )
+        .order_by()
+        .values('protocol_data__parsing_session_id')
+        .annotate(previous_split=Max('split_time'))
+        .values('previous_split')
+    )
+    first_lap_seconds = _to_seconds(Window(FirstValue('split_time'), **by_participant))
+    return splits.filter(split_time__isnull=False).annotate(
+        cumulative_seconds=_to_seconds('split_time'),
+        lap_seconds=_to_seconds(
+            F('split_time') - Window(Lag('split_time', default=0), **by_participant)
+        ),
+        lap_speed=pool_length / NullIf(F('lap_seconds'), 0.0),
+        leader_cumulative_seconds=_to_seconds(Window(leader_split_time, **by_distance)),
+        leader_lap_seconds=(
+            F('leader_cumulative_seconds') - _to_seconds(Coalesce(previous_leader_split, 0))
+        ),
+        leader_gap=F('lap_seconds') - F('leader_lap_seconds'),
+        cumulative_gap=F('cumulative_seconds') - F('leader_cumulative_seconds'),
+        speed_drop=(
+            F('lap_speed') * 100.0
+            / NullIf(pool_length / NullIf(first_lap_seconds, 0.0), 0.0)
+        ),
+    )
+
+
+def get_session_split_metrics(session: ParsingSession) -> List[Dict[str, Any]]:
+    """
+    Возвращает показатели всех отрезков сессии одним запросом.
+    Для сессии с упакованными отрезками показатели рассчитываются
+    по тем же правилам в get_packed_split_metrics.
+
+    :param session: Сессия парсинга.
+    :return: Строки отрезков в порядке финишной позиции и дистанции.
+    """
+    if session.split_distances:
+        return get_packed_split_metrics(
+            session, session.protocoldata_set.order_by('final_position', 'id')
+        )
+
+    splits = SwimSplitTime.objects.filter(protocol_data__parsing_session=session)
+    return list(
+        annotate_split_metrics(splits)
+        .values(*SPLIT_FIELDS)
+        .order_by('protocol_data__final_position', 'protocol_data_id', 'distance')
+    )
+
+
+def get_packed_split_metrics(
+        session: ParsingSession, participants: Iterable[ProtocolData]
+    ) -> List[Dict[str, Any]]:
+    """
+    Рассчитывает показатели упакованных отрезков сессии так же, как annotate_split_metrics:
+    время отрезка - разность соседних накопленных времен (np.diff), отсутствующий отрезок
+    не выводится и пропускается при расчете разности, показатели лидера
+    берутся по всем участникам с финишной позицией 1.
+
+    :param session: Сессия парсинга с упакованными отрезками.
+    :param participants: Участники сессии в порядке вывода.
+    :return: Строки отрезков с полями SPLIT_FIELDS.
+    """
+    participants = [
+        participant for participant in participants if participant.packed_splits is not None
+    ]
+    distances = session.split_distances
+    if not participants or not distances:
+        return []
+
+    cumulative = np.array(
+        [unpack_splits(participant.packed_splits) for participant in participants],
+        dtype=np.float64
+    )
+    present = cumulative != MISSING_SPLIT
+    cumulative = np.where(present, cumulative / CENTISECONDS, np.nan)
+    pool_length = float(session.pool_length.replace('m', ''))
+
+    laps = np.full(cumulative.shape, np.nan)
+    for row, row_present in enumerate(present):
+        # Разность берется между соседними имеющимися отрезками участника
+        laps[row, row_present] = np.diff(cumulative[row, row_present], prepend=0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speeds = np.where(laps != 0, pool_length / laps, np.nan)
+    first_speeds = np.full(len(participants), np.nan)
+    for row, (row_present, row_speeds) in enumerate(zip(present, speeds)):
+        if row_present.any():
+            first_speeds[row] = row_speeds[row_present.argmax()]
+
+    is_leader = np.array([participant.final_position == 1 for participant in participants])
+    leader_cumulative = np.full(len(distances), np.nan)
+    leader_lap_seconds = np.full(len(distances), np.nan)
+    if is_leader.any():
+        leader_splits = cumulative[is_leader]
+        has_split = present[is_leader].any(axis=0)
+        leader_cumulative[has_split] = np.nanmax(leader_splits[:, has_split], axis=0)
+        # Время лидера на предыдущей дистанции - максимум его отрезков на меньших дистанциях
+        previous = np.fmax.accumulate(np.nan_to_num(leader_cumulative, nan=0.0))
+        previous = np.concatenate(([0.0], previous[:-1]))
+        leader_lap_seconds = leader_cumulative - previous
+
+    rows = []
+    for row, participant in enumerate(participants):
+        for column, distance in enumerate(distances):
+            if not present[row, column]:
+                continue
+            speed = speeds[row, column]
+            rows.append({
+                'protocol_data_id': participant.id,
+                'protocol_data__final_position': participant.final_position,
+                'protocol_data__initials': participant.initials,
+                'distance': distance,
+                'lap_seconds': laps[row, column],
+                'cumulative_seconds': cumulative[row, column],
+                'lap_speed': speed,
+                'leader_lap_seconds': leader_lap_seconds[column],
+                'leader_gap': laps[row, column] - leader_lap_seconds[column],
+                'cumulative_gap': cumulative[row, column] - leader_cumulative[column],
+                'speed_drop': speed * 100.0 / first_speeds[row],
+            })
+    return [
+        {key: _to_value(value) for key, value in split_row.items()} for split_row in rows
+    ]
+
+
+def get_split_aggregates(sessions: QuerySet) -> List[Dict[str, Any]]:
+    """
+    Возвращает средние показатели отрезков нескольких сессий по дистанциям.
+
+    Оконные функции нельзя группировать напрямую, поэтому показатели отрезков
+    считаются во вложенном запросе, а суммы и количества по каждой дистанции -
+    условными агрегатами (FILTER) над ним одним запросом. Дистанции определяются
+    предварительным запросом. Показатели сессий с упакованными отрезками
+    рассчитываются get_packed_split_metrics и добавляются к суммам.
+
+    :param sessions: Сессии парсинга (обычно с одинаковой длиной бассейна и заплыва).
+    :return: Строки с дистанцией, количеством отрезков и средними значениями.
+    """
+    totals: Dict[int, Dict[str, Any]] = {}
+
+    splits = SwimSplitTime.objects.filter(protocol_data__parsing_session__in=sessions)
+    distances = list(
+        splits.order_by('distance').values_list('distance', flat=True).distinct()
+    )
+    if distances:
+        aggregates = {}
+        for distance in distances:
+            at_distance = Q(distance=distance)
+            aggregates[f'count_{distance}'] = Count('lap_seconds', filter=at_distance)
+            aggregates[f'best_lap_seconds_{distance}'] = Min('lap_seconds', filter=at_distance)
+            for field in AGGREGATED_FIELDS:
+                aggregates[f'{field}_sum_{distance}'] = Sum(field, filter=at_distance)
+                aggregates[f'{field}_count_{distance}'] = Count(field, filter=at_distance)
+        values = annotate_split_metrics(splits).aggregate(**aggregates)
+        for distance in distances:
+            total = _get_total(totals, distance)
+            total['count'] += values[f'count_{distance}']
+            total['best_lap_seconds'] = values[f'best_lap_seconds_{distance}']
+            for field in AGGREGATED_FIELDS:
+                total[f'{field}_sum'] += values[f'{field}_sum_{distance}'] or 0.0
+                total[f'{field}_count'] += values[f'{field}_count_{distance}']
+
+    participants = ProtocolData.objects.order_by('final_position', 'id')
+    packed_sessions = sessions.exclude(split_distances=[]).prefetch_related(
+        Prefetch('protocoldata_set', queryset=participants)
+    )
+    for session in packed_sessions:
+        for split_row in get_packed_split_metrics(session, session.protocoldata_set.all()):
+            total = _get_total(totals, split_row['distance'])
+            total['count'] += 1
+            best_lap_seconds = total['best_lap_seconds']
+            if best_lap_seconds is None or split_row['lap_seconds'] < best_lap_seconds:
+                total['best_lap_seconds'] = split_row['lap_seconds']
+            for field in AGGREGATED_FIELDS:
+                if split_row[field] is not None:
+                    total[f'{field}_sum'] += split_row[field]
+                    total[f'{field}_count'] += 1
+
+    return [
+        {
+            'distance': distance,
+            'count': total['count'],
+            'best_lap_seconds': total['best_lap_seconds'],
+            **{
+                field: (total[f'{field}_sum'] / total[f'{field}_count']
+                        if total[f'{field}_count'] else None)
+                for field in AGGREGATED_FIELDS
+            },
+        }
+        for distance, total in sorted(totals.items())
+    ]
+
+
+def _get_total(totals: Dict[int, Dict[str, Any]], distance: int) -> Dict[str, Any]:
+    """Возвращает накопитель сумм и количеств показателей дистанции."""
+    if distance not in totals:
+        totals[distance] = {'count': 0, 'best_lap_seconds': None}
+        for field in AGGREGATED_FIELDS:
+            totals[distance][f'{field}_sum'] = 0.0
+            totals[distance][f'{field}_count'] = 0
+    return totals[distance]
+
+
+def _to_seconds(expression: Any) -> Any:
+    """Переводит время в сотых долях секунды в секунды (выражение базы данных)."""
+    return Cast(expression, FloatField()) / float(CENTISECONDS)
+
+
+def _to_value(value: Any) -> Any:
+    """Преобразует значение NumPy в значение Python, NaN - в None."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
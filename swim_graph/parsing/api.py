@@ -0,0 +1,399 @@
+"""Parsing REST API"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from . import views
+from .analytics import get_session_split_metrics, get_split_aggregates
+from .metrics import (
+    DISTANCE_SERIES, DISTANCE_VALUE_SERIES, MATRIX_SERIES, PARTICIPANT_SERIES,
+    ReportMetrics, update_session_metrics
+)
+from .models import ParsingSession, ProtocolData, SessionMetrics
+from .pagination import KEYSET_ORDERING
+from .serializers import ParsingSessionSerializer, ProtocolDataSerializer
+
+
+logger = logging.getLogger(__name__)
+
+# Параметр запроса со списком выводимых полей
+FIELDS_PARAM = 'fields'
+
+# Поля ответа с рассчитанными показателями сессии
+METRICS_FIELDS = (
+    ('session', 'participant_ids')
+    + DISTANCE_SERIES + DISTANCE_VALUE_SERIES + PARTICIPANT_SERIES + MATRIX_SERIES
+)
+
+# Наибольшее количество сессий в одном пакетном запросе
+BATCH_MAX_SESSIONS = 200
+
+# Количество сессий, загружаемых одним набором запросов при пакетной выгрузке
+BATCH_CHUNK_SIZE = 20
+
+# Бюджет запросов на один набор сессий пакетной выгрузки:
+# сессии, участники, отрезки и сохраненные показатели
+BATCH_CHUNK_QUERY_BUDGET = 4
+
+# Запросы сохранения пересчитанных показателей одной сессии (update_or_create)
+BATCH_RECALCULATION_QUERIES = 4
+
+
+class SessionCursorPagination(CursorPagination):
+    """Пагинация сессий по курсору в порядке списка сессий."""
+
+    ordering = KEYSET_ORDERING
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ParticipantCursorPagination(CursorPagination):
+    """Пагинация участников по курсору в порядке добавления."""
+
+    ordering = ('id',)
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class QueryCounter:
+    """Обертка выполнения запросов, считающая запросы к базе данных."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ApiViewMixin:
+    """
+    Общее поведение представлений API.
+
+    - Запросы к базе данных считаются и сравниваются с бюджетом действия
+      (query_budgets); превышение пишется в журнал, при DEBUG количество
+      отдается в заголовке X-Query-Count.
+    - Ответы по одной сессии помечаются версией сессии (check_not_modified)
+      и при совпадении получают 304 до загрузки данных. Списки помечаются
+      только сильным ETag по содержимому: дата изменения выведенных объектов
+      не меняется при удалении объекта из списка; совпадающий запрос получает 304 без тела.
+    - Параметр fields ограничивает набор выводимых полей.
+    """
+
+    query_budgets: Dict[str, int] = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        self.validating_session: Optional[ParsingSession] = None
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.query_budgets.get(self.action)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                'API %s.%s: %s запросов к базе данных при бюджете %s',
+                type(self).__name__, self.action, counter.count, budget
+            )
+        if settings.DEBUG:
+            response.headers['X-Query-Count'] = str(counter.count)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (request.method not in ('GET', 'HEAD') or response.status_code != 200
+                or not isinstance(response, Response)):
+            return response
+        if self.validating_session is not None:
+            return views.patch_session_validators(response, self.validating_session)
+
+        response.render()
+        etag = quote_etag(hashlib.md5(response.content).hexdigest())
+        response = get_conditional_response(request, etag=etag, response=response)
+        response.headers['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def check_not_modified(self, session: ParsingSession) -> Optional[HttpResponse]:
+        """
+        Помечает ответ версией сессии и проверяет условные заголовки запроса.
+
+        :param session: Сессия, от данных которой зависит ответ.
+        :return: Ответ 304, если сессия не менялась, иначе None.
+        """
+        self.validating_session = session
+        return views.get_not_modified_response(self.request, session)
+
+    def get_requested_fields(
+            self, allowed: Optional[Iterable[str]] = None
+        ) -> Optional[List[str]]:
+        """
+        Возвращает поля из параметра fields.
+
+        :param allowed: Допустимые поля (None - поля сериализатора действия).
+        :return: Список полей (None - все поля).
+        :raises ValidationError: Если указано неизвестное поле.
+        """
+        value = self.request.query_params.get(FIELDS_PARAM)
+        if not value:
+            return None
+        if allowed is None:
+            allowed = self.get_serializer_class().Meta.fields
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        unknown = set(fields) - set(allowed)
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: f'Неизвестные поля: {", ".join(sorted(unknown))}'})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class SessionViewSet(ApiViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Сессии парсинга, их участники и рассчитанные показатели.
+    Список фильтруется параметрами pool_length и swim_length.
+    """
+
+    serializer_class = ParsingSessionSerializer
+    pagination_class = SessionCursorPagination
+    query_budgets = {
+        'list': 1, 'retrieve': 1, 'participants': 3, 'metrics': 3,
+        'splits': 2, 'split_aggregates': 4,
+    }
+
+    def get_queryset(self) -> QuerySet:
+        sessions = ParsingSession.objects.all()
+        for param in ('pool_length', 'swim_length'):
+            value = self.request.query_params.get(param)
+            if value:
+                sessions = sessions.filter(**{param: value})
+        return sessions
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        session = self.get_object()
+        return self.check_not_modified(session) or Response(self.get_serializer(session).data)
+
+    def get_serializer_class(self):
+        if self.action == 'participants':
+            return ProtocolDataSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, pagination_class=ParticipantCursorPagination)
+    def participants(self, request, *args, **kwargs) -> Response:
+        """Участники сессии с отрезками."""
+        session = self.get_object()
+        not_modified = self.check_not_modified(session)
+        if not_modified is not None:
+            return not_modified
+        # Запрос через связь сессии сохраняет ссылку участников на сессию без запросов
+        protocol_data = session.protocoldata_set.all()
+        fields = self.get_requested_fields()
+        if not session.split_distances and (fields is None or 'splits' in fields):
+            protocol_data = protocol_data.prefetch_related('swimsplittime_set')
+
+        page = self.paginate_queryset(protocol_data)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=True)
+    def metrics(self, request, *args, **kwargs) -> Response:
+        """
+        Рассчитанные ряды показателей отчета по всем участникам сессии.
+        Устаревшие или отсутствующие показатели пересчитываются.
+        """
+        fields = self.get_requested_fields(METRICS_FIELDS)
+        session = self.get_object()
+        not_modified = self.check_not_modified(session)
+        if not_modified is not None:
+            return not_modified
+
+        stored = SessionMetrics.objects.filter(parsing_session=session).first()
+        if stored is None or not stored.is_actual(session):
+            stored = update_session_metrics(session)
+
+        data = {'session': session.id, **stored.data}
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return Response(data)
+
+    @action(detail=True)
+    def splits(self, request, *args, **kwargs) -> Response:
+        """
+        Показатели отрезков сессии, рассчитанные в базе данных: время и скорость
+        на отрезке, накопленное время, отставание от лидера и падение скорости.
+        """
+        session = self.get_object()
+        not_modified = self.check_not_modified(session)
+        if not_modified is not None:
+            return not_modified
+        return Response({'session': session.id, 'splits': get_session_split_metrics(session)})
+
+    @action(detail=False, url_path='splits')
+    def split_aggregates(self, request, *args, **kwargs) -> Response:
+        """
+        Средние показатели отрезков сессий списка по дистанциям.
+        Параметры pool_length и swim_length обязательны, чтобы не смешивать дистанции.
+        """
+        for param in ('pool_length', 'swim_length'):
+            if not request.query_params.get(param):
+                raise ValidationError({param: 'Обязательный параметр'})
+        return Response(get_split_aggregates(self.get_queryset()))
+
+    @action(detail=False)
+    def batch(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        """
+        Сессии с участниками, отрезками и рассчитанными показателями
+        по списку идентификаторов (?ids=1,2,3, не больше BATCH_MAX_SESSIONS).
+        Ответ передается потоком в формате NDJSON: строка на сессию
+        в порядке запроса, для отсутствующей сессии - строка с полем detail.
+        """
+        try:
+            session_ids = list(dict.fromkeys(
+                int(value) for value in request.query_params.get('ids', '').split(',') if value
+            ))
+        except ValueError as exc:
+            raise ValidationError({'ids': 'Ожидается список целых чисел через запятую'}) from exc
+        if not session_ids:
+            raise ValidationError({'ids': 'Не указаны сессии'})
+        if len(session_ids) > BATCH_MAX_SESSIONS:
+            raise ValidationError({'ids': f'Не больше {BATCH_MAX_SESSIONS} сессий за запрос'})
+
+        lines = (
+            json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for item in iter_session_batch(session_ids)
+        )
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+
+class ParticipantViewSet(ApiViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Участники заплывов с отрезками.
+    Список фильтруется параметрами session и athlete.
+    """
+
+    serializer_class = ProtocolDataSerializer
+    pagination_class = ParticipantCursorPagination
+    query_budgets = {'list': 2, 'retrieve': 2}
+
+    def get_queryset(self) -> QuerySet:
+        protocol_data = ProtocolData.objects.select_related('parsing_session')
+        fields = self.get_requested_fields()
+        if fields is None or 'splits' in fields:
+            protocol_data = protocol_data.prefetch_related('swimsplittime_set')
+
+        for param, lookup in (('session', 'parsing_session_id'), ('athlete', 'athlete_id')):
+            value = self.request.query_params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({param: 'Ожидается целое число'})
+                protocol_data = protocol_data.filter(**{lookup: int(value)})
+        return protocol_data
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        participant = self.get_object()
+        return (
+            self.check_not_modified(participant.parsing_session)
+            or Response(self.get_serializer(participant).data)
+        )
+
+
+def iter_session_batch(session_ids: List[int]) -> Iterator[Dict[str, Any]]:
+    """
+    Возвращает сессии с участниками, отрезками и показателями отчета.
+
+    Сессии загружаются наборами по BATCH_CHUNK_SIZE: на набор выполняется
+    по одному запросу сессий, участников, отрезков и сохраненных показателей,
+    поэтому в памяти находится не больше одного набора. Отсутствующие
+    или устаревшие показатели рассчитываются по уже загруженным участникам.
+
+    :param session_ids: Идентификаторы сессий.
+    :return: Данные сессий в порядке идентификаторов.
+    """
+    for start in range(0, len(session_ids), BATCH_CHUNK_SIZE):
+        chunk_ids = session_ids[start:start + BATCH_CHUNK_SIZE]
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            items, recalculated = _load_session_batch(chunk_ids)
+
+        budget = BATCH_CHUNK_QUERY_BUDGET + BATCH_RECALCULATION_QUERIES * recalculated
+        if counter.count > budget:
+            logger.warning(
+                'API batch: %s запросов к базе данных при бюджете %s', counter.count, budget
+            )
+        yield from items
+
+
+def _load_session_batch(session_ids: List[int]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Загружает набор сессий пакетной выгрузки.
+
+    :return: Данные сессий и количество пересчитанных показателей.
+    """
+    sessions = ParsingSession.objects.in_bulk(session_ids)
+    protocol_data = ProtocolData.objects.filter(
+        parsing_session_id__in=sessions
+    ).order_by('parsing_session_id', 'final_position')
+    if any(not session.split_distances for session in sessions.values()):
+        protocol_data = protocol_data.prefetch_related('swimsplittime_set')
+    protocol_data = list(protocol_data)
+
+    participants: Dict[int, List[ProtocolData]] = {session_id: [] for session_id in sessions}
+    for participant in protocol_data:
+        participant.parsing_session = sessions[participant.parsing_session_id]
+        participants[participant.parsing_session_id].append(participant)
+
+    # Сериализаторы создаются один раз на набор: построение полей дороже вывода строк
+    session_rows = {
+        row['id']: row
+        for row in ParsingSessionSerializer(list(sessions.values()), many=True).data
+    }
+    participant_rows: Dict[int, List[Dict[str, Any]]] = {session_id: [] for session_id in sessions}
+    for row in ProtocolDataSerializer(protocol_data, many=True).data:
+        participant_rows[row['parsing_session']].append(row)
+
+    stored_metrics = {
+        stored.parsing_session_id: stored
+        for stored in SessionMetrics.objects.filter(parsing_session_id__in=sessions)
+    }
+    recalculated = 0
+    items = []
+    for session_id in session_ids:
+        session = sessions.get(session_id)
+        if session is None:
+            items.append({'id': session_id, 'detail': 'Сессия не найдена'})
+            continue
+
+        stored = stored_metrics.get(session_id)
+        if stored is None or not stored.is_actual(session):
+            # Участники уже загружены в порядке update_session_metrics
+            stored, _ = SessionMetrics.objects.update_or_create(
+                parsing_session=session,
+                defaults={
+                    'pool_length': session.pool_length,
+                    'swim_length': session.swim_length,
+                    'data': ReportMetrics(session, participants[session_id]).to_store(),
+                }
+            )
+            recalculated += 1
+
+        items.append({
+            **session_rows[session_id],
+            'participants': participant_rows[session_id],
+            'metrics': stored.data,
+        })
+    return items, recalculated
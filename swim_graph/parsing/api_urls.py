@@ -0,0 +1,10 @@
+"""Parsing REST API URLs"""
+from rest_framework.routers import SimpleRouter
+from . import api
+
+
+router = SimpleRouter()
+router.register('sessions', api.SessionViewSet, basename='api_sessions')
+router.register('participants', api.ParticipantViewSet, basename='api_participants')
+
+urlpatterns = router.urls
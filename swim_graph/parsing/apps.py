@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ParsingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'parsing'
+
+    def ready(self):
+        from . import signals  # pylint: disable=import-outside-toplevel,unused-import
@@ -0,0 +1,112 @@
+"""Parsing Athletes"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from .models import Athlete, ProtocolData
+
+
+# Ключ спортсмена: нормализованное имя и год рождения
+AthleteKey = Tuple[str, Optional[int]]
+
+# Имя участника, которое не удалось разобрать (значение по умолчанию ProtocolData.initials)
+UNPARSED_NAME = ProtocolData._meta.get_field('initials').default
+
+
+def normalize_athlete_name(name: str) -> str:
+    """
+    Нормализует имя спортсмена для сравнения: верхний регистр,
+    одиночные пробелы между словами, Ё заменяется на Е.
+
+    :param name: Фамилия Имя из протокола.
+    :return: Нормализованное имя.
+    """
+    return ' '.join(name.split()).upper().replace('Ё', 'Е')
+
+
+def is_athlete_name(name: Optional[str]) -> bool:
+    """
+    Проверяет, что по имени участника можно определить спортсмена:
+    пустые имена и имя по умолчанию при ошибке разбора не объединяются в одного спортсмена.
+
+    :param name: Фамилия Имя из протокола.
+    :return: True, если имя задано.
+    """
+    return bool(name and name.strip()) and name != UNPARSED_NAME
+
+
+def get_athlete_key(name: str, year_of_birth: Optional[int]) -> AthleteKey:
+    """
+    Возвращает ключ спортсмена.
+
+    :param name: Фамилия Имя из протокола.
+    :param year_of_birth: Год рождения.
+    :return: Нормализованное имя и год рождения.
+    """
+    return normalize_athlete_name(name), year_of_birth
+
+
+class AthleteResolver:
+    """
+    Находит или создает спортсменов по имени и году рождения.
+
+    Найденные идентификаторы хранятся в памяти экземпляра, поэтому при загрузке
+    протоколов и заполнении ссылок пачками каждый спортсмен запрашивается
+    из базы данных один раз, а недостающие создаются одним запросом на пачку.
+    """
+
+    def __init__(self) -> None:
+        self.cache: Dict[AthleteKey, int] = {}
+
+    def resolve(self, name: str, year_of_birth: Optional[int]) -> int:
+        """
+        Возвращает идентификатор спортсмена, создавая его при необходимости.
+
+        :param name: Фамилия Имя из протокола.
+        :param year_of_birth: Год рождения.
+        :return: Идентификатор спортсмена.
+        """
+        key = get_athlete_key(name, year_of_birth)
+        if key not in self.cache:
+            self.resolve_many([(name, year_of_birth)])
+        return self.cache[key]
+
+    def resolve_many(
+            self, athletes: Iterable[Tuple[str, Optional[int]]]
+        ) -> Dict[AthleteKey, int]:
+        """
+        Находит или создает спортсменов пачкой.
+
+        :param athletes: Пары (Фамилия Имя, год рождения).
+        :return: Идентификаторы спортсменов по ключам.
+        """
+        names: Dict[AthleteKey, str] = {}
+        for name, year_of_birth in athletes:
+            key = get_athlete_key(name, year_of_birth)
+            if key not in self.cache:
+                names.setdefault(key, ' '.join(name.split()))
+
+        if names:
+            self._load(names)
+            missing = [key for key in names if key not in self.cache]
+            if missing:
+                Athlete.objects.bulk_create(
+                    [
+                        Athlete(name=names[key], name_key=key[0], year_of_birth=key[1])
+                        for key in missing
+                    ],
+                    ignore_conflicts=True
+                )
+                # Идентификаторы перечитываются: часть записей могла создать параллельная загрузка
+                self._load(missing)
+
+        return self.cache
+
+    def _load(self, keys: Iterable[AthleteKey]) -> None:
+        """
+        Загружает в кеш идентификаторы спортсменов с указанными именами.
+        Запрос по списку имен использует уникальный индекс (name_key, year_of_birth).
+        """
+        athletes = Athlete.objects.filter(
+            name_key__in={name_key for name_key, _ in keys}
+        ).values_list('id', 'name_key', 'year_of_birth')
+        for athlete_id, name_key, year_of_birth in athletes:
+            self.cache[(name_key, year_of_birth)] = athlete_id
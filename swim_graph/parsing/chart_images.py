@@ -0,0 +1,229 @@
+"""Parsing Chart Images"""
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
+
+
+# Форматы изображений диаграмм и их типы содержимого
+IMAGE_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Версия отрисовки: входит в хеш изображения, меняется при изменении оформления
+CHART_IMAGE_VERSION = 1
+
+# Каталог кеша изображений внутри MEDIA_ROOT
+CHART_IMAGES_DIR = 'chart_images'
+
+# Размер изображения (дюймы) и разрешение PNG
+FIGURE_SIZE = (11.69, 5.5)
+FIGURE_DPI = 150
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_chart_image(spec: Dict[str, Any], image_format: str = 'png') -> bytes:
+    """
+    Возвращает изображение диаграммы из кеша или рисует его и сохраняет в кеш.
+
+    :param spec: Описание диаграммы (ChartGenerator.build_*_spec).
+    :param image_format: Формат изображения (png или svg).
+    :return: Содержимое изображения.
+    """
+    return render_chart_images({'chart': spec}, image_format)['chart']
+
+
+def render_chart_images(
+        specs: Dict[str, Dict[str, Any]], image_format: str = 'png'
+    ) -> Dict[str, bytes]:
+    """
+    Возвращает изображения нескольких диаграмм.
+
+    Изображения хранятся в MEDIA_ROOT под хешем описания диаграммы,
+    поэтому одинаковые диаграммы не рисуются повторно. Недостающие изображения
+    рисуются в общем пуле процессов (настройка CHART_IMAGE_WORKERS),
+    если их больше одного.
+
+    :param specs: Описания диаграмм по названиям.
+    :param image_format: Формат изображения (png или svg).
+    :return: Содержимое изображений по названиям диаграмм.
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f'Неподдерживаемый формат изображения: {image_format}')
+
+    images = {}
+    missing = {}
+    for chart_name, spec in specs.items():
+        path = get_chart_image_path(spec, image_format)
+        if os.path.exists(path):
+            with open(path, 'rb') as image_file:
+                images[chart_name] = image_file.read()
+        else:
+            missing[chart_name] = (spec, path)
+
+    if len(missing) > 1 and settings.CHART_IMAGE_WORKERS > 1:
+        rendered = _get_executor().map(
+            render_chart_image,
+            [spec for spec, _ in missing.values()],
+            [image_format] * len(missing)
+        )
+    else:
+        rendered = (render_chart_image(spec, image_format) for spec, _ in missing.values())
+
+    for (chart_name, (_, path)), content in zip(missing.items(), rendered):
+        _save_image(path, content)
+        images[chart_name] = content
+
+    return {chart_name: images[chart_name] for chart_name in specs}
+
+
+def get_chart_image_path(spec: Dict[str, Any], image_format: str) -> str:
+    """
+    Возвращает путь к изображению диаграммы в кеше.
+    Имя файла - хеш описания диаграммы, формата и версии отрисовки.
+
+    :param spec: Описание диаграммы.
+    :param image_format: Формат изображения.
+    :return: Путь к файлу изображения.
+    """
+    content = json.dumps(
+        [CHART_IMAGE_VERSION, image_format, spec],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    return os.path.join(
+        settings.MEDIA_ROOT, CHART_IMAGES_DIR, digest[:2], f'{digest}.{image_format}'
+    )
+
+
+def render_chart_image(spec: Dict[str, Any], image_format: str = 'png') -> bytes:
+    """
+    Рисует диаграмму средствами matplotlib без графического интерфейса.
+    Поддерживаются столбчатые диаграммы и тепловые карты в том виде,
+    в каком их описывает ChartGenerator.
+
+    :param spec: Описание диаграммы.
+    :param image_format: Формат изображения (png или svg).
+    :return: Содержимое изображения.
+    """
+    figure = Figure(figsize=FIGURE_SIZE, layout='constrained')
+    axes = figure.add_subplot()
+    layout = spec.get('layout', {})
+    traces = spec.get('data', [])
+
+    if traces and traces[0].get('type') == 'heatmap':
+        _draw_heatmap(figure, axes, traces[0])
+    else:
+        _draw_bars(axes, traces, layout)
+
+    xaxis = layout.get('xaxis', {})
+    if xaxis.get('tickangle'):
+        for label in axes.get_xticklabels():
+            label.set_rotation(-xaxis['tickangle'])
+            label.set_horizontalalignment('right')
+    axes.set_ylabel(layout.get('yaxis', {}).get('title', {}).get('text', ''))
+
+    output = io.BytesIO()
+    figure.savefig(output, format=image_format, dpi=FIGURE_DPI)
+    return output.getvalue()
+
+
+def _draw_bars(axes: Any, traces: List[Dict[str, Any]], layout: Dict[str, Any]) -> None:
+    """
+    Рисует столбчатую диаграмму.
+    Несколько рядов группируются по участникам, как barmode='group' в plotly.
+    """
+    x_labels = traces[0]['x'] if traces else []
+    positions = np.arange(len(x_labels))
+    width = traces[0].get('width', 0.8) if len(traces) > 1 else 0.8
+    offsets = (np.arange(len(traces)) - (len(traces) - 1) / 2) * width
+
+    for trace, offset in zip(traces, offsets):
+        values = np.array(
+            [np.nan if value is None else value for value in trace['y']], dtype=float
+        )
+        bars = axes.bar(
+            positions + offset, values, width,
+            color=trace.get('marker', {}).get('color'),
+            label=trace.get('name')
+        )
+        if trace.get('text'):
+            axes.bar_label(bars, labels=trace['text'], fontsize='small')
+
+    axes.set_xticks(positions, x_labels)
+    axes.axhline(0, color='grey', linewidth=0.5)
+    if any(trace.get('name') for trace in traces):
+        legend_title = layout.get('legend', {}).get('title', {}).get('text')
+        axes.legend(
+            title=legend_title, fontsize='small', loc='upper left', bbox_to_anchor=(1.01, 1)
+        )
+
+
+def _draw_heatmap(figure: Figure, axes: Any, trace: Dict[str, Any]) -> None:
+    """
+    Рисует тепловую карту с подписями значений в ячейках.
+    Цветовая шкала берется из описания диаграммы (шкала plotly).
+    """
+    colormap = LinearSegmentedColormap.from_list(
+        'heat_map', [(position, _to_rgb(color)) for position, color in trace['colorscale']]
+    )
+    values = np.array(
+        [[np.nan if value is None else value for value in row] for row in trace['z']],
+        dtype=float
+    )
+    image = axes.imshow(values, cmap=colormap, aspect='auto', origin='lower')
+    figure.colorbar(image, ax=axes)
+
+    axes.set_xticks(np.arange(len(trace['x'])), trace['x'])
+    axes.set_yticks(np.arange(len(trace['y'])), trace['y'])
+    for row_index, row in enumerate(trace.get('text', [])):
+        for col_index, text in enumerate(row):
+            if text:
+                axes.text(col_index, row_index, text, ha='center', va='center', fontsize='x-small')
+
+
+def _to_rgb(color: str) -> Any:
+    """Преобразует цвет plotly вида 'rgb(r,g,b)' в цвет matplotlib."""
+    if color.startswith('rgb('):
+        return tuple(int(part) / 255 for part in color[4:-1].split(','))
+    return color
+
+
+def _save_image(path: str, content: bytes) -> None:
+    """
+    Сохраняет изображение в кеш.
+    Файл записывается под временным именем и переименовывается,
+    чтобы параллельные запросы не прочитали его частично.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'wb') as image_file:
+        image_file.write(content)
+    os.replace(temp_path, path)
+
+
+def _get_executor() -> Executor:
+    """
+    Возвращает общий пул процессов отрисовки, создавая его при первом обращении.
+    Отрисовка не обращается к Django, поэтому процессам не нужна настройка Django.
+    """
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.CHART_IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+    return _executor
@@ -0,0 +1,71 @@
+"""Parsing Section Executor"""
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import django
+from django.conf import settings
+
+
+# Режимы построения разделов отчета
+EXECUTOR_SERIAL = 'serial'
+EXECUTOR_THREAD = 'thread'
+EXECUTOR_PROCESS = 'process'
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def run_sections(generator: Any, sections: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Строит разделы отчета методами генератора таблиц или диаграмм.
+
+    В режимах thread и process разделы строятся одновременно на общем
+    ограниченном пуле (настройки REPORT_EXECUTOR и REPORT_EXECUTOR_WORKERS).
+    Перед этим показатели генератора переводятся в снимок только для чтения,
+    поэтому разделы не обращаются к базе данных и не меняют общие массивы.
+
+    :param generator: Генератор таблиц или диаграмм.
+    :param sections: Названия разделов и методы генератора, которые их строят.
+    :return: Словарь с построенными разделами.
+    """
+    if settings.REPORT_EXECUTOR == EXECUTOR_SERIAL or len(sections) < 2:
+        return {
+            section: getattr(generator, method_name)()
+            for section, method_name in sections.items()
+        }
+
+    generator.metrics.snapshot()
+    results = _get_executor().map(
+        _build_section, [generator] * len(sections), sections.values()
+    )
+    return dict(zip(sections, results))
+
+
+def _build_section(generator: Any, method_name: str) -> Any:
+    """Строит один раздел отчета (выполняется в пуле)."""
+    return getattr(generator, method_name)()
+
+
+def _get_executor() -> Executor:
+    """
+    Возвращает общий пул построения разделов, создавая его при первом обращении.
+    Процессы запускаются через spawn и настраивают Django при старте,
+    чтобы не наследовать соединения с базой данных.
+    """
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            if settings.REPORT_EXECUTOR == EXECUTOR_PROCESS:
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.REPORT_EXECUTOR_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup
+                )
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.REPORT_EXECUTOR_WORKERS,
+                    thread_name_prefix='report-section'
+                )
+    return _executor
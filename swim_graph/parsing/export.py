@@ -0,0 +1,238 @@
+"""Parsing Report Export"""
+import io
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Tuple, Union
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db import connection
+from django.template.loader import render_to_string
+from openpyxl import Workbook
+from plotly.io.json import to_json_plotly
+
+from . import models, reports, utils
+from .metrics import ReportMetrics
+from .tables import INPUT
+from .templatetags.custom_filters import time_format
+
+
+# Форматы выгрузки отчетов
+EXPORT_HTML = 'html'
+EXPORT_XLSX = 'xlsx'
+EXPORT_FORMATS = (EXPORT_HTML, EXPORT_XLSX)
+
+# Каталог общих файлов в архиве HTML отчетов и файлы, которые в него копируются
+EXPORT_ASSETS_DIR = 'assets'
+EXPORT_ASSETS = ('plotly/plotly.min.js', 'js/report_charts.js')
+
+# Названия листов XLSX с таблицами отчета (не длиннее 31 символа)
+TABLE_SHEET_TITLES = {
+    'start_distance_table': 'Стартовый отрезок',
+    'average_speed_table': 'Средняя скорость',
+    'pace_table': 'Темп на лучшем отрезке',
+    'speed_drop_table': 'Падение скорости',
+    'leader_gap_table': 'Отставание от лидера',
+    'underwater_part_table': 'Подводная часть',
+    'start_reaction_table': 'Стартовая реакция',
+    'start_finish_difference_table': 'Изменение старта и финиша',
+}
+
+# Заголовок листа с результатами заплыва (без промежуточных отрезков)
+RESULTS_HEADER = [
+    'Финишная позиция', 'Стартовая позиция', 'Фамилия Имя',
+    'Время реакции', 'Результат', 'Очки',
+]
+
+
+def export_reports(
+        session_ids: Iterable[int], export_format: str, output: Union[str, BinaryIO]
+    ) -> int:
+    """
+    Выгружает отчеты сессий в zip архив.
+
+    Отчеты строятся одновременно (настройка REPORT_EXECUTOR_WORKERS) и записываются
+    в архив по мере готовности, поэтому в памяти находится не больше нескольких
+    отчетов. HTML отчеты подключают общую копию plotly.js из каталога assets архива.
+
+    :param session_ids: Идентификаторы сессий парсинга.
+    :param export_format: Формат отчетов (html или xlsx).
+    :param output: Путь к архиву или файловый объект.
+    :return: Количество выгруженных отчетов.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Неподдерживаемый формат выгрузки: {export_format}')
+
+    build = render_session_html if export_format == EXPORT_HTML else render_session_xlsx
+    count = 0
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if export_format == EXPORT_HTML:
+            for asset in EXPORT_ASSETS:
+                archive.write(
+                    finders.find(asset), f'{EXPORT_ASSETS_DIR}/{asset.rsplit("/", 1)[-1]}'
+                )
+        for file_name, content in _iter_exported(session_ids, build):
+            archive.writestr(file_name, content)
+            count += 1
+    return count
+
+
+def render_session_html(session: models.ParsingSession) -> Tuple[str, str]:
+    """
+    Генерирует HTML отчет сессии, который открывается без сервера.
+    Разделы и описания диаграмм встраиваются в страницу,
+    plotly.js подключается из каталога assets рядом со страницей.
+
+    :param session: Сессия парсинга.
+    :return: Имя файла и HTML код отчета.
+    """
+    active_settings = reports.get_active_settings(session)
+    context = {'session': session, 'active_settings': active_settings, 'stream': True}
+    cards = reports.REPORT_SECTION_MARKER.sub(
+        lambda match: reports.render_report_section(session, match.group(1), active_settings),
+        render_to_string('parsing/report_cards.html', context)
+    )
+
+    participants = sorted(
+        reports.get_report_participants(session, with_splits=False),
+        key=lambda x: x.start_position
+    )
+    session_charts = utils.ChartGenerator(
+        session, participants, ReportMetrics.for_report(session, participants)
+    )
+    chart_names = [
+        chart_name for chart_name, form_field in reports.CHARTS_MAPPING.items()
+        if active_settings.get(form_field)
+    ]
+    chart_specs = to_json_plotly(session_charts.generate_chart_specs(chart_names))
+
+    html = render_to_string('parsing/report_export.html', {
+        'session': session,
+        'cards': cards,
+        'chart_specs': chart_specs.replace('</', '<\\/'),
+        'assets_url': f'{EXPORT_ASSETS_DIR}/',
+    })
+    return f'{get_export_name(session)}.html', html
+
+
+def render_session_xlsx(session: models.ParsingSession) -> Tuple[str, bytes]:
+    """
+    Генерирует XLSX отчет сессии: лист с результатами заплыва
+    и по листу на каждую включенную таблицу отчета.
+    Книга создается в режиме write_only: строки записываются сразу.
+
+    :param session: Сессия парсинга.
+    :return: Имя файла и содержимое книги.
+    """
+    workbook = Workbook(write_only=True)
+    protocol_data = reports.get_report_participants(session)
+
+    results_sheet = workbook.create_sheet('Результаты заплыва')
+    # Колонки отрезков - все дистанции участников, у кого-то отрезков может не быть
+    split_distances = sorted({
+        split_time.distance
+        for participant in protocol_data
+        for split_time in participant.split_times
+    })
+    results_sheet.append(RESULTS_HEADER + split_distances)
+    for participant in protocol_data:
+        split_times = {
+            split_time.distance: split_time.split_time for split_time in participant.split_times
+        }
+        results_sheet.append([
+            participant.final_position,
+            participant.start_position,
+            participant.initials,
+            time_format(participant.reaction_time),
+            time_format(participant.result),
+            participant.points,
+        ] + [
+            time_format(split_times.get(distance))
+            for distance in split_distances
+        ])
+
+    tables = reports.generate_tables(
+        session, protocol_data, reports.get_active_settings(session),
+        tuple(reports.TABLES_MAPPING), as_html=False
+    )
+    for table_name, table in tables.items():
+        if table is None:
+            continue
+        sheet = workbook.create_sheet(TABLE_SHEET_TITLES[table_name])
+        sheet.append([''] + table.col_labels)
+        for row in table.rows:
+            values = row.raw_values()
+            if row.value_type == INPUT:
+                values = [_to_number(value) for value in values]
+            sheet.append([row.label] + values)
+
+    output = io.BytesIO()
+    workbook.save(output)
+    return f'{get_export_name(session)}.xlsx', output.getvalue()
+
+
+def get_export_name(session: models.ParsingSession) -> str:
+    """
+    Возвращает имя файла отчета сессии в архиве (без расширения).
+
+    :param session: Сессия парсинга.
+    :return: Имя файла.
+    """
+    file_name = session.file_name.rsplit('.', 1)[0]
+    file_name = ''.join(char if char.isalnum() or char in '-_ ' else '_' for char in file_name)
+    return f'{session.id}_{file_name.strip()}'
+
+
+def get_export_session_ids(session_ids: List[int]) -> List[int]:
+    """
+    Возвращает существующие сессии из списка в порядке списка без повторов.
+
+    :param session_ids: Идентификаторы сессий.
+    :return: Идентификаторы существующих сессий.
+    """
+    existing = set(
+        models.ParsingSession.objects.filter(id__in=session_ids).values_list('id', flat=True)
+    )
+    return [session_id for session_id in dict.fromkeys(session_ids) if session_id in existing]
+
+
+def _to_number(value: str) -> Union[float, str]:
+    """Преобразует введенное пользователем значение в число, если это возможно."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _iter_exported(
+        session_ids: Iterable[int],
+        build: Callable[[models.ParsingSession], Tuple[str, Union[str, bytes]]]
+    ) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    """
+    Строит отчеты сессий на пуле потоков и выдает их в исходном порядке.
+    Вперед ставится не больше двух отчетов на поток, чтобы готовые,
+    но еще не записанные отчеты не накапливались в памяти.
+    """
+    workers = settings.REPORT_EXECUTOR_WORKERS
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-export') as pool:
+        pending = deque()
+        for session_id in session_ids:
+            pending.append(pool.submit(_build_exported, build, session_id))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _build_exported(
+        build: Callable[[models.ParsingSession], Tuple[str, Union[str, bytes]]], session_id: int
+    ) -> Tuple[str, Union[str, bytes]]:
+    """
+    Строит отчет одной сессии (выполняется в пуле).
+    Соединение с базой данных потока закрывается после построения.
+    """
+    try:
+        return build(models.ParsingSession.objects.get(id=session_id))
+    finally:
+        connection.close()
@@ -0,0 +1,51 @@
+"""Parsing Static Files Finders"""
+import os
+from typing import Iterator, List, Tuple, Union
+
+import plotly
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+
+# Путь plotly.js среди статических файлов и имя файла в данных пакета plotly
+PLOTLY_JS_PATH = 'plotly/plotly.min.js'
+PLOTLY_JS_FILE = 'plotly.min.js'
+
+
+class PlotlyFinder(BaseFinder):
+    """
+    Публикует из данных пакета plotly только plotly.min.js,
+    чтобы остальные файлы пакета не попадали в статические файлы.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(
+            location=os.path.join(os.path.dirname(plotly.__file__), 'package_data')
+        )
+        self.storage.prefix = os.path.dirname(PLOTLY_JS_PATH)
+
+    # Имя параметра all задано интерфейсом BaseFinder
+    def find(  # pylint: disable=redefined-builtin
+            self, path: str, all: bool = False
+        ) -> Union[str, List[str]]:
+        """
+        Возвращает абсолютный путь plotly.min.js, если запрошен именно он.
+
+        :param path: Путь статического файла.
+        :param all: Вернуть список всех найденных путей.
+        :return: Путь (список путей) или пустой список.
+        """
+        if path != PLOTLY_JS_PATH:
+            return []
+        match = self.storage.path(PLOTLY_JS_FILE)
+        return [match] if all else match
+
+    def list(self, ignore_patterns: List[str]) -> Iterator[Tuple[str, FileSystemStorage]]:
+        """
+        Выдает plotly.min.js для collectstatic.
+
+        :param ignore_patterns: Шаблоны игнорируемых файлов.
+        :return: Итератор пар (путь, хранилище).
+        """
+        yield PLOTLY_JS_FILE, self.storage
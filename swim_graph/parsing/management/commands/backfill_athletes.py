@@ -0,0 +1,55 @@
+"""Заполнение ссылок участников заплывов на спортсменов"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from parsing import models
+from parsing.athletes import UNPARSED_NAME, AthleteResolver, get_athlete_key, is_athlete_name
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает спортсменов по имени и году рождения участников заплывов '
+        'и заполняет ссылки на них. Записи обрабатываются пачками по возрастанию id, '
+        'участники без имени или с ошибкой разбора имени пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество записей в одной пачке.'
+        )
+
+    def handle(self, *args, **options):
+        resolver = AthleteResolver()
+        last_id = 0
+        updated = 0
+
+        while True:
+            batch = list(
+                models.ProtocolData.objects.filter(athlete__isnull=True, id__gt=last_id)
+                .exclude(initials__in=['', UNPARSED_NAME])
+                .order_by('id')
+                .only('id', 'initials', 'year_of_birth')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            # Имена только из пробелов исключаются после выборки
+            batch = [participant for participant in batch if is_athlete_name(participant.initials)]
+
+            with transaction.atomic():
+                athlete_ids = resolver.resolve_many(
+                    (participant.initials, participant.year_of_birth) for participant in batch
+                )
+                for participant in batch:
+                    participant.athlete_id = athlete_ids[
+                        get_athlete_key(participant.initials, participant.year_of_birth)
+                    ]
+                models.ProtocolData.objects.bulk_update(batch, ['athlete'])
+
+            updated += len(batch)
+            self.stdout.write(f'Обработано записей: {updated}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: записей {updated}, спортсменов {len(resolver.cache)}'
+        ))
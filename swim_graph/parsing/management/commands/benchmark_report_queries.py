@@ -0,0 +1,136 @@
+"""Бенчмарк запросов отчета и списка сессий"""
+import random
+import time as timer
+from typing import Callable, List, Tuple
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from parsing import models
+from parsing.reports import SETTINGS_MAPPING
+from swim_graph_utils.time_utils import CENTISECONDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит планы и время выполнения запросов страницы отчета и списка '
+        'сессий. С параметром --seed предварительно наполняет базу тестовыми данными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Количество тестовых сессий для создания перед замером.'
+        )
+        parser.add_argument(
+            '--participants', type=int, default=8,
+            help='Количество участников в тестовой сессии.'
+        )
+        parser.add_argument(
+            '--runs', type=int, default=20,
+            help='Количество повторов каждого запроса.'
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'], options['participants'])
+
+        session = models.ParsingSession.objects.order_by('id')[
+            models.ParsingSession.objects.count() // 2
+        ]
+        participant_ids = list(
+            models.ProtocolData.objects.filter(parsing_session=session)
+            .values_list('id', flat=True)
+        )
+
+        queries: List[Tuple[str, Callable]] = [
+            ('Список сессий: первая страница',
+             lambda: models.ParsingSession.objects.order_by('-created', '-id')[:10]),
+            ('Список сессий: глубокая страница',
+             lambda: models.ParsingSession.objects.order_by('-created', '-id')[5000:5010]),
+            ('Отчет: участники по финишной позиции',
+             lambda: models.ProtocolData.objects.filter(
+                 parsing_session=session).order_by('final_position')[:20]),
+            ('Настройка отчета: участники по категории и стартовой позиции',
+             lambda: models.ProtocolData.objects.filter(
+                 parsing_session=session).order_by('final_category', 'start_position')),
+            ('Отчет: промежуточные времена участников',
+             lambda: models.SwimSplitTime.objects.filter(
+                 protocol_data__in=participant_ids).order_by('protocol_data', 'distance')),
+        ]
+        queries += [
+            (f'Отчет: статус {model.__name__}',
+             lambda model=model: model.objects.filter(parsing_session=session, status=True)[:1])
+            for model in SETTINGS_MAPPING
+        ]
+
+        for title, build_queryset in queries:
+            durations = []
+            for _ in range(options['runs']):
+                started = timer.perf_counter()
+                list(build_queryset())
+                durations.append((timer.perf_counter() - started) * 1000)
+            durations.sort()
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(
+                f'  медиана {durations[len(durations) // 2]:.3f} мс, '
+                f'максимум {durations[-1]:.3f} мс'
+            )
+            plan = build_queryset().explain(analyze=True, buffers=True)
+            for line in plan.splitlines():
+                self.stdout.write(f'  {line}')
+
+    @transaction.atomic
+    def seed(self, number_sessions: int, number_participants: int) -> None:
+        """
+        Создает тестовые сессии с участниками, промежуточными временами и настройками.
+
+        :param number_sessions: Количество сессий.
+        :param number_participants: Количество участников в сессии.
+        """
+        batch_size = 1000
+        for start in range(0, number_sessions, batch_size):
+            sessions = models.ParsingSession.objects.bulk_create([
+                models.ParsingSession(
+                    file_name=f'Тестовые соревнования {start + i}',
+                    link_video='https://example.com',
+                    pool_length=random.choice(['25m', '50m']),
+                    swim_length=random.choice(['50m', '100m', '200m', '400m']),
+                )
+                for i in range(min(batch_size, number_sessions - start))
+            ])
+
+            participants = models.ProtocolData.objects.bulk_create([
+                models.ProtocolData(
+                    parsing_session=session,
+                    initials=f'Участник {position}',
+                    year_of_birth=random.randint(1990, 2012),
+                    final_category='Финал',
+                    start_position=position,
+                    final_position=position,
+                    reaction_time=random.randint(50, 90),
+                    result=random.randint(60, 119) * CENTISECONDS,
+                )
+                for session in sessions
+                for position in range(1, number_participants + 1)
+            ])
+
+            split_times = []
+            for participant in participants:
+                session = participant.parsing_session
+                pool_length = int(session.pool_length.replace('m', ''))
+                swim_length = int(session.swim_length.replace('m', ''))
+                for distance in range(pool_length, swim_length + 1, pool_length):
+                    split_times.append(models.SwimSplitTime(
+                        protocol_data=participant,
+                        distance=distance,
+                        split_time=random.randint(25, 40) * CENTISECONDS,
+                    ))
+            models.SwimSplitTime.objects.bulk_create(split_times, batch_size=5000)
+
+            for model in SETTINGS_MAPPING:
+                model.objects.bulk_create([
+                    model(parsing_session=session) for session in sessions
+                ])
+
+            self.stdout.write(f'Создано сессий: {start + len(sessions)}')
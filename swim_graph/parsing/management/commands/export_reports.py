@@ -0,0 +1,41 @@
+"""Выгрузка отчетов сессий в zip архив"""
+from django.core.management.base import BaseCommand, CommandError
+
+from parsing import models
+from parsing.export import EXPORT_FORMATS, export_reports, get_export_session_ids
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает отчеты сессий в zip архив: автономные HTML страницы '
+        'с общей копией plotly.js или книги XLSX.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'session_ids', nargs='*', type=int,
+            help='Идентификаторы сессий (по умолчанию - все сессии).'
+        )
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default=EXPORT_FORMATS[0],
+            help='Формат отчетов.'
+        )
+        parser.add_argument(
+            '--output', default='reports.zip',
+            help='Путь к архиву.'
+        )
+
+    def handle(self, *args, **options):
+        if options['session_ids']:
+            session_ids = get_export_session_ids(options['session_ids'])
+        else:
+            session_ids = list(
+                models.ParsingSession.objects.order_by('id').values_list('id', flat=True)
+            )
+        if not session_ids:
+            raise CommandError('Сессии не найдены')
+
+        count = export_reports(session_ids, options['format'], options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено отчетов: {count} ({options["output"]})'
+        ))
@@ -0,0 +1,123 @@
+"""Упаковка времени на промежуточных дистанциях"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from parsing import models
+from parsing.splits import MISSING_SPLIT, pack_splits, unpack_splits
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит время на промежуточных дистанциях из строк SwimSplitTime '
+        'в упакованный столбец ProtocolData.packed_splits (или обратно с --unpack). '
+        'Сессии обрабатываются пачками по возрастанию id. Место на диске '
+        'освобождается после VACUUM таблицы отрезков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество сессий в одной пачке.'
+        )
+        parser.add_argument(
+            '--unpack', action='store_true',
+            help='Восстановить строки SwimSplitTime из упакованных отрезков.'
+        )
+
+    def handle(self, *args, **options):
+        convert = self.unpack_sessions if options['unpack'] else self.pack_sessions
+        sessions = models.ParsingSession.objects.all()
+        if options['unpack']:
+            sessions = sessions.exclude(split_distances=[])
+        else:
+            sessions = sessions.filter(split_distances=[])
+
+        last_id = 0
+        processed = 0
+        while True:
+            session_ids = list(
+                sessions.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not session_ids:
+                break
+            last_id = session_ids[-1]
+
+            with transaction.atomic():
+                convert(session_ids)
+
+            processed += len(session_ids)
+            self.stdout.write(f'Обработано сессий: {processed}')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово: сессий {processed}'))
+
+    def pack_sessions(self, session_ids):
+        """Упаковывает отрезки участников сессий и удаляет их строки."""
+        split_rows = models.SwimSplitTime.objects.filter(
+            protocol_data__parsing_session_id__in=session_ids
+        ).values_list(
+            'protocol_data__parsing_session_id', 'protocol_data_id', 'distance', 'split_time'
+        )
+
+        session_distances = defaultdict(set)
+        participant_splits = defaultdict(dict)
+        for session_id, participant_id, distance, split_time in split_rows:
+            session_distances[session_id].add(distance)
+            participant_splits[participant_id][distance] = split_time
+        if not session_distances:
+            return
+
+        sessions = list(models.ParsingSession.objects.filter(id__in=session_distances))
+        for session in sessions:
+            session.split_distances = sorted(session_distances[session.id])
+        models.ParsingSession.objects.bulk_update(sessions, ['split_distances'])
+
+        distances = {session.id: session.split_distances for session in sessions}
+        participants = list(
+            models.ProtocolData.objects.filter(parsing_session_id__in=session_distances)
+            .only('id', 'parsing_session_id')
+        )
+        for participant in participants:
+            participant.packed_splits = pack_splits(
+                distances[participant.parsing_session_id], participant_splits[participant.id]
+            )
+        models.ProtocolData.objects.bulk_update(participants, ['packed_splits'], batch_size=1000)
+
+        # Строки удаляются одним запросом без сигналов: показатели отчета не меняются
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {models.SwimSplitTime._meta.db_table} AS split '
+                f'USING {models.ProtocolData._meta.db_table} AS protocol '
+                'WHERE split.protocol_data_id = protocol.id '
+                'AND protocol.parsing_session_id = ANY(%s)',
+                [list(session_distances)]
+            )
+
+    def unpack_sessions(self, session_ids):
+        """Восстанавливает строки отрезков участников сессий из упакованных отрезков."""
+        distances = dict(
+            models.ParsingSession.objects.filter(id__in=session_ids)
+            .values_list('id', 'split_distances')
+        )
+        participants = list(
+            models.ProtocolData.objects.filter(
+                parsing_session_id__in=session_ids, packed_splits__isnull=False
+            ).only('id', 'parsing_session_id', 'packed_splits')
+        )
+
+        split_times = []
+        for participant in participants:
+            values = unpack_splits(participant.packed_splits)
+            for distance, split_time in zip(distances[participant.parsing_session_id], values):
+                if split_time != MISSING_SPLIT:
+                    split_times.append(models.SwimSplitTime(
+                        protocol_data_id=participant.id,
+                        distance=distance,
+                        split_time=int(split_time),
+                    ))
+            participant.packed_splits = None
+        models.SwimSplitTime.objects.bulk_create(split_times, batch_size=5000)
+        models.ProtocolData.objects.bulk_update(participants, ['packed_splits'], batch_size=1000)
+        models.ParsingSession.objects.filter(id__in=session_ids).update(split_distances=[])
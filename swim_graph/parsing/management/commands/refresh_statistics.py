@@ -0,0 +1,21 @@
+"""Обновление сводных показателей"""
+from django.core.management.base import BaseCommand
+
+from parsing.rollups import refresh_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        'Добавляет в сводные показатели сессии, созданные после предыдущего обновления. '
+        'С параметром --full пересчитывает показатели по всем сессиям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать сводные показатели по всем сессиям.'
+        )
+
+    def handle(self, *args, **options):
+        processed = refresh_statistics(options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Готово: учтено сессий {processed}'))
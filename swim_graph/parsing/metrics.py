@@ -0,0 +1,452 @@
+"""Parsing Metrics"""
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.db.models import prefetch_related_objects
+
+from swim_graph_utils.time_utils import CENTISECONDS, parse_centiseconds
+from .models import (
+    ProtocolData, ParsingSession, SessionMetrics,
+    StartDistance, NumberCycles, Pace, UnderwaterPart
+)
+from .splits import MISSING_SPLIT, unpack_splits
+
+
+# Сохраняемые ряды: дистанции
+DISTANCE_SERIES = ('distances', 'heat_map_distances')
+
+# Сохраняемые ряды: значения по дистанциям
+DISTANCE_VALUE_SERIES = ('leader_times',)
+
+# Сохраняемые ряды: значения по участникам
+PARTICIPANT_SERIES = ('result_seconds', 'reaction_seconds', 'start_finish_deltas')
+
+# Сохраняемые ряды: матрицы (дистанции x участники)
+MATRIX_SERIES = (
+    'split_seconds', 'lap_speeds', 'split_speeds',
+    'speed_drop', 'leader_gaps', 'heat_map',
+)
+
+
+class ReportMetrics:
+    """
+    Движок расчета производных показателей отчета.
+
+    Все ряды считаются один раз на отчет операциями над массивами NumPy
+    и кешируются в экземпляре, поэтому генераторы таблиц и диаграмм
+    только форматируют готовые значения. Матрицы имеют форму
+    (дистанции x участники), отсутствующие значения - NaN.
+    """
+
+    def __init__(self, session: ParsingSession, participants: List[ProtocolData]) -> None:
+        self.session = session
+        self.participants = participants
+
+    @classmethod
+    def for_report(
+            cls, session: ParsingSession, participants: List[ProtocolData]
+        ) -> 'ReportMetrics':
+        """
+        Возвращает показатели отчета, используя сохраненные при загрузке
+        значения. Если они отсутствуют или устарели, пересчитывает их.
+        Если сохраненные ряды не подходят к составу участников, показатели
+        рассчитываются по отрезкам участников, которые при необходимости догружаются.
+
+        :param session: Сессия парсинга.
+        :param participants: Список участников отчета.
+        :return: Показатели отчета.
+        """
+        metrics = cls(session, participants)
+        stored = SessionMetrics.objects.filter(parsing_session=session).first()
+        if stored is None or not stored.is_actual(session):
+            stored = update_session_metrics(session)
+        if not metrics.load(stored.data) and not session.split_distances:
+            prefetch_related_objects(participants, 'swimsplittime_set')
+        return metrics
+
+    def load(self, data: Dict[str, Any]) -> bool:
+        """
+        Подставляет сохраненные ряды вместо расчета. Ряды сохраняются
+        по всем участникам сессии, поэтому подставляются только при
+        совпадении состава участников.
+
+        :param data: Сохраненные ряды (см. to_store).
+        :return: True, если ряды подставлены.
+        """
+        stored_ids = data.get('participant_ids', [])
+        participant_ids = [participant.id for participant in self.participants]
+        if not participant_ids or sorted(stored_ids) != sorted(participant_ids):
+            return False
+
+        position = {participant_id: i for i, participant_id in enumerate(stored_ids)}
+        columns = [position[participant_id] for participant_id in participant_ids]
+        for name in DISTANCE_SERIES:
+            self.__dict__[name] = np.array(data[name], dtype=np.int64)
+        for name in DISTANCE_VALUE_SERIES:
+            self.__dict__[name] = np.array(data[name], dtype=np.float64)
+        for name in PARTICIPANT_SERIES:
+            self.__dict__[name] = np.array(data[name], dtype=np.float64)[columns]
+        for name in MATRIX_SERIES:
+            values = np.array(data[name], dtype=np.float64).reshape(-1, len(stored_ids))
+            self.__dict__[name] = values[:, columns]
+        return True
+
+    def snapshot(self) -> 'ReportMetrics':
+        """
+        Рассчитывает все ряды и загружает настройки сессии, после чего
+        запрещает запись в массивы. Снимок можно передавать в несколько
+        потоков или процессов: он не обращается к базе данных и не изменяется.
+
+        :return: Показатели отчета.
+        """
+        for name, value in vars(type(self)).items():
+            if isinstance(value, cached_property):
+                getattr(self, name)
+        for value in self.__dict__.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+        return self
+
+    def to_store(self) -> Dict[str, Any]:
+        """
+        Возвращает рассчитанные ряды в виде, пригодном для сохранения в JSON.
+
+        :return: Словарь рядов.
+        """
+        data = {
+            'participant_ids': [participant.id for participant in self.participants],
+        }
+        for name in DISTANCE_SERIES:
+            data[name] = getattr(self, name).tolist()
+        for name in DISTANCE_VALUE_SERIES + PARTICIPANT_SERIES + MATRIX_SERIES:
+            data[name] = to_cells(getattr(self, name))
+        return data
+
+    @cached_property
+    def pool_length(self) -> int:
+        """Длина бассейна (м)."""
+        return int(self.session.pool_length.replace('m', ''))
+
+    @cached_property
+    def swim_length(self) -> int:
+        """Длина заплыва (м)."""
+        return int(self.session.swim_length.replace('m', ''))
+
+    @cached_property
+    def col_labels(self) -> List[str]:
+        """Подписи участников."""
+        return [participant.initials for participant in self.participants]
+
+    @cached_property
+    def final_positions(self) -> np.ndarray:
+        """Финишные позиции участников (-1, если позиция неизвестна)."""
+        return np.array(
+            [participant.final_position if participant.final_position is not None else -1
+             for participant in self.participants],
+            dtype=np.int64
+        )
+
+    @cached_property
+    def leader_index(self) -> Optional[int]:
+        """Индекс лидера заплыва (финишная позиция 1) или None."""
+        leaders = np.flatnonzero(self.final_positions == 1)
+        return int(leaders[0]) if leaders.size else None
+
+    @cached_property
+    def distances(self) -> np.ndarray:
+        """Отсортированные промежуточные дистанции всех участников."""
+        distances = set()
+        for participant in self.participants:
+            if participant.packed_splits is not None:
+                distances.update(self.session.split_distances)
+            else:
+                distances.update(split.distance for split in participant.swimsplittime_set.all())
+        return np.array(sorted(distances), dtype=np.int64)
+
+    @cached_property
+    def report_distances(self) -> np.ndarray:
+        """Промежуточные дистанции либо длина заплыва, если отрезков нет."""
+        if self.distances.size:
+            return self.distances
+        return np.array([self.swim_length], dtype=np.int64)
+
+    @cached_property
+    def split_seconds(self) -> np.ndarray:
+        """
+        Время на промежуточных дистанциях (сек).
+        Упакованные отрезки участников читаются из ProtocolData.packed_splits
+        без копирования и записываются в матрицу одной операцией.
+        """
+        matrix = np.full((self.distances.size, len(self.participants)), np.nan)
+        row_index = {int(dist): i for i, dist in enumerate(self.distances)}
+        packed_rows = [row_index[distance] for distance in self.session.split_distances]
+        for col, participant in enumerate(self.participants):
+            if participant.packed_splits is not None:
+                values = unpack_splits(participant.packed_splits)
+                matrix[packed_rows, col] = np.where(values == MISSING_SPLIT, np.nan, values)
+                continue
+            for split in participant.swimsplittime_set.all():
+                if split.split_time is not None:
+                    matrix[row_index[split.distance], col] = split.split_time
+        return matrix / CENTISECONDS
+
+    @cached_property
+    def result_seconds(self) -> np.ndarray:
+        """Итоговый результат участников (сек)."""
+        return seconds_array([participant.result for participant in self.participants])
+
+    @cached_property
+    def reaction_seconds(self) -> np.ndarray:
+        """Время стартовой реакции (сек)."""
+        return seconds_array([participant.reaction_time for participant in self.participants])
+
+    @cached_property
+    def report_times(self) -> np.ndarray:
+        """
+        Время по дистанциям отчета: время отрезка,
+        а при его отсутствии - итоговый результат участника.
+        """
+        if self.distances.size:
+            splits = self.split_seconds
+        else:
+            splits = np.full((1, len(self.participants)), np.nan)
+        return np.where(np.isnan(splits), self.result_seconds, splits)
+
+    @cached_property
+    def lap_speeds(self) -> np.ndarray:
+        """Средняя скорость на отрезках (м/сек) по дистанциям отчета."""
+        return _safe_divide(self.pool_length, self.report_times)
+
+    @cached_property
+    def split_speeds(self) -> np.ndarray:
+        """Средняя скорость только по фактическим отрезкам (м/сек)."""
+        return _safe_divide(self.pool_length, self.split_seconds)
+
+    @cached_property
+    def speed_drop(self) -> np.ndarray:
+        """Падение скорости относительно первого отрезка (%)."""
+        speeds = self.split_speeds
+        if not speeds.size:
+            return speeds
+        drop = _safe_divide(speeds, speeds[0]) * 100
+        # Первая дистанция всегда 100%
+        drop[0] = 100.0
+        return drop
+
+    @cached_property
+    def leader_times(self) -> np.ndarray:
+        """Время лидера по дистанциям отчета (0, если отрезка нет)."""
+        if self.leader_index is None:
+            return np.zeros(self.report_distances.size)
+        if self.distances.size:
+            leader_splits = self.split_seconds[:, self.leader_index]
+        else:
+            leader_splits = np.full(1, np.nan)
+        if np.isnan(leader_splits).all():
+            return np.where(
+                self.report_distances == self.swim_length,
+                self.result_seconds[self.leader_index], 0.0
+            )
+        return np.nan_to_num(leader_splits, nan=0.0)
+
+    @cached_property
+    def leader_gaps(self) -> np.ndarray:
+        """Отставание от лидера по дистанциям отчета (сек)."""
+        gaps = self.report_times - self.leader_times[:, np.newaxis]
+        gaps[:, self.final_positions == 1] = 0.0
+        return gaps
+
+    @cached_property
+    def start_finish_deltas(self) -> np.ndarray:
+        """Разница времени финишного и стартового отрезков (сек)."""
+        deltas = np.zeros(len(self.participants))
+        present = ~np.isnan(self.split_seconds)
+        has_splits = present.any(axis=0)
+        if not has_splits.any():
+            return deltas
+        columns = np.flatnonzero(has_splits)
+        first = present[:, columns].argmax(axis=0)
+        last = present.shape[0] - 1 - present[::-1, columns].argmax(axis=0)
+        deltas[columns] = (
+            self.split_seconds[last, columns] - self.split_seconds[first, columns]
+        )
+        return deltas
+
+    @cached_property
+    def heat_map_distances(self) -> np.ndarray:
+        """Дистанции тепловой карты."""
+        has_splits = (~np.isnan(self.split_seconds)).any(axis=0)
+        if has_splits.all():
+            return self.distances
+        return np.union1d(self.distances, [self.swim_length])
+
+    @cached_property
+    def heat_map(self) -> np.ndarray:
+        """
+        Значения тепловой карты (сек): время отрезков, а для участников
+        без отрезков - итоговый результат на полной дистанции.
+        """
+        matrix = np.full((self.heat_map_distances.size, len(self.participants)), np.nan)
+        rows = np.searchsorted(self.heat_map_distances, self.distances)
+        matrix[rows] = self.split_seconds
+        no_splits = np.isnan(matrix).all(axis=0)
+        if no_splits.any():
+            swim_row = np.searchsorted(self.heat_map_distances, self.swim_length)
+            matrix[swim_row, no_splits] = self.result_seconds[no_splits]
+        return matrix
+
+    @cached_property
+    def start_distance_data(self) -> Optional[StartDistance]:
+        """Настройки стартового отрезка сессии."""
+        return StartDistance.objects.filter(parsing_session=self.session).first()
+
+    @cached_property
+    def number_cycles_data(self) -> Optional[NumberCycles]:
+        """Настройки количества циклов сессии."""
+        return NumberCycles.objects.filter(parsing_session=self.session).first()
+
+    @cached_property
+    def pace_data(self) -> Optional[Pace]:
+        """Настройки темпа сессии."""
+        return Pace.objects.filter(parsing_session=self.session).first()
+
+    @cached_property
+    def underwater_parts_data(self) -> Dict[str, Any]:
+        """Объединенные данные о подводной части сессии."""
+        underwater_parts = {}
+        for part in UnderwaterPart.objects.filter(parsing_session=self.session):
+            underwater_parts.update(part.data)
+        return underwater_parts
+
+    @cached_property
+    def start_distance(self) -> Optional[List[str]]:
+        """Введенные значения стартового отрезка 0-15 (сек)."""
+        if not self.start_distance_data:
+            return None
+        data = self.start_distance_data.data
+        return [data.get(str(participant.id), '') for participant in self.participants]
+
+    @cached_property
+    def number_cycles(self) -> np.ndarray:
+        """Количество циклов на лучшем отрезке (0, если не указано)."""
+        data = self.number_cycles_data.data if self.number_cycles_data else {}
+        return np.array(
+            [_to_number(data.get(str(participant.id)), int) or 0
+             for participant in self.participants],
+            dtype=np.int64
+        )
+
+    @cached_property
+    def pace_per_minute(self) -> np.ndarray:
+        """Темп на лучшем отрезке (циклов в минуту)."""
+        values = np.full(len(self.participants), np.nan)
+        if not (self.number_cycles_data and self.pace_data):
+            return values
+
+        cycles = self.number_cycles_data.data
+        paces = self.pace_data.data
+        for i, participant in enumerate(self.participants):
+            participant_id = str(participant.id)
+            if participant_id not in cycles or participant_id not in paces:
+                continue
+            cycle_count = _to_number(cycles[participant_id], int)
+            pace_value = parse_centiseconds(paces[participant_id])
+            if cycle_count is None or pace_value is None:
+                continue
+            pace_in_seconds = pace_value / CENTISECONDS
+            if pace_in_seconds:
+                values[i] = (cycle_count / pace_in_seconds) * 60
+        return values
+
+    @cached_property
+    def underwater_parts_raw(self) -> List[str]:
+        """Введенные значения подводной части (м) в исходном виде."""
+        return [
+            f"{self.underwater_parts_data[str(participant.id)]}"
+            if str(participant.id) in self.underwater_parts_data else ""
+            for participant in self.participants
+        ]
+
+    @cached_property
+    def underwater_parts(self) -> np.ndarray:
+        """Подводная часть (м), 0 для пустых и некорректных значений."""
+        return np.array(
+            [_to_number(self.underwater_parts_data.get(str(participant.id)), float) or 0
+             for participant in self.participants],
+            dtype=np.float64
+        )
+
+
+def update_session_metrics(session: ParsingSession) -> SessionMetrics:
+    """
+    Рассчитывает и сохраняет показатели по всем участникам сессии.
+
+    :param session: Сессия парсинга.
+    :return: Сохраненные показатели.
+    """
+    participants = ProtocolData.objects.filter(parsing_session=session).order_by('final_position')
+    if not session.split_distances:
+        participants = participants.prefetch_related('swimsplittime_set')
+    participants = list(participants)
+    stored, _ = SessionMetrics.objects.update_or_create(
+        parsing_session=session,
+        defaults={
+            'pool_length': session.pool_length,
+            'swim_length': session.swim_length,
+            'data': ReportMetrics(session, participants).to_store(),
+        }
+    )
+    return stored
+
+
+def to_cells(values: np.ndarray) -> List[Any]:
+    """
+    Преобразует массив в списки Python, заменяя NaN на None.
+
+    :param values: Массив значений.
+    :return: Вложенные списки значений.
+    """
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def seconds_array(centiseconds: List[Optional[int]]) -> np.ndarray:
+    """
+    Переводит время в сотых долях секунды в массив секунд, None - в NaN.
+
+    :param centiseconds: Время в сотых долях секунды.
+    :return: Время в секундах.
+    """
+    return np.array(
+        [np.nan if value is None else value for value in centiseconds], dtype=np.float64
+    ) / CENTISECONDS
+
+
+def _safe_divide(numerator: Any, denominator: np.ndarray) -> np.ndarray:
+    """
+    Делит значения, возвращая NaN при делении на ноль или отсутствии данных.
+
+    :param numerator: Делимое.
+    :param denominator: Делитель.
+    :return: Результат деления.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.divide(numerator, denominator)
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def _to_number(value: Any, number_type: type) -> Optional[Any]:
+    """
+    Преобразует введенное значение в число.
+
+    :param value: Исходное значение.
+    :param number_type: Тип числа (int или float).
+    :return: Число или None, если значение пустое или некорректное.
+    """
+    if not value:
+        return None
+    try:
+        return number_type(value)
+    except (ValueError, TypeError):
+        return None
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-19 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0011_alter_parsingsettings_setting_value'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pool_length', models.CharField(db_comment='Длина бассейна при расчете', max_length=4, verbose_name='Длина бассейна при расчете')),
+                ('swim_length', models.CharField(db_comment='Длина заплыва при расчете', max_length=5, verbose_name='Длина заплыва при расчете')),
+                ('data', models.JSONField(db_comment='Рассчитанные ряды показателей', default=dict, verbose_name='Данные')),
+                ('updated', models.DateTimeField(auto_now=True, db_comment='Дата расчета', verbose_name='Дата расчета')),
+                ('parsing_session', models.OneToOneField(db_comment='Сессия парсинга', on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга')),
+            ],
+            options={
+                'verbose_name': 'показатели сессии',
+                'verbose_name_plural': 'Показатели сессий',
+            },
+        ),
+    ]
@@ -0,0 +1,159 @@
+# Generated by Django 5.0.6 on 2026-10-19 16:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+SETTINGS_MODELS = (
+    'StartDistance', 'AverageSpeed', 'NumberCycles', 'Pace', 'SpeedDrop',
+    'LeaderGap', 'UnderwaterPart', 'BestStartReaction',
+    'BestStartFinishPercentage', 'HeatMap',
+)
+
+
+def remove_duplicates(apps, schema_editor):
+    """Оставляет последнюю запись для каждого значения уникального ключа."""
+    keys = [(name, ('parsing_session',)) for name in SETTINGS_MODELS]
+    keys += [
+        ('SwimSplitTime', ('protocol_data', 'distance')),
+        ('ParsingSettings', ('setting_name',)),
+    ]
+    for model_name, fields in keys:
+        model = apps.get_model('parsing', model_name)
+        newer = model.objects.filter(
+            id__gt=OuterRef('id'), **{field: OuterRef(field) for field in fields}
+        )
+        model.objects.filter(Exists(newer)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0012_sessionmetrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='averagespeed',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='beststartfinishpercentage',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='beststartreaction',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='heatmap',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='leadergap',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='numbercycles',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='pace',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='parsingsettings',
+            name='setting_name',
+            field=models.CharField(db_comment='Название настройки парсинга', max_length=256, unique=True, verbose_name='Название настройки'),
+        ),
+        migrations.AlterField(
+            model_name='protocoldata',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='speeddrop',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='startdistance',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AlterField(
+            model_name='swimsplittime',
+            name='protocol_data',
+            field=models.ForeignKey(db_comment='Данные заплыва', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.protocoldata', verbose_name='Данные заплыва'),
+        ),
+        migrations.AlterField(
+            model_name='underwaterpart',
+            name='parsing_session',
+            field=models.ForeignKey(db_comment='Сессия парсинга', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='parsing.parsingsession', verbose_name='Сессия парсинга'),
+        ),
+        migrations.AddIndex(
+            model_name='parsingsession',
+            index=models.Index(fields=['-created', '-id'], name='parsing_session_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='protocoldata',
+            index=models.Index(fields=['parsing_session', 'final_position'], name='protocol_session_final_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='protocoldata',
+            index=models.Index(fields=['parsing_session', 'start_position'], name='protocol_session_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='averagespeed',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_average_speed_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='beststartfinishpercentage',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_best_start_finish_percentage_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='beststartreaction',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_best_start_reaction_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='heatmap',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_heat_map_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='leadergap',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_leader_gap_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='numbercycles',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_number_cycles_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='pace',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_pace_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='speeddrop',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_speed_drop_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='startdistance',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_start_distance_session'),
+        ),
+        migrations.AddConstraint(
+            model_name='swimsplittime',
+            constraint=models.UniqueConstraint(fields=('protocol_data', 'distance'), name='unique_split_distance'),
+        ),
+        migrations.AddConstraint(
+            model_name='underwaterpart',
+            constraint=models.UniqueConstraint(fields=('parsing_session',), include=('status',), name='unique_underwater_part_session'),
+        ),
+    ]
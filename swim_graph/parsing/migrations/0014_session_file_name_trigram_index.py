@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-19 17:28
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0013_report_indexes_and_constraints'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='parsingsession',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('file_name'), name='gin_trgm_ops'), name='parsing_session_file_name_trgm'),
+        ),
+    ]
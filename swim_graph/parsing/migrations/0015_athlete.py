@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-19 17:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0014_session_file_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Athlete',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_comment='Фамилия Имя', max_length=64, verbose_name='Фамилия Имя')),
+                ('name_key', models.CharField(db_comment='Фамилия Имя в верхнем регистре без лишних пробелов и буквы Ё', max_length=64, verbose_name='Нормализованное имя')),
+                ('year_of_birth', models.IntegerField(blank=True, db_comment='Год рождения', null=True, verbose_name='Год рождения')),
+            ],
+            options={
+                'verbose_name': 'спортсмена',
+                'verbose_name_plural': 'Спортсмены',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='athlete',
+            constraint=models.UniqueConstraint(fields=('name_key', 'year_of_birth'), name='athlete_name_key_year_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='athlete',
+            constraint=models.UniqueConstraint(condition=models.Q(('year_of_birth__isnull', True)), fields=('name_key',), name='athlete_name_key_no_year_uniq'),
+        ),
+        migrations.AddField(
+            model_name='protocoldata',
+            name='athlete',
+            field=models.ForeignKey(blank=True, db_comment='Спортсмен', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='parsing.athlete', verbose_name='Спортсмен'),
+        ),
+        migrations.AddIndex(
+            model_name='protocoldata',
+            index=models.Index(fields=['athlete', 'parsing_session'], name='protocol_athlete_session_idx'),
+        ),
+    ]
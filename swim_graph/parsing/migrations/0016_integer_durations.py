@@ -0,0 +1,70 @@
+# Generated by Django 5.0.6 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+# Столбцы времени: (таблица, столбец, комментарий)
+DURATION_COLUMNS = (
+    ('parsing_protocoldata', 'reaction_time', 'Время реакции'),
+    ('parsing_protocoldata', 'result', 'Результат'),
+    ('parsing_swimsplittime', 'split_time', 'Время на промежуточной дистанции'),
+)
+
+
+def to_centiseconds_sql(table, column, comment):
+    """
+    Переводит столбец time в целое число сотых долей секунды на месте:
+    значения пересчитываются тем же запросом, который меняет тип столбца.
+    """
+    return [
+        f'ALTER TABLE "{table}" ALTER COLUMN "{column}" DROP DEFAULT',
+        f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE integer '
+        f'USING round(extract(epoch FROM "{column}") * 100)::integer',
+        f"COMMENT ON COLUMN \"{table}\".\"{column}\" IS '{comment} в сотых долях секунды'",
+    ]
+
+
+def to_time_sql(table, column, comment):
+    """Возвращает столбец к типу time (время меньше часа)."""
+    return [
+        f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE time '
+        f'USING make_interval(secs => "{column}" / 100.0)::time',
+        f"COMMENT ON COLUMN \"{table}\".\"{column}\" IS '{comment}'",
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0015_athlete'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                statement for column in DURATION_COLUMNS
+                for statement in to_centiseconds_sql(*column)
+            ],
+            reverse_sql=[
+                statement for column in DURATION_COLUMNS
+                for statement in to_time_sql(*column)
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='protocoldata',
+                    name='reaction_time',
+                    field=models.IntegerField(blank=True, db_comment='Время реакции в сотых долях секунды', null=True, verbose_name='Время реакции (сотые доли секунды)'),
+                ),
+                migrations.AlterField(
+                    model_name='protocoldata',
+                    name='result',
+                    field=models.IntegerField(db_comment='Результат в сотых долях секунды', default=0, verbose_name='Результат (сотые доли секунды)'),
+                ),
+                migrations.AlterField(
+                    model_name='swimsplittime',
+                    name='split_time',
+                    field=models.IntegerField(blank=True, db_comment='Время на промежуточной дистанции в сотых долях секунды', null=True, verbose_name='Время на промежуточной дистанции (сотые доли секунды)'),
+                ),
+            ],
+        ),
+    ]
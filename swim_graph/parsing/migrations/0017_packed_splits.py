@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-19 18:52
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0016_integer_durations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsingsession',
+            name='split_distances',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, db_comment='Промежуточные дистанции упакованных отрезков участников', default=list, size=None, verbose_name='Промежуточные дистанции'),
+        ),
+        migrations.AddField(
+            model_name='protocoldata',
+            name='packed_splits',
+            field=models.BinaryField(blank=True, db_comment='Времена на промежуточных дистанциях сессии (int32, сотые доли секунды)', null=True, verbose_name='Упакованные времена на промежуточных дистанциях'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-19 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0017_packed_splits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.IntegerField(db_comment='Год создания сессий', verbose_name='Сезон')),
+                ('pool_length', models.CharField(db_comment='Длина бассейна', max_length=4, verbose_name='Длина бассейна')),
+                ('swim_length', models.CharField(db_comment='Длина заплыва', max_length=5, verbose_name='Длина заплыва')),
+                ('final_category', models.CharField(blank=True, db_comment='Категория финала (пустая строка - без категории)', default='', max_length=24, verbose_name='Категория финала')),
+                ('year_of_birth', models.IntegerField(db_comment='Год рождения (0 - не указан)', default=0, verbose_name='Год рождения')),
+                ('participants', models.IntegerField(db_comment='Количество участников', default=0, verbose_name='Участники')),
+                ('result_count', models.IntegerField(db_comment='Количество результатов', default=0, verbose_name='Результаты')),
+                ('result_sum', models.BigIntegerField(db_comment='Сумма результатов в сотых долях секунды', default=0, verbose_name='Сумма результатов')),
+                ('result_best', models.IntegerField(blank=True, db_comment='Лучший результат в сотых долях секунды', null=True, verbose_name='Лучший результат')),
+                ('reaction_count', models.IntegerField(db_comment='Количество времен реакции', default=0, verbose_name='Времена реакции')),
+                ('reaction_sum', models.BigIntegerField(db_comment='Сумма времен реакции в сотых долях секунды', default=0, verbose_name='Сумма времен реакции')),
+                ('reaction_best', models.IntegerField(blank=True, db_comment='Лучшее время реакции в сотых долях секунды', null=True, verbose_name='Лучшее время реакции')),
+            ],
+            options={
+                'verbose_name': 'сводные показатели результатов',
+                'verbose_name_plural': 'Сводные показатели результатов',
+            },
+        ),
+        migrations.CreateModel(
+            name='SplitStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.IntegerField(db_comment='Год создания сессий', verbose_name='Сезон')),
+                ('pool_length', models.CharField(db_comment='Длина бассейна', max_length=4, verbose_name='Длина бассейна')),
+                ('swim_length', models.CharField(db_comment='Длина заплыва', max_length=5, verbose_name='Длина заплыва')),
+                ('final_category', models.CharField(blank=True, db_comment='Категория финала (пустая строка - без категории)', default='', max_length=24, verbose_name='Категория финала')),
+                ('year_of_birth', models.IntegerField(db_comment='Год рождения (0 - не указан)', default=0, verbose_name='Год рождения')),
+                ('distance', models.IntegerField(db_comment='Дистанция', verbose_name='Дистанция')),
+                ('split_count', models.IntegerField(db_comment='Количество отрезков', default=0, verbose_name='Отрезки')),
+                ('split_sum', models.BigIntegerField(db_comment='Сумма времени отрезков в сотых долях секунды', default=0, verbose_name='Сумма времени')),
+                ('split_best', models.IntegerField(blank=True, db_comment='Лучшее время отрезка в сотых долях секунды', null=True, verbose_name='Лучшее время')),
+            ],
+            options={
+                'verbose_name': 'сводные показатели отрезков',
+                'verbose_name_plural': 'Сводные показатели отрезков',
+            },
+        ),
+        migrations.CreateModel(
+            name='StatisticsRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_session_id', models.IntegerField(db_comment='Идентификатор последней учтенной сессии', default=0, verbose_name='Последняя учтенная сессия')),
+                ('updated', models.DateTimeField(auto_now=True, db_comment='Дата обновления', verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'обновление сводных показателей',
+                'verbose_name_plural': 'Обновления сводных показателей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resultstatistics',
+            constraint=models.UniqueConstraint(fields=('season', 'pool_length', 'swim_length', 'final_category', 'year_of_birth'), name='result_statistics_group_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='splitstatistics',
+            constraint=models.UniqueConstraint(fields=('season', 'pool_length', 'swim_length', 'final_category', 'year_of_birth', 'distance'), name='split_statistics_group_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-19 18:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parsing', '0018_statistics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsingsession',
+            name='updated',
+            field=models.DateTimeField(db_comment='Дата изменения данных или настроек отчета сессии', default=django.utils.timezone.now, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='parsingsession',
+            name='version',
+            field=models.PositiveIntegerField(db_comment='Версия данных и настроек отчета сессии', default=1, verbose_name='Версия'),
+        ),
+        # Существующие сессии не менялись после создания
+        migrations.RunSQL(
+            'UPDATE parsing_parsingsession SET updated = created',
+            migrations.RunSQL.noop,
+        ),
+    ]
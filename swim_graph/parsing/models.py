@@ -1,10 +1,18 @@
 """parsing Models"""
-from datetime import time
+from functools import cached_property
+from typing import List, Optional
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 from swim_graph_utils.constants import (
     PoolLength, SwimLength
 )
+from swim_graph_utils.time_utils import format_centiseconds, to_seconds
+from .splits import unpack_split_list
 
 
 class ParsingSession(models.Model):
@@ -39,13 +47,87 @@ class ParsingSession(models.Model):
         verbose_name='Длина заплыва',
         db_comment='Длина заплыва',
     )
+    split_distances = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        verbose_name='Промежуточные дистанции',
+        db_comment='Промежуточные дистанции упакованных отрезков участников',
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Версия',
+        db_comment='Версия данных и настроек отчета сессии',
+    )
+    updated = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата изменения',
+        db_comment='Дата изменения данных или настроек отчета сессии',
+    )
 
     def __str__(self) -> str:
         return f'Сессия парсинга: {self.file_name} от {self.created}'
 
+    @property
+    def etag(self) -> str:
+        """
+        Сильный ETag отчета сессии (без кавычек): версия и дата изменения.
+        """
+        return f'{self.id}.{self.version}.{int(self.updated.timestamp() * 1000000)}'
+
     class Meta:
         verbose_name = 'сессию парсинга'
         verbose_name_plural = 'Сессии парсинга'
+        indexes = [
+            models.Index(
+                fields=['-created', '-id'], name='parsing_session_created_idx'
+            ),
+            # Триграммный индекс для поиска по названию (icontains)
+            GinIndex(
+                OpClass(Upper('file_name'), name='gin_trgm_ops'),
+                name='parsing_session_file_name_trgm'
+            ),
+        ]
+
+
+class Athlete(models.Model):
+    """Спортсмены: участники заплывов разных сессий."""
+
+    name = models.CharField(
+        max_length=64,
+        verbose_name='Фамилия Имя',
+        db_comment='Фамилия Имя',
+    )
+    name_key = models.CharField(
+        max_length=64,
+        verbose_name='Нормализованное имя',
+        db_comment='Фамилия Имя в верхнем регистре без лишних пробелов и буквы Ё',
+    )
+    year_of_birth = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Год рождения',
+        db_comment='Год рождения',
+    )
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.year_of_birth or "-"})'
+
+    class Meta:
+        verbose_name = 'спортсмена'
+        verbose_name_plural = 'Спортсмены'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name_key', 'year_of_birth'],
+                name='athlete_name_key_year_uniq'
+            ),
+            # NULL не равен NULL, поэтому спортсмены без года рождения ограничены отдельно
+            models.UniqueConstraint(
+                fields=['name_key'],
+                condition=models.Q(year_of_birth__isnull=True),
+                name='athlete_name_key_no_year_uniq'
+            ),
+        ]
 
 
 class ProtocolData(models.Model):
@@ -54,9 +136,19 @@ class ProtocolData(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
+    athlete = models.ForeignKey(
+        Athlete,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        verbose_name='Спортсмен',
+        db_comment='Спортсмен',
+    )
     initials = models.CharField(
         max_length=64,
         null=False,
@@ -89,17 +181,17 @@ class ProtocolData(models.Model):
         verbose_name='Финишная позиция (место)',
         db_comment='Финишная позиция (место)',
     )
-    reaction_time = models.TimeField(
+    reaction_time = models.IntegerField(
         null=True,
         blank=True,
-        verbose_name='Время реакции',
-        db_comment='Время реакции',
+        verbose_name='Время реакции (сотые доли секунды)',
+        db_comment='Время реакции в сотых долях секунды',
     )
-    result = models.TimeField(
+    result = models.IntegerField(
         null=False,
-        default=time(0, 0),
-        verbose_name="Результат",
-        db_comment='Результат',
+        default=0,
+        verbose_name='Результат (сотые доли секунды)',
+        db_comment='Результат в сотых долях секунды',
     )
     points = models.IntegerField(
         null=True,
@@ -107,13 +199,71 @@ class ProtocolData(models.Model):
         verbose_name='Очки',
         db_comment='Очки',
     )
+    packed_splits = models.BinaryField(
+        null=True,
+        blank=True,
+        verbose_name='Упакованные времена на промежуточных дистанциях',
+        db_comment='Времена на промежуточных дистанциях сессии (int32, сотые доли секунды)',
+    )
 
     def __str__(self) -> str:
         return f'{self.initials}: {self.final_position}-е место'
 
+    @cached_property
+    def split_times(self) -> List['SwimSplitTime']:
+        """
+        Отрезки участника по дистанциям независимо от способа хранения.
+        Упакованные отрезки возвращаются несохраненными объектами SwimSplitTime
+        по всем промежуточным дистанциям сессии.
+        """
+        if self.packed_splits is None:
+            return list(self.swimsplittime_set.all())
+        return [
+            SwimSplitTime(protocol_data=self, distance=distance, split_time=split_time)
+            for distance, split_time in zip(
+                self.parsing_session.split_distances, unpack_split_list(self.packed_splits)
+            )
+        ]
+
+    @property
+    def result_seconds(self) -> Optional[float]:
+        """Результат в секундах."""
+        return to_seconds(self.result)
+
+    @property
+    def reaction_seconds(self) -> Optional[float]:
+        """Время реакции в секундах."""
+        return to_seconds(self.reaction_time)
+
+    @property
+    def result_display(self) -> str:
+        """Результат для отображения (мм:сс.сс)."""
+        return format_centiseconds(self.result)
+
+    @property
+    def reaction_time_display(self) -> Optional[str]:
+        """Время реакции для отображения (мм:сс.сс)."""
+        if self.reaction_time is None:
+            return None
+        return format_centiseconds(self.reaction_time)
+
     class Meta:
         verbose_name = 'данные по заплыву'
         verbose_name_plural = 'Данные по заплывам'
+        indexes = [
+            models.Index(
+                fields=['parsing_session', 'final_position'],
+                name='protocol_session_final_idx'
+            ),
+            models.Index(
+                fields=['parsing_session', 'start_position'],
+                name='protocol_session_start_idx'
+            ),
+            models.Index(
+                fields=['athlete', 'parsing_session'],
+                name='protocol_athlete_session_idx'
+            ),
+        ]
 
 
 class SwimSplitTime(models.Model):
@@ -122,6 +272,7 @@ class SwimSplitTime(models.Model):
     protocol_data = models.ForeignKey(
         ProtocolData,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Данные заплыва',
         db_comment='Данные заплыва',
     )
@@ -130,19 +281,84 @@ class SwimSplitTime(models.Model):
         verbose_name='Дистанция',
         db_comment='Дистанция',
     )
-    split_time = models.TimeField(
+    split_time = models.IntegerField(
         null=True,
         blank=True,
-        verbose_name='Время на промежуточной дистанции',
-        db_comment='Время на промежуточной дистанции',
+        verbose_name='Время на промежуточной дистанции (сотые доли секунды)',
+        db_comment='Время на промежуточной дистанции в сотых долях секунды',
     )
 
     def __str__(self) -> str:
-        return f'{self.distance} м - {self.split_time}'
+        return f'{self.distance} м - {self.split_time_display or "-"}'
+
+    @property
+    def split_seconds(self) -> Optional[float]:
+        """Время на промежуточной дистанции в секундах."""
+        return to_seconds(self.split_time)
+
+    @property
+    def split_time_display(self) -> Optional[str]:
+        """Время на промежуточной дистанции для отображения (мм:сс.сс)."""
+        if self.split_time is None:
+            return None
+        return format_centiseconds(self.split_time)
 
     class Meta:
         verbose_name = 'Время на промежуточной дистанции'
         verbose_name_plural = 'Время на промежуточных дистанциях'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['protocol_data', 'distance'], name='unique_split_distance'
+            ),
+        ]
+
+
+class SessionMetrics(models.Model):
+    """Рассчитанные при загрузке показатели отчета по сессии парсинга."""
+
+    parsing_session = models.OneToOneField(
+        ParsingSession,
+        on_delete=models.CASCADE,
+        verbose_name='Сессия парсинга',
+        db_comment='Сессия парсинга',
+    )
+    pool_length = models.CharField(
+        max_length=4,
+        verbose_name='Длина бассейна при расчете',
+        db_comment='Длина бассейна при расчете',
+    )
+    swim_length = models.CharField(
+        max_length=5,
+        verbose_name='Длина заплыва при расчете',
+        db_comment='Длина заплыва при расчете',
+    )
+    data = models.JSONField(
+        default=dict,
+        verbose_name='Данные',
+        db_comment='Рассчитанные ряды показателей'
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата расчета',
+        db_comment='Дата расчета',
+    )
+
+    def __str__(self) -> str:
+        return f'Показатели сессии: {self.parsing_session_id} от {self.updated}'
+
+    def is_actual(self, session: ParsingSession) -> bool:
+        """
+        Проверяет, соответствуют ли показатели текущим параметрам сессии.
+
+        :param session: Сессия парсинга.
+        :return: True, если пересчет не требуется.
+        """
+        return (self.pool_length == session.pool_length and
+                self.swim_length == session.swim_length)
+
+    class Meta:
+        verbose_name = 'показатели сессии'
+        verbose_name_plural = 'Показатели сессий'
 
 
 class StartDistance(models.Model):
@@ -151,6 +367,7 @@ class StartDistance(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -172,6 +389,12 @@ class StartDistance(models.Model):
     class Meta:
         verbose_name = 'настройку для статрового отрезка'
         verbose_name_plural = 'Настройки для статрового отрезка'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_start_distance_session'
+            ),
+        ]
 
 
 class AverageSpeed(models.Model):
@@ -180,6 +403,7 @@ class AverageSpeed(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -196,6 +420,12 @@ class AverageSpeed(models.Model):
     class Meta:
         verbose_name = 'настройку для средней скорости'
         verbose_name_plural = 'Настройки для средней скорости'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_average_speed_session'
+            ),
+        ]
 
 
 class NumberCycles(models.Model):
@@ -204,6 +434,7 @@ class NumberCycles(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -225,6 +456,12 @@ class NumberCycles(models.Model):
     class Meta:
         verbose_name = 'настройку для кол-во циклов на лучшем отрезке'
         verbose_name_plural = 'Настройки для кол-ва циклов на лучшем отрезке'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_number_cycles_session'
+            ),
+        ]
 
 
 class Pace(models.Model):
@@ -233,6 +470,7 @@ class Pace(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -254,6 +492,12 @@ class Pace(models.Model):
     class Meta:
         verbose_name = 'настройку для темпа на лучшем отрезке'
         verbose_name_plural = 'Настройки для темпа на лучшем отрезке'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_pace_session'
+            ),
+        ]
 
 
 class SpeedDrop(models.Model):
@@ -262,6 +506,7 @@ class SpeedDrop(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -278,6 +523,12 @@ class SpeedDrop(models.Model):
     class Meta:
         verbose_name = 'настройку для падения скорости'
         verbose_name_plural = 'Настройки для падения скорости'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_speed_drop_session'
+            ),
+        ]
 
 
 class LeaderGap(models.Model):
@@ -286,6 +537,7 @@ class LeaderGap(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -302,6 +554,12 @@ class LeaderGap(models.Model):
     class Meta:
         verbose_name = 'настройку для отставания от лидера'
         verbose_name_plural = 'Настройки для отставания от лидера'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_leader_gap_session'
+            ),
+        ]
 
 
 class UnderwaterPart(models.Model):
@@ -310,6 +568,7 @@ class UnderwaterPart(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -331,6 +590,12 @@ class UnderwaterPart(models.Model):
     class Meta:
         verbose_name = 'настройку для подводной части'
         verbose_name_plural = 'Настройки для подводной части'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_underwater_part_session'
+            ),
+        ]
 
 
 class BestStartReaction(models.Model):
@@ -339,6 +604,7 @@ class BestStartReaction(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -355,6 +621,12 @@ class BestStartReaction(models.Model):
     class Meta:
         verbose_name = 'настройку для лучшей стартовой реакции'
         verbose_name_plural = 'Настройки для лучшей стартовой реакции'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_best_start_reaction_session'
+            ),
+        ]
 
 
 class BestStartFinishPercentage(models.Model):
@@ -366,6 +638,7 @@ class BestStartFinishPercentage(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -387,6 +660,12 @@ class BestStartFinishPercentage(models.Model):
                        'стартового и финишного отрезков'
         verbose_name_plural = 'Настройки для лучшего процента изменения ' \
                               'стартового и финишного отрезков'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_best_start_finish_percentage_session'
+            ),
+        ]
 
 
 class HeatMap(models.Model):
@@ -394,6 +673,7 @@ class HeatMap(models.Model):
     parsing_session = models.ForeignKey(
         ParsingSession,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Сессия парсинга',
         db_comment='Сессия парсинга',
     )
@@ -410,6 +690,12 @@ class HeatMap(models.Model):
     class Meta:
         verbose_name = 'настройку для тепловой карты'
         verbose_name_plural = 'Настройки для тепловой карты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parsing_session'], include=['status'],
+                name='unique_heat_map_session'
+            ),
+        ]
 
 
 class ParsingSettings(models.Model):
@@ -417,6 +703,7 @@ class ParsingSettings(models.Model):
     setting_name = models.CharField(
         max_length=256,
         null=False,
+        unique=True,
         verbose_name='Название настройки',
         db_comment='Название настройки парсинга',
     )
@@ -432,3 +719,155 @@ class ParsingSettings(models.Model):
     class Meta:
         verbose_name = 'настройку парсинга'
         verbose_name_plural = 'Настройки парсинга'
+
+
+class StatisticsGroup(models.Model):
+    """Ключ сводных показателей: сезон, заплыв, категория финала и год рождения."""
+
+    season = models.IntegerField(
+        verbose_name='Сезон',
+        db_comment='Год создания сессий',
+    )
+    pool_length = models.CharField(
+        max_length=4,
+        verbose_name='Длина бассейна',
+        db_comment='Длина бассейна',
+    )
+    swim_length = models.CharField(
+        max_length=5,
+        verbose_name='Длина заплыва',
+        db_comment='Длина заплыва',
+    )
+    final_category = models.CharField(
+        max_length=24,
+        blank=True,
+        default='',
+        verbose_name='Категория финала',
+        db_comment='Категория финала (пустая строка - без категории)',
+    )
+    year_of_birth = models.IntegerField(
+        default=0,
+        verbose_name='Год рождения',
+        db_comment='Год рождения (0 - не указан)',
+    )
+
+    class Meta:
+        abstract = True
+
+
+class ResultStatistics(StatisticsGroup):
+    """Сводные показатели результатов и стартовой реакции участников."""
+
+    participants = models.IntegerField(
+        default=0,
+        verbose_name='Участники',
+        db_comment='Количество участников',
+    )
+    result_count = models.IntegerField(
+        default=0,
+        verbose_name='Результаты',
+        db_comment='Количество результатов',
+    )
+    result_sum = models.BigIntegerField(
+        default=0,
+        verbose_name='Сумма результатов',
+        db_comment='Сумма результатов в сотых долях секунды',
+    )
+    result_best = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Лучший результат',
+        db_comment='Лучший результат в сотых долях секунды',
+    )
+    reaction_count = models.IntegerField(
+        default=0,
+        verbose_name='Времена реакции',
+        db_comment='Количество времен реакции',
+    )
+    reaction_sum = models.BigIntegerField(
+        default=0,
+        verbose_name='Сумма времен реакции',
+        db_comment='Сумма времен реакции в сотых долях секунды',
+    )
+    reaction_best = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Лучшее время реакции',
+        db_comment='Лучшее время реакции в сотых долях секунды',
+    )
+
+    def __str__(self) -> str:
+        return f'Результаты {self.season}: {self.swim_length} ({self.pool_length})'
+
+    class Meta:
+        verbose_name = 'сводные показатели результатов'
+        verbose_name_plural = 'Сводные показатели результатов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['season', 'pool_length', 'swim_length', 'final_category', 'year_of_birth'],
+                name='result_statistics_group_uniq'
+            ),
+        ]
+
+
+class SplitStatistics(StatisticsGroup):
+    """Сводные показатели времени на промежуточных дистанциях."""
+
+    distance = models.IntegerField(
+        verbose_name='Дистанция',
+        db_comment='Дистанция',
+    )
+    split_count = models.IntegerField(
+        default=0,
+        verbose_name='Отрезки',
+        db_comment='Количество отрезков',
+    )
+    split_sum = models.BigIntegerField(
+        default=0,
+        verbose_name='Сумма времени',
+        db_comment='Сумма времени отрезков в сотых долях секунды',
+    )
+    split_best = models.IntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Лучшее время',
+        db_comment='Лучшее время отрезка в сотых долях секунды',
+    )
+
+    def __str__(self) -> str:
+        return f'Отрезки {self.season}: {self.swim_length} ({self.pool_length}), {self.distance} м'
+
+    class Meta:
+        verbose_name = 'сводные показатели отрезков'
+        verbose_name_plural = 'Сводные показатели отрезков'
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'season', 'pool_length', 'swim_length', 'final_category',
+                    'year_of_birth', 'distance'
+                ],
+                name='split_statistics_group_uniq'
+            ),
+        ]
+
+
+class StatisticsRefresh(models.Model):
+    """Состояние обновления сводных показателей."""
+
+    last_session_id = models.IntegerField(
+        default=0,
+        verbose_name='Последняя учтенная сессия',
+        db_comment='Идентификатор последней учтенной сессии',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления',
+        db_comment='Дата обновления',
+    )
+
+    def __str__(self) -> str:
+        return f'Сводные показатели: сессия {self.last_session_id} от {self.updated}'
+
+    class Meta:
+        verbose_name = 'обновление сводных показателей'
+        verbose_name_plural = 'Обновления сводных показателей'
@@ -0,0 +1,155 @@
+"""Parsing Pagination"""
+import base64
+import hashlib
+import json
+import time
+from datetime import datetime
+from functools import cached_property
+from typing import Any, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+
+
+# Ключи упорядочивания, для которых доступна пагинация по курсору
+KEYSET_ORDERING = ('-created', '-id')
+
+# Время хранения количества найденных сессий в кеше (сек)
+COUNT_CACHE_TIMEOUT = 300
+
+# Ключ кеша с версией списка сессий
+COUNT_VERSION_CACHE_KEY = 'sessions_count_version'
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Пагинатор по номерам страниц, кеширующий общее количество объектов,
+    чтобы не выполнять COUNT(*) при каждом переходе по страницам.
+    """
+
+    def __init__(self, object_list: QuerySet, per_page: int, cache_key: str, **kwargs) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self) -> int:
+        """Общее количество объектов (значение из кеша, если есть)."""
+        return cache.get_or_set(
+            self.cache_key, lambda: Paginator.count.func(self), COUNT_CACHE_TIMEOUT
+        )
+
+
+class KeysetPage:
+    """Страница пагинации по курсору (created, id)."""
+
+    def __init__(
+            self, object_list: List[Any],
+            next_cursor: Optional[str], previous_cursor: Optional[str]
+        ) -> None:
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+def get_keyset_page(queryset: QuerySet, cursor: str, per_page: int) -> KeysetPage:
+    """
+    Возвращает страницу, следующую за позицией курсора (или предшествующую ей).
+    Фильтр по (created, id) использует индекс и не зависит от глубины страницы.
+
+    :param queryset: Набор объектов, упорядоченный по KEYSET_ORDERING.
+    :param cursor: Курсор, полученный с предыдущей страницы.
+    :param per_page: Количество объектов на странице.
+    :return: Страница объектов.
+    """
+    created, object_id, backwards = decode_cursor(cursor)
+    if backwards:
+        queryset = queryset.filter(created__gte=created).filter(
+            Q(created__gt=created) | Q(id__gt=object_id)
+        ).order_by('created', 'id')
+    else:
+        queryset = queryset.filter(created__lte=created).filter(
+            Q(created__lt=created) | Q(id__lt=object_id)
+        ).order_by(*KEYSET_ORDERING)
+
+    object_list = list(queryset[:per_page + 1])
+    has_more = len(object_list) > per_page
+    object_list = object_list[:per_page]
+    if backwards:
+        object_list.reverse()
+
+    if not object_list:
+        return KeysetPage([], None, None)
+
+    has_next = has_more if not backwards else True
+    has_previous = has_more if backwards else True
+    return KeysetPage(
+        object_list,
+        encode_cursor(object_list[-1]) if has_next else None,
+        encode_cursor(object_list[0], backwards=True) if has_previous else None,
+    )
+
+
+def encode_cursor(obj: Any, backwards: bool = False) -> str:
+    """
+    Кодирует позицию объекта в непрозрачный курсор.
+
+    :param obj: Объект, после (или перед) которым начинается страница.
+    :param backwards: Направление перехода (к предыдущим страницам).
+    :return: Курсор.
+    """
+    payload = json.dumps([obj.created.isoformat(), obj.id, backwards])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, bool]:
+    """
+    Декодирует курсор.
+
+    :param cursor: Курсор.
+    :return: Дата создания, идентификатор и направление перехода.
+    :raises ValueError: Если курсор некорректен.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created, object_id, backwards = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created), int(object_id), bool(backwards)
+    except (TypeError, ValueError, UnicodeDecodeError) as error:
+        raise ValueError('Некорректный курсор') from error
+
+
+def get_count_cache_key(params: str) -> str:
+    """
+    Возвращает ключ кеша количества сессий для набора параметров поиска.
+    Ключ включает версию списка сессий, которая меняется при добавлении
+    и удалении сессий, поэтому устаревшие значения не используются.
+
+    :param params: Параметры поиска (строка запроса без номера страницы).
+    :return: Ключ кеша.
+    """
+    version = cache.get_or_set(COUNT_VERSION_CACHE_KEY, time.time_ns, None)
+    return f'sessions_count:{version}:{hashlib.md5(params.encode()).hexdigest()}'
+
+
+def invalidate_sessions_count() -> None:
+    """
+    Сбрасывает закешированные количества сессий.
+    Вытесненная из кеша версия задается текущим временем (нс), а не 1,
+    чтобы не вернуться к версии, под которой сохранены устаревшие количества.
+    """
+    try:
+        cache.incr(COUNT_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(COUNT_VERSION_CACHE_KEY, time.time_ns(), None)
@@ -0,0 +1,249 @@
+"""Parsing Athlete Progression"""
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import F, Q
+
+from swim_graph_utils.constants import CHART_CONFIG
+from swim_graph_utils.time_utils import to_seconds
+from .metrics import seconds_array, to_cells
+from .models import Athlete, ProtocolData
+from .splits import unpack_split_list
+from .utils import get_chart_template
+
+
+# Количество последних заплывов на диаграмме скорости по отрезкам
+PROFILE_RACES = 10
+
+
+def get_athlete_races(athlete: Athlete, season: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Возвращает все заплывы спортсмена одним запросом.
+    Промежуточные отрезки собираются в массивы агрегатом ArrayAgg
+    (упорядоченными по дистанции), время возвращается в сотых долях секунды.
+    Упакованные отрезки распаковываются по дистанциям сессии.
+
+    :param athlete: Спортсмен.
+    :param season: Год сессий (None - все сессии).
+    :return: Заплывы спортсмена в порядке создания сессий.
+    """
+    races = ProtocolData.objects.filter(athlete=athlete)
+    has_splits = Q(swimsplittime__isnull=False)
+    if season:
+        races = races.filter(parsing_session__created__year=season)
+
+    races = list(
+        races.annotate(
+            created=F('parsing_session__created'),
+            file_name=F('parsing_session__file_name'),
+            pool_length=F('parsing_session__pool_length'),
+            swim_length=F('parsing_session__swim_length'),
+            split_distances=ArrayAgg(
+                'swimsplittime__distance', filter=has_splits,
+                ordering='swimsplittime__distance', default=[]
+            ),
+            split_times=ArrayAgg(
+                'swimsplittime__split_time', filter=has_splits,
+                ordering='swimsplittime__distance', default=[]
+            ),
+            session_split_distances=F('parsing_session__split_distances'),
+        )
+        .values(
+            'parsing_session_id', 'created', 'file_name', 'pool_length', 'swim_length',
+            'final_position', 'points', 'result', 'reaction_time',
+            'split_distances', 'split_times', 'session_split_distances', 'packed_splits',
+        )
+        .order_by('created', 'parsing_session_id')
+    )
+
+    for race in races:
+        packed = race.pop('packed_splits')
+        session_split_distances = race.pop('session_split_distances')
+        if packed is not None:
+            race['split_distances'] = session_split_distances
+            race['split_times'] = unpack_split_list(packed)
+    return races
+
+
+class AthleteProgression:
+    """
+    Ряды показателей спортсмена по всем его заплывам
+    и описания диаграмм динамики для отрисовки на стороне клиента.
+    """
+
+    def __init__(self, athlete: Athlete, races: List[Dict[str, Any]]) -> None:
+        self.athlete = athlete
+        self.races = races
+
+    @cached_property
+    def dates(self) -> List[str]:
+        """Даты заплывов."""
+        return [race['created'].date().isoformat() for race in self.races]
+
+    @cached_property
+    def result_seconds(self) -> np.ndarray:
+        """Итоговые результаты (сек)."""
+        return seconds_array([race['result'] or None for race in self.races])
+
+    @cached_property
+    def reaction_seconds(self) -> np.ndarray:
+        """Время стартовой реакции (сек)."""
+        return seconds_array([race['reaction_time'] or None for race in self.races])
+
+    @cached_property
+    def average_speeds(self) -> np.ndarray:
+        """Средняя скорость на дистанции (м/сек)."""
+        swim_lengths = np.array(
+            [int(race['swim_length'].replace('m', '')) for race in self.races], dtype=np.float64
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return swim_lengths / self.result_seconds
+
+    @cached_property
+    def lap_speeds(self) -> List[np.ndarray]:
+        """
+        Скорость на каждом отрезке заплыва (м/сек).
+        Хранимые отрезки - накопленное время, поэтому время отрезка - разность
+        с предыдущим имеющимся отрезком (как в analytics.get_packed_split_metrics).
+        """
+        speeds = []
+        for race in self.races:
+            seconds = seconds_array([value or None for value in race['split_times']])
+            present = ~np.isnan(seconds)
+            laps = np.full(seconds.shape, np.nan)
+            laps[present] = np.diff(seconds[present], prepend=0.0)
+            pool_length = int(race['pool_length'].replace('m', ''))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                speeds.append(np.where(laps > 0, pool_length / laps, np.nan))
+        return speeds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Возвращает ряды показателей и описания диаграмм в виде словаря для JSON.
+        Формат диаграмм совпадает с ChartGenerator.generate_chart_specs.
+
+        :return: Словарь с данными спортсмена, заплывами и диаграммами.
+        """
+        results = to_cells(self.result_seconds)
+        reaction_times = to_cells(self.reaction_seconds)
+        races = []
+        for index, race in enumerate(self.races):
+            races.append({
+                'session_id': race['parsing_session_id'],
+                'file_name': race['file_name'],
+                'date': self.dates[index],
+                'pool_length': race['pool_length'],
+                'swim_length': race['swim_length'],
+                'final_position': race['final_position'],
+                'points': race['points'],
+                'result': results[index],
+                'reaction_time': reaction_times[index],
+                'split_distances': race['split_distances'],
+                'split_times': [
+                    to_seconds(value) for value in race['split_times']
+                ],
+                'lap_speeds': to_cells(self.lap_speeds[index]),
+            })
+
+        return {
+            'athlete': {
+                'id': self.athlete.id,
+                'name': self.athlete.name,
+                'year_of_birth': self.athlete.year_of_birth,
+            },
+            'races': races,
+            'config': CHART_CONFIG,
+            'template': get_chart_template(),
+            'charts': {
+                'result_chart': self.build_result_spec(),
+                'reaction_chart': self.build_reaction_spec(),
+                'average_speed_chart': self.build_average_speed_spec(),
+                'lap_speed_chart': self.build_lap_speed_spec(),
+            },
+        }
+
+    def build_result_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание диаграммы результатов: отдельная линия для каждой длины заплыва.
+        """
+        results = to_cells(self.result_seconds)
+        lines: Dict[str, Dict[str, list]] = {}
+        for index, race in enumerate(self.races):
+            line = lines.setdefault(race['swim_length'], {'x': [], 'y': []})
+            line['x'].append(self.dates[index])
+            line['y'].append(results[index])
+
+        return {
+            'data': [
+                {'mode': 'lines+markers', 'name': swim_length, 'type': 'scatter', **line}
+                for swim_length, line in lines.items()
+            ],
+            'layout': {
+                'yaxis': {'title': {'text': 'Результат (сек)'}},
+                'legend': {'title': {'text': 'Дистанция'}},
+            },
+        }
+
+    def build_reaction_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание диаграммы времени стартовой реакции.
+        """
+        return {
+            'data': [{
+                'marker': {'color': 'blue'},
+                'mode': 'lines+markers',
+                'name': 'Стартовая реакция (сек)',
+                'x': self.dates,
+                'y': to_cells(self.reaction_seconds),
+                'type': 'scatter',
+            }],
+            'layout': {
+                'yaxis': {'title': {'text': 'Стартовая реакция (сек)'}},
+            },
+        }
+
+    def build_average_speed_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание диаграммы средней скорости на дистанции.
+        Скорость сравнима между заплывами разной длины.
+        """
+        return {
+            'data': [{
+                'marker': {'color': 'green'},
+                'mode': 'lines+markers',
+                'name': 'Средняя скорость (м/сек)',
+                'text': [race['swim_length'] for race in self.races],
+                'x': self.dates,
+                'y': to_cells(self.average_speeds),
+                'type': 'scatter',
+            }],
+            'layout': {
+                'yaxis': {'title': {'text': 'Скорость (м/сек)'}},
+            },
+        }
+
+    def build_lap_speed_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание диаграммы скорости по отрезкам последних заплывов.
+        """
+        data = []
+        start = max(len(self.races) - PROFILE_RACES, 0)
+        for index in range(start, len(self.races)):
+            race = self.races[index]
+            data.append({
+                'mode': 'lines+markers',
+                'name': f"{self.dates[index]} {race['swim_length']}",
+                'x': race['split_distances'],
+                'y': to_cells(self.lap_speeds[index]),
+                'type': 'scatter',
+            })
+
+        return {
+            'data': data,
+            'layout': {
+                'xaxis': {'title': {'text': 'Дистанция (м)'}},
+                'yaxis': {'title': {'text': 'Скорость (м/сек)'}},
+            },
+        }
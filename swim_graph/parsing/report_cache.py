@@ -0,0 +1,187 @@
+"""Parsing Report Cache"""
+import gzip
+import time
+from typing import Any, Callable, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Префикс ключей кеша отчетов
+REPORT_CACHE_PREFIX = 'report'
+
+# Ключ кеша с общей версией отчетов (меняется при изменении глобальных настроек)
+REPORTS_VERSION_CACHE_KEY = f'{REPORT_CACHE_PREFIX}:version'
+
+# Интервал проверки кеша при ожидании части отчета, которую строит другой запрос (сек)
+REPORT_BUILD_POLL_INTERVAL = 0.05
+
+# Ключи кеша со счетчиками попаданий и промахов
+REPORT_CACHE_HITS_KEY = f'{REPORT_CACHE_PREFIX}:stats:hits'
+REPORT_CACHE_MISSES_KEY = f'{REPORT_CACHE_PREFIX}:stats:misses'
+
+
+def get_report_version(session_id: int) -> str:
+    """
+    Возвращает версию отчета сессии.
+    Версия состоит из общей версии отчетов и версии данных сессии.
+
+    :param session_id: Идентификатор сессии парсинга.
+    :return: Версия отчета.
+    """
+    reports_version = cache.get_or_set(REPORTS_VERSION_CACHE_KEY, _new_version, None)
+    session_version = cache.get_or_set(_get_version_key(session_id), _new_version, None)
+    return f'{reports_version}.{session_version}'
+
+
+def get_cached_report_part(session_id: int, part: str, build: Callable[[], Any]) -> Any:
+    """
+    Возвращает часть отчета из кеша или строит ее и сохраняет в кеш.
+
+    :param session_id: Идентификатор сессии парсинга.
+    :param part: Название части отчета.
+    :param build: Функция построения части отчета.
+    :return: Часть отчета.
+    """
+    key = _get_part_key(session_id, part)
+    value = cache.get(key)
+    _count_lookup(value is not None)
+    if value is None:
+        value = _build_single_flight(key, build)
+    return value
+
+
+def get_cached_report_payload(
+        session_id: int, part: str, build: Callable[[], str]
+    ) -> Dict[str, Any]:
+    """
+    Возвращает тело ответа части отчета из кеша или строит его и сохраняет в кеш.
+    При включенной настройке REPORT_CACHE_GZIP тело хранится в сжатом виде
+    и может быть отдано клиенту без повторного сжатия.
+
+    :param session_id: Идентификатор сессии парсинга.
+    :param part: Название части отчета.
+    :param build: Функция построения тела ответа.
+    :return: Словарь с телом ответа (content) и его кодировкой (encoding).
+    """
+    def build_payload() -> Dict[str, Any]:
+        content = build().encode()
+        payload = {
+            'content': content,
+            'encoding': None,
+        }
+        if settings.REPORT_CACHE_GZIP:
+            payload['content'] = gzip.compress(content)
+            payload['encoding'] = 'gzip'
+        return payload
+
+    return get_cached_report_part(session_id, part, build_payload)
+
+
+def decode_report_payload(payload: Dict[str, Any], encoding: Optional[str] = None) -> bytes:
+    """
+    Возвращает тело ответа в требуемой кодировке.
+
+    :param payload: Тело ответа из кеша.
+    :param encoding: Кодировка, которую принимает клиент (None - без сжатия).
+    :return: Тело ответа.
+    """
+    if payload['encoding'] and payload['encoding'] != encoding:
+        return gzip.decompress(payload['content'])
+    return payload['content']
+
+
+def invalidate_report(session_id: int) -> None:
+    """
+    Сбрасывает кеш отчета сессии.
+
+    :param session_id: Идентификатор сессии парсинга.
+    """
+    _increment(_get_version_key(session_id), _new_version())
+
+
+def invalidate_all_reports() -> None:
+    """Сбрасывает кеш отчетов всех сессий."""
+    _increment(REPORTS_VERSION_CACHE_KEY, _new_version())
+
+
+def get_report_cache_stats() -> Dict[str, Any]:
+    """
+    Возвращает статистику обращений к кешу отчетов.
+
+    :return: Количество попаданий, промахов и доля попаданий.
+    """
+    stats = cache.get_many([REPORT_CACHE_HITS_KEY, REPORT_CACHE_MISSES_KEY])
+    hits = stats.get(REPORT_CACHE_HITS_KEY, 0)
+    misses = stats.get(REPORT_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
+
+
+def _get_version_key(session_id: int) -> str:
+    """Возвращает ключ кеша с версией отчета сессии."""
+    return f'{REPORT_CACHE_PREFIX}:{session_id}:version'
+
+
+def _get_part_key(session_id: int, part: str) -> str:
+    """Возвращает ключ кеша части отчета для текущей версии отчета."""
+    return f'{REPORT_CACHE_PREFIX}:{session_id}:{get_report_version(session_id)}:{part}'
+
+
+def _build_single_flight(key: str, build: Callable[[], Any]) -> Any:
+    """
+    Строит часть отчета и сохраняет ее в кеш под блокировкой ключа.
+    Одновременные запросы той же части (например, первые открытия отчета
+    или фоновое построение) ждут результат первого запроса не дольше
+    REPORT_BUILD_WAIT секунд, а не строят часть заново. Блокировка
+    снимается по истечении REPORT_BUILD_LOCK_TIMEOUT, если построивший
+    ее процесс завершился аварийно.
+    """
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, settings.REPORT_BUILD_LOCK_TIMEOUT):
+        deadline = time.monotonic() + settings.REPORT_BUILD_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(REPORT_BUILD_POLL_INTERVAL)
+            value = cache.get(key)
+            if value is not None:
+                return value
+        # Часть не построена за время ожидания: строим ее без блокировки
+        value = build()
+        cache.set(key, value, settings.REPORT_CACHE_TIMEOUT)
+        return value
+
+    try:
+        value = build()
+        cache.set(key, value, settings.REPORT_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def _new_version() -> int:
+    """
+    Возвращает начальное значение версии.
+    Значение не повторяет прежние версии, даже если ключ версии был вытеснен из кеша.
+    """
+    return time.time_ns()
+
+
+def _count_lookup(hit: bool) -> None:
+    """Увеличивает счетчик попаданий или промахов кеша отчетов."""
+    _increment(REPORT_CACHE_HITS_KEY if hit else REPORT_CACHE_MISSES_KEY, 1)
+
+
+def _increment(key: str, initial: int) -> None:
+    """
+    Увеличивает числовое значение в кеше без ограничения времени хранения.
+
+    :param key: Ключ кеша.
+    :param initial: Значение, которое сохраняется, если ключа еще нет.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, initial, None)
@@ -0,0 +1,289 @@
+"""Parsing Report Rendering"""
+import re
+from typing import Any, Dict, Iterable, List
+
+from django.db.models import QuerySet
+from django.template.loader import render_to_string
+from plotly.io.json import to_json_plotly
+
+from . import models, utils
+from .executor import run_sections
+from .metrics import ReportMetrics
+from .report_cache import get_cached_report_part, get_cached_report_payload
+
+
+# Переменные для отображения моделей и полей формы
+SETTINGS_MAPPING = {
+    models.StartDistance: 'status_start_distance',
+    models.AverageSpeed: 'status_average_speed',
+    models.NumberCycles: 'status_number_cycles',
+    models.Pace: 'status_pace',
+    models.SpeedDrop: 'status_speed_drop',
+    models.LeaderGap: 'status_leader_gap',
+    models.UnderwaterPart: 'status_underwater_part',
+    models.BestStartReaction: 'status_best_start_reaction',
+    models.BestStartFinishPercentage: 'status_best_start_finish_percentage',
+    models.HeatMap: 'status_heat_map',
+}
+
+# Диаграммы отчета и поля формы, которые их включают
+CHARTS_MAPPING = {
+    'average_speed_chart': 'status_average_speed',
+    'number_cycles_chart': 'status_number_cycles',
+    'underwater_part_chart': 'status_underwater_part',
+    'start_reaction_chart': 'status_best_start_reaction',
+    'start_finish_difference_chart': 'status_best_start_finish_percentage',
+    'heat_map_chart': 'status_heat_map',
+}
+
+# Таблицы отчета: метод TableGenerator и поля формы, которые должны быть включены
+TABLES_MAPPING = {
+    'start_distance_table': (
+        'generate_start_distance_table', ('status_start_distance',)
+    ),
+    'average_speed_table': (
+        'generate_average_speed_table', ('status_average_speed',)
+    ),
+    'pace_table': (
+        'generate_pace_table', ('status_pace', 'status_number_cycles')
+    ),
+    'speed_drop_table': (
+        'generate_speed_drop_table', ('status_speed_drop',)
+    ),
+    'leader_gap_table': (
+        'generate_leader_gap_table', ('status_leader_gap',)
+    ),
+    'underwater_part_table': (
+        'generate_underwater_part_table', ('status_underwater_part',)
+    ),
+    'start_reaction_table': (
+        'generate_best_start_reaction_table', ('status_best_start_reaction',)
+    ),
+    'start_finish_difference_table': (
+        'generate_start_finish_difference_table', ('status_best_start_finish_percentage',)
+    ),
+}
+
+# Разделы отчета, загружаемые отдельными фрагментами:
+# поле формы, включающее раздел (None - раздел показывается всегда), диаграммы и таблицы раздела
+REPORT_SECTIONS = {
+    'start_distance': {
+        'setting': 'status_start_distance',
+        'charts': (),
+        'tables': ('start_distance_table',),
+    },
+    'average_speed': {
+        'setting': 'status_average_speed',
+        'charts': ('average_speed_chart',),
+        'tables': ('average_speed_table',),
+    },
+    'number_cycles': {
+        'setting': 'status_number_cycles',
+        'charts': ('number_cycles_chart',),
+        'tables': (),
+    },
+    'pace': {
+        'setting': 'status_pace',
+        'charts': (),
+        'tables': ('pace_table',),
+    },
+    'speed_drop': {
+        'setting': 'status_speed_drop',
+        'charts': (),
+        'tables': ('speed_drop_table',),
+    },
+    'leader_gap': {
+        'setting': 'status_leader_gap',
+        'charts': (),
+        'tables': ('leader_gap_table',),
+    },
+    'underwater_part': {
+        'setting': 'status_underwater_part',
+        'charts': ('underwater_part_chart',),
+        'tables': ('underwater_part_table',),
+    },
+    'start_reaction': {
+        'setting': 'status_best_start_reaction',
+        'charts': ('start_reaction_chart',),
+        'tables': ('start_reaction_table',),
+    },
+    'start_finish_difference': {
+        'setting': 'status_best_start_finish_percentage',
+        'charts': ('start_finish_difference_chart',),
+        'tables': ('start_finish_difference_table',),
+    },
+    'heat_map': {
+        'setting': 'status_heat_map',
+        'charts': ('heat_map_chart',),
+        'tables': (),
+    },
+    'results': {
+        'setting': None,
+        'charts': (),
+        'tables': (),
+    },
+}
+
+# Метка раздела в каркасе отчета при потоковой отправке
+REPORT_SECTION_MARKER = re.compile(r'<!--report-section:(\w+)-->')
+
+
+def get_report_participants(
+        session: models.ParsingSession, with_splits: bool = True
+    ) -> List[models.ProtocolData]:
+    """
+    Возвращает участников отчета в порядке итоговых мест.
+
+    :param session: Сессия парсинга.
+    :param with_splits: Загрузить строки отрезков (см. get_report_participants_queryset).
+    :return: Список участников, ограниченный настройкой Number_participants.
+    """
+    return list(get_report_participants_queryset(session, with_splits))
+
+
+def get_report_participants_queryset(
+        session: models.ParsingSession, with_splits: bool = True
+    ) -> QuerySet:
+    """
+    Возвращает запрос участников отчета в порядке итоговых мест
+    с промежуточными временами. Упакованные отрезки читаются вместе
+    с участниками, иначе строки отрезков загружаются отдельным запросом.
+    Диаграммам и таблицам отрезки не нужны, если сохраненные показатели
+    актуальны: в этом случае with_splits=False, а ReportMetrics.for_report
+    догрузит отрезки только при пересчете.
+
+    :param session: Сессия парсинга.
+    :param with_splits: Загрузить строки отрезков.
+    :return: Запрос, ограниченный настройкой Number_participants.
+    """
+    num_participants = utils.get_setting_value('Number_participants')
+    # Запрос через связь сессии сохраняет ссылку участников на сессию без запросов
+    protocol_data = session.protocoldata_set.order_by('final_position')
+    if with_splits and not session.split_distances:
+        protocol_data = protocol_data.prefetch_related('swimsplittime_set')
+    return protocol_data[:num_participants]
+
+
+def render_report_section(
+        session: models.ParsingSession, section: str, active_settings: Dict[str, bool]
+    ) -> str:
+    """
+    Генерирует HTML код раздела отчета.
+
+    :param session: Сессия парсинга.
+    :param section: Название раздела (ключ REPORT_SECTIONS).
+    :param active_settings: Включенные разделы отчета.
+    :return: HTML код раздела.
+    """
+    if section == 'results':
+        return render_to_string(
+            'parsing/report_results.html',
+            {'protocol_data': get_report_participants(session)}
+        )
+
+    section_settings = REPORT_SECTIONS[section]
+    tables = {}
+    if section_settings['tables']:
+        tables = generate_tables(
+            session, get_report_participants(session, with_splits=False),
+            active_settings, section_settings['tables']
+        )
+    context = {
+        'charts': section_settings['charts'],
+        'tables': [table for table in tables.values() if table is not None],
+    }
+    return render_to_string('parsing/report_section.html', context)
+
+
+def render_chart_specs(session: models.ParsingSession) -> str:
+    """
+    Генерирует JSON описания включенных диаграмм отчета.
+
+    :param session: Сессия парсинга.
+    :return: JSON описания диаграмм.
+    """
+    protocol_data = get_report_participants(session, with_splits=False)
+    active_settings = get_cached_report_part(
+        session.id, 'active_settings', lambda: get_active_settings(session)
+    )
+    participants = sorted(protocol_data, key=lambda x: x.start_position)
+    session_metrics = ReportMetrics.for_report(session, participants)
+    session_charts = utils.ChartGenerator(session, participants, session_metrics)
+    chart_names = [
+        chart_name for chart_name, form_field in CHARTS_MAPPING.items()
+        if active_settings.get(form_field)
+    ]
+    return to_json_plotly(session_charts.generate_chart_specs(chart_names))
+
+
+def prewarm_report(session_id: int) -> None:
+    """
+    Строит и сохраняет в кеш части отчета сессии: включенные разделы
+    и описания диаграмм. Части, которые уже есть в кеше, не перестраиваются.
+
+    :param session_id: Идентификатор сессии парсинга.
+    """
+    session = models.ParsingSession.objects.filter(id=session_id).first()
+    if session is None:
+        return
+
+    active_settings = get_cached_report_part(
+        session.id, 'active_settings', lambda: get_active_settings(session)
+    )
+    for section, section_settings in REPORT_SECTIONS.items():
+        if section_settings['setting'] and not active_settings.get(section_settings['setting']):
+            continue
+        get_cached_report_payload(
+            session.id, f'section:{section}',
+            lambda section=section: render_report_section(session, section, active_settings)
+        )
+    get_cached_report_payload(session.id, 'charts', lambda: render_chart_specs(session))
+
+
+def get_active_settings(session: models.ParsingSession) -> Dict[str, bool]:
+    """
+    Возвращает включенные разделы отчета.
+
+    :param session: Сессия парсинга.
+    :return: Словарь с полями формы настроек отчета и их статусами.
+    """
+    active_settings = {}
+    for model, form_field in SETTINGS_MAPPING.items():
+        active_settings[form_field] = model.objects.filter(
+            parsing_session=session, status=True
+        ).exists()
+    return active_settings
+
+
+def generate_tables(
+        session: models.ParsingSession,
+        protocol_data: List[models.ProtocolData],
+        active_settings: Dict[str, bool],
+        table_names: Iterable[str] = tuple(TABLES_MAPPING),
+        as_html: bool = True
+    ) -> Dict[str, Any]:
+    """
+    Генерирует таблицы для сессии.
+    Таблицы, для которых выключены настройки, не строятся (значение None).
+
+    :param session: Сессия парсинга.
+    :param protocol_data: Участники отчета.
+    :param active_settings: Включенные разделы отчета.
+    :param table_names: Названия таблиц, которые нужно построить.
+    :param as_html: Вернуть HTML код таблиц (False - модели ReportTable).
+    :return: Словарь с таблицами.
+    """
+    participants = sorted(protocol_data, key=lambda x: x.start_position)
+    session_metrics = ReportMetrics.for_report(session, participants)
+    session_tables = utils.TableGenerator(session, participants, session_metrics)
+
+    sections = {}
+    for table_name in table_names:
+        method_name, form_fields = TABLES_MAPPING[table_name]
+        if all(active_settings.get(form_field) for form_field in form_fields):
+            sections[table_name] = (
+                method_name if as_html else method_name.replace('generate_', 'build_', 1)
+            )
+    tables = run_sections(session_tables, sections)
+
+    return {table_name: tables.get(table_name) for table_name in table_names}
@@ -0,0 +1,319 @@
+"""Parsing Statistics Roll-ups"""
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractYear
+from django.utils import timezone
+
+from .models import (
+    ParsingSession, ProtocolData, ResultStatistics, SplitStatistics, StatisticsRefresh,
+    SwimSplitTime
+)
+from .splits import MISSING_SPLIT, unpack_splits
+
+
+# Поля ключа сводных показателей
+GROUP_FIELDS = ('season', 'pool_length', 'swim_length', 'final_category', 'year_of_birth')
+
+# Группировки страницы статистики
+STATISTICS_GROUPS = {
+    'year_of_birth': 'Год рождения',
+    'final_category': 'Категория финала',
+}
+
+# Количество сессий, обрабатываемых одним набором запросов
+REFRESH_BATCH_SIZE = 1000
+
+
+def refresh_statistics(full: bool = False) -> int:
+    """
+    Добавляет в сводные показатели сессии, созданные после предыдущего обновления.
+
+    Учитываются только сессии старше STATISTICS_REFRESH_DELAY секунд, чтобы загрузка
+    протоколов успела завершиться. Обновление выполняется в одной транзакции
+    с блокировкой строки состояния, поэтому одновременные запуски выполняются по очереди.
+    Сессии, измененные после учета, пересчитываются только полным обновлением.
+
+    :param full: Пересчитать сводные показатели по всем сессиям.
+    :return: Количество учтенных сессий.
+    """
+    created_before = timezone.now() - timedelta(seconds=settings.STATISTICS_REFRESH_DELAY)
+    processed = 0
+    with transaction.atomic():
+        state, _ = StatisticsRefresh.objects.select_for_update().get_or_create(id=1)
+        if full:
+            ResultStatistics.objects.all().delete()
+            SplitStatistics.objects.all().delete()
+            state.last_session_id = 0
+
+        while True:
+            session_ids = list(
+                ParsingSession.objects.filter(
+                    id__gt=state.last_session_id, created__lte=created_before
+                ).order_by('id').values_list('id', flat=True)[:REFRESH_BATCH_SIZE]
+            )
+            if not session_ids:
+                break
+            add_sessions(session_ids)
+            state.last_session_id = session_ids[-1]
+            processed += len(session_ids)
+
+        state.save()
+    return processed
+
+
+def add_sessions(session_ids: List[int]) -> None:
+    """
+    Добавляет показатели участников сессий к сводным показателям.
+    Суммы, количества и лучшие значения сессий рассчитываются в базе данных
+    группировкой и складываются с сохраненными значениями тех же групп.
+
+    :param session_ids: Идентификаторы сессий.
+    """
+    has_result = Q(result__gt=0)
+    results = ProtocolData.objects.filter(parsing_session_id__in=session_ids).values(
+        **_group_expressions('')
+    ).annotate(
+        participants=Count('id'),
+        result_count=Count('id', filter=has_result),
+        result_sum=Sum('result', filter=has_result, default=0),
+        result_best=Min('result', filter=has_result),
+        reaction_count=Count('reaction_time'),
+        reaction_sum=Sum('reaction_time', default=0),
+        reaction_best=Min('reaction_time'),
+    ).order_by()
+    _merge_statistics(ResultStatistics, GROUP_FIELDS, map(_ungroup, results))
+
+    splits = SwimSplitTime.objects.filter(
+        protocol_data__parsing_session_id__in=session_ids, split_time__isnull=False
+    ).values(
+        'distance', **_group_expressions('protocol_data__')
+    ).annotate(
+        split_count=Count('id'),
+        split_sum=Sum('split_time'),
+        split_best=Min('split_time'),
+    ).order_by()
+    packed = ProtocolData.objects.filter(
+        parsing_session_id__in=session_ids, packed_splits__isnull=False
+    ).values(
+        'packed_splits', 'parsing_session__split_distances', **_group_expressions('')
+    )
+    _merge_statistics(
+        SplitStatistics, GROUP_FIELDS + ('distance',),
+        [*map(_ungroup, splits), *_iter_packed_splits(packed)]
+    )
+
+
+def get_statistics_filters() -> Dict[str, List[Any]]:
+    """
+    Возвращает значения фильтров страницы статистики, которые есть в сводных показателях.
+
+    :return: Сезоны (по убыванию), длины бассейна и длины заплыва.
+    """
+    groups = ResultStatistics.objects.order_by()
+    return {
+        'seasons': list(
+            groups.values_list('season', flat=True).distinct().order_by('-season')
+        ),
+        'pool_lengths': sorted(
+            groups.values_list('pool_length', flat=True).distinct(), key=_length_key
+        ),
+        'swim_lengths': sorted(
+            groups.values_list('swim_length', flat=True).distinct(), key=_length_key
+        ),
+    }
+
+
+def get_result_statistics(
+        season: int, group_by: str,
+        pool_length: Optional[str] = None, swim_length: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+    """
+    Возвращает показатели результатов и стартовой реакции за сезон
+    по заплывам и выбранной группировке.
+
+    :param season: Сезон.
+    :param group_by: Группировка (ключ STATISTICS_GROUPS).
+    :param pool_length: Длина бассейна (None - все).
+    :param swim_length: Длина заплыва (None - все).
+    :return: Строки с количеством участников, лучшими и средними значениями
+        в сотых долях секунды.
+    """
+    rows = _filter_groups(ResultStatistics, season, pool_length, swim_length).values(
+        'swim_length', 'pool_length', group_by
+    ).annotate(
+        participants=Sum('participants'),
+        result_count=Sum('result_count'),
+        result_sum=Sum('result_sum'),
+        result_best=Min('result_best'),
+        reaction_count=Sum('reaction_count'),
+        reaction_sum=Sum('reaction_sum'),
+        reaction_best=Min('reaction_best'),
+    )
+    rows = sorted(
+        rows, key=lambda row: (
+            _length_key(row['swim_length']), _length_key(row['pool_length']), row[group_by]
+        )
+    )
+    for row in rows:
+        row['group'] = row[group_by]
+        row['result_average'] = _average(row['result_sum'], row['result_count'])
+        row['reaction_average'] = _average(row['reaction_sum'], row['reaction_count'])
+    return rows
+
+
+def get_split_statistics(
+        season: int, group_by: str, pool_length: str, swim_length: str
+    ) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """
+    Возвращает лучшее и среднее время отрезков одного заплыва за сезон
+    по выбранной группировке.
+
+    :param season: Сезон.
+    :param group_by: Группировка (ключ STATISTICS_GROUPS).
+    :param pool_length: Длина бассейна.
+    :param swim_length: Длина заплыва.
+    :return: Промежуточные дистанции и строки групп со значениями по дистанциям
+        (лучшее и среднее время в сотых долях секунды).
+    """
+    rows = _filter_groups(SplitStatistics, season, pool_length, swim_length).values(
+        group_by, 'distance'
+    ).annotate(
+        split_count=Sum('split_count'),
+        split_sum=Sum('split_sum'),
+        split_best=Min('split_best'),
+    ).order_by(group_by, 'distance')
+
+    distances = set()
+    groups: Dict[Any, Dict[int, Dict[str, Any]]] = {}
+    for row in rows:
+        distances.add(row['distance'])
+        groups.setdefault(row[group_by], {})[row['distance']] = {
+            'best': row['split_best'],
+            'average': _average(row['split_sum'], row['split_count']),
+        }
+
+    distances = sorted(distances)
+    return distances, [
+        {'group': group, 'splits': [values.get(distance) for distance in distances]}
+        for group, values in groups.items()
+    ]
+
+
+def _group_expressions(prefix: str) -> Dict[str, Any]:
+    """
+    Возвращает выражения ключа сводных показателей для участников
+    (prefix='') или для связанных с участниками записей (prefix='protocol_data__').
+    Имена выражений отличаются от полей модели участника префиксом group_.
+    """
+    return {
+        'group_season': ExtractYear(f'{prefix}parsing_session__created'),
+        'group_pool_length': F(f'{prefix}parsing_session__pool_length'),
+        'group_swim_length': F(f'{prefix}parsing_session__swim_length'),
+        'group_final_category': Coalesce(f'{prefix}final_category', Value('')),
+        'group_year_of_birth': Coalesce(f'{prefix}year_of_birth', Value(0)),
+    }
+
+
+def _ungroup(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Переименовывает выражения ключа group_* в поля сводных показателей."""
+    for field in GROUP_FIELDS:
+        row[field] = row.pop(f'group_{field}')
+    return row
+
+
+def _iter_packed_splits(rows: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """Распаковывает отрезки участников в строки вида одного отрезка."""
+    for row in rows:
+        values = unpack_splits(row.pop('packed_splits'))
+        distances = row.pop('parsing_session__split_distances')
+        group = _ungroup(row)
+        for distance, split_time in zip(distances, values.tolist()):
+            if split_time != MISSING_SPLIT:
+                yield {
+                    **group, 'distance': distance,
+                    'split_count': 1, 'split_sum': split_time, 'split_best': split_time,
+                }
+
+
+def _merge_statistics(
+        model: Type[models.Model], key_fields: Tuple[str, ...], rows: Iterable[Dict[str, Any]]
+    ) -> None:
+    """
+    Складывает строки показателей с сохраненными значениями тех же групп:
+    количества и суммы складываются, из лучших значений выбирается меньшее.
+    Результат записывается одним запросом INSERT ... ON CONFLICT DO UPDATE.
+    """
+    increments: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = tuple(row[field] for field in key_fields)
+        increments[key] = _combine(increments.get(key), row)
+    if not increments:
+        return
+
+    existing = model.objects.filter(
+        season__in={key[0] for key in increments},
+        pool_length__in={key[1] for key in increments},
+        swim_length__in={key[2] for key in increments},
+    ).values()
+    for row in existing:
+        key = tuple(row[field] for field in key_fields)
+        if key in increments:
+            increments[key] = _combine(increments[key], row)
+
+    value_fields = [
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in key_fields
+    ]
+    model.objects.bulk_create(
+        [
+            model(**{field: row[field] for field in (*key_fields, *value_fields)})
+            for row in increments.values()
+        ],
+        update_conflicts=True,
+        unique_fields=key_fields,
+        update_fields=value_fields,
+        batch_size=1000,
+    )
+
+
+def _combine(current: Optional[Dict[str, Any]], row: Dict[str, Any]) -> Dict[str, Any]:
+    """Складывает показатели двух строк одной группы."""
+    if current is None:
+        return dict(row)
+    combined = dict(current)
+    for field, value in row.items():
+        if field.endswith('_best'):
+            values = [item for item in (current[field], value) if item is not None]
+            combined[field] = min(values) if values else None
+        elif field.endswith(('_count', '_sum')) or field == 'participants':
+            combined[field] = current[field] + value
+    return combined
+
+
+def _filter_groups(
+        model: Type[models.Model], season: int,
+        pool_length: Optional[str], swim_length: Optional[str]
+    ) -> models.QuerySet:
+    """Возвращает сводные показатели сезона с фильтрами по заплыву."""
+    groups = model.objects.filter(season=season)
+    if pool_length:
+        groups = groups.filter(pool_length=pool_length)
+    if swim_length:
+        groups = groups.filter(swim_length=swim_length)
+    return groups
+
+
+def _average(total: Optional[int], count: Optional[int]) -> Optional[int]:
+    """Среднее значение в сотых долях секунды (None, если значений нет)."""
+    if not count:
+        return None
+    return round(total / count)
+
+
+def _length_key(length: str) -> int:
+    """Ключ сортировки длины бассейна или заплыва ('50m' -> 50)."""
+    return int(length.replace('m', ''))
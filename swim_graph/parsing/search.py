@@ -0,0 +1,63 @@
+"""Parsing Search"""
+from typing import Optional
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q, QuerySet
+
+from swim_graph_utils.constants import PoolLength, SwimLength
+
+
+# Допустимые значения фасетов
+POOL_LENGTHS = {length.value for length in PoolLength}
+SWIM_LENGTHS = {length.value for length in SwimLength}
+
+
+def search_sessions(
+        queryset: QuerySet,
+        search_term: str = '',
+        pool_length: Optional[str] = None,
+        swim_length: Optional[str] = None
+    ) -> QuerySet:
+    """
+    Фильтрует сессии парсинга по поисковому запросу и фасетам.
+
+    Поиск по названию выполняется через триграммный GIN индекс
+    и ранжируется по схожести с запросом, затем по дате создания.
+    Запрос, совпадающий с длиной бассейна или заплыва (например, 50m),
+    фильтрует по этим полям точным совпадением.
+
+    :param queryset: Исходный набор сессий.
+    :param search_term: Поисковый запрос.
+    :param pool_length: Фильтр по длине бассейна.
+    :param swim_length: Фильтр по длине заплыва.
+    :return: Отфильтрованный и упорядоченный набор сессий.
+    """
+    if pool_length in POOL_LENGTHS:
+        queryset = queryset.filter(pool_length=pool_length)
+    if swim_length in SWIM_LENGTHS:
+        queryset = queryset.filter(swim_length=swim_length)
+
+    search_term = search_term.strip()
+    if not search_term:
+        return queryset.order_by('-created', '-id')
+
+    length = normalize_length(search_term)
+    if length in POOL_LENGTHS or length in SWIM_LENGTHS:
+        return queryset.filter(
+            Q(pool_length=length) | Q(swim_length=length)
+        ).order_by('-created', '-id')
+
+    return queryset.filter(file_name__icontains=search_term).annotate(
+        rank=TrigramWordSimilarity(search_term, 'file_name')
+    ).order_by('-rank', '-created', '-id')
+
+
+def normalize_length(value: str) -> str:
+    """
+    Приводит длину к формату хранения (50 -> 50m).
+
+    :param value: Введенная длина.
+    :return: Длина в формате хранения.
+    """
+    value = value.lower().replace(' ', '').replace('м', 'm')
+    return f'{value}m' if value.isdigit() else value
@@ -0,0 +1,56 @@
+"""Parsing Serializers"""
+from typing import Iterable, Optional
+
+from rest_framework import serializers
+
+from .models import ParsingSession, ProtocolData, SwimSplitTime
+
+
+class FieldSelectionMixin:
+    """
+    Оставляет в ответе только поля, перечисленные в параметре fields
+    (например ?fields=id,initials,splits). Без параметра выводятся все поля.
+    """
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class ParsingSessionSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    """Сессия парсинга."""
+
+    class Meta:
+        model = ParsingSession
+        fields = (
+            'id', 'created', 'updated', 'version', 'file_name', 'link_video',
+            'pool_length', 'swim_length', 'split_distances',
+        )
+
+
+class SwimSplitTimeSerializer(serializers.ModelSerializer):
+    """Время на промежуточной дистанции (сотые доли секунды и секунды)."""
+
+    class Meta:
+        model = SwimSplitTime
+        fields = ('distance', 'split_time', 'split_seconds')
+
+
+class ProtocolDataSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    """
+    Участник заплыва с отрезками. Отрезки берутся из ProtocolData.split_times,
+    поэтому упакованные и построчные отрезки выводятся одинаково.
+    """
+
+    splits = SwimSplitTimeSerializer(source='split_times', many=True, read_only=True)
+
+    class Meta:
+        model = ProtocolData
+        fields = (
+            'id', 'parsing_session', 'athlete', 'initials', 'year_of_birth',
+            'final_category', 'start_position', 'final_position',
+            'reaction_time', 'reaction_seconds', 'result', 'result_seconds',
+            'points', 'splits',
+        )
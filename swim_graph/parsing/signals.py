@@ -0,0 +1,120 @@
+"""parsing Signals"""
+from django.db.models import F
+from django.db.models.expressions import Combinable
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    ParsingSession, ProtocolData, SessionMetrics, SwimSplitTime, ParsingSettings,
+    StartDistance, AverageSpeed, NumberCycles, Pace, SpeedDrop, LeaderGap,
+    UnderwaterPart, BestStartReaction, BestStartFinishPercentage, HeatMap
+)
+from .pagination import invalidate_sessions_count
+from .report_cache import invalidate_all_reports, invalidate_report
+
+
+# Модели настроек отчета, изменение которых меняет отчет сессии
+REPORT_SETTINGS_MODELS = (
+    StartDistance, AverageSpeed, NumberCycles, Pace, SpeedDrop, LeaderGap,
+    UnderwaterPart, BestStartReaction, BestStartFinishPercentage, HeatMap
+)
+
+
+@receiver([post_save, post_delete], sender=ProtocolData)
+def invalidate_metrics_on_protocol_data(sender, instance, **kwargs) -> None:
+    """
+    Сбрасывает сохраненные показатели и кеш отчета сессии при изменении данных участника.
+    Показатели будут пересчитаны при следующем открытии отчета.
+    """
+    SessionMetrics.objects.filter(
+        parsing_session_id=instance.parsing_session_id
+    ).delete()
+    invalidate_report(instance.parsing_session_id)
+    touch_session(instance.parsing_session_id)
+
+
+@receiver([post_save, post_delete], sender=SwimSplitTime)
+def invalidate_metrics_on_split_time(sender, instance, **kwargs) -> None:
+    """
+    Сбрасывает сохраненные показатели и кеш отчета сессии при изменении
+    времени на промежуточной дистанции.
+    """
+    session_id = ProtocolData.objects.filter(
+        id=instance.protocol_data_id
+    ).values_list('parsing_session_id', flat=True).first()
+    if session_id is None:
+        return
+
+    SessionMetrics.objects.filter(parsing_session_id=session_id).delete()
+    invalidate_report(session_id)
+    touch_session(session_id)
+
+
+@receiver(pre_save, sender=ParsingSession)
+def bump_session_version(sender, instance, **kwargs) -> None:
+    """
+    Увеличивает версию и обновляет дату изменения сессии при ее сохранении.
+    Версия увеличивается в базе данных, поэтому сохранение устаревшего экземпляра
+    не возвращает ее к уже выданному значению. Новая сессия получает значения по умолчанию,
+    сохранение отдельных полей без version версию не меняет.
+    """
+    update_fields = kwargs.get('update_fields')
+    if instance.pk is None or kwargs.get('raw') or (
+            update_fields is not None and 'version' not in update_fields):
+        return
+    instance.version = F('version') + 1
+    instance.updated = timezone.now()
+
+
+@receiver([post_save, post_delete], sender=ParsingSession)
+def invalidate_sessions_count_on_session(sender, instance, **kwargs) -> None:
+    """
+    Сбрасывает закешированные количества сессий в списке отчетов
+    и кеш отчета при добавлении, изменении или удалении сессии.
+    """
+    invalidate_sessions_count()
+    invalidate_report(instance.id)
+
+
+@receiver(post_save, sender=ParsingSession)
+def refresh_session_version(sender, instance, **kwargs) -> None:
+    """Загружает увеличенную при сохранении версию сессии (см. bump_session_version)."""
+    if isinstance(instance.version, Combinable):
+        instance.refresh_from_db(fields=['version'])
+
+
+def invalidate_report_on_settings(sender, instance, **kwargs) -> None:
+    """
+    Сбрасывает кеш отчета сессии при изменении настроек отчета.
+    """
+    invalidate_report(instance.parsing_session_id)
+    touch_session(instance.parsing_session_id)
+
+
+for settings_model in REPORT_SETTINGS_MODELS:
+    post_save.connect(invalidate_report_on_settings, sender=settings_model)
+    post_delete.connect(invalidate_report_on_settings, sender=settings_model)
+
+
+@receiver([post_save, post_delete], sender=ParsingSettings)
+def invalidate_reports_on_parsing_settings(sender, instance, **kwargs) -> None:
+    """
+    Сбрасывает кеш отчетов всех сессий при изменении глобальных настроек
+    (например, количества участников в отчете) и меняет версии всех сессий.
+    """
+    invalidate_all_reports()
+    ParsingSession.objects.update(version=F('version') + 1, updated=Now())
+
+
+def touch_session(session_id: int) -> None:
+    """
+    Увеличивает версию и обновляет дату изменения сессии одним запросом
+    без вызова сигналов сессии.
+
+    :param session_id: Идентификатор сессии парсинга.
+    """
+    ParsingSession.objects.filter(id=session_id).update(
+        version=F('version') + 1, updated=Now()
+    )
@@ -0,0 +1,57 @@
+"""Parsing Packed Split Times"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# Формат упакованных отрезков: int32 little-endian, время в сотых долях секунды
+SPLIT_DTYPE = np.dtype('<i4')
+
+# Значение отсутствующего отрезка в упакованном массиве
+MISSING_SPLIT = -1
+
+
+def pack_splits(distances: List[int], split_times: Dict[int, Optional[int]]) -> bytes:
+    """
+    Упаковывает времена отрезков участника в массив,
+    выровненный по промежуточным дистанциям сессии.
+
+    :param distances: Промежуточные дистанции сессии (ParsingSession.split_distances).
+    :param split_times: Время отрезков (сотые доли секунды) по дистанциям.
+    :return: Упакованные времена отрезков.
+    """
+    values = [split_times.get(distance) for distance in distances]
+    return np.array(
+        [MISSING_SPLIT if value is None else value for value in values], dtype=SPLIT_DTYPE
+    ).tobytes()
+
+
+def unpack_splits(packed: bytes) -> np.ndarray:
+    """
+    Возвращает упакованные времена отрезков как массив NumPy без копирования данных.
+    Массив только для чтения, отсутствующие отрезки равны MISSING_SPLIT.
+
+    :param packed: Упакованные времена (ProtocolData.packed_splits).
+    :return: Время отрезков в сотых долях секунды.
+    """
+    return np.frombuffer(packed, dtype=SPLIT_DTYPE)
+
+
+def unpack_split_list(packed: bytes) -> List[Optional[int]]:
+    """
+    Возвращает упакованные времена отрезков списком, отсутствующие отрезки - None.
+
+    :param packed: Упакованные времена (ProtocolData.packed_splits).
+    :return: Время отрезков в сотых долях секунды.
+    """
+    return [None if value == MISSING_SPLIT else value for value in unpack_splits(packed).tolist()]
+
+
+def get_split_distances(split_times: Iterable[Dict[str, Optional[int]]]) -> List[int]:
+    """
+    Возвращает отсортированные промежуточные дистанции всех отрезков.
+
+    :param split_times: Отрезки вида {'distance': ..., 'split_time': ...}.
+    :return: Промежуточные дистанции.
+    """
+    return sorted({split_time['distance'] for split_time in split_times})
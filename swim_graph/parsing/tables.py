@@ -0,0 +1,187 @@
+"""Parsing Report Tables"""
+import csv
+import io
+import json
+import math
+from functools import lru_cache
+from html import escape
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+# Типы значений строк таблицы
+NUMBER = 'number'
+TEXT = 'text'
+INPUT = 'input'
+
+
+def _is_missing(value: Any) -> bool:
+    """Проверяет, отсутствует ли значение: None, пустая строка или NaN."""
+    if value is None or value == '':
+        return True
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _format_input(value: Any) -> str:
+    """
+    Форматирует значение, введенное пользователем:
+    числа - с двумя знаками после запятой, остальное - как есть.
+    """
+    try:
+        return f'{float(value):.2f}'
+    except ValueError:
+        return str(value)
+
+
+# Форматтеры значений по типам строк
+FORMATTERS: Dict[str, Callable[[Any], str]] = {
+    NUMBER: '{:.2f}'.format,
+    TEXT: str,
+    INPUT: _format_input,
+}
+
+
+class TableRow:
+    """
+    Строка таблицы отчета: один ряд показателей по участникам.
+
+    Тип значений известен заранее (ряды приходят из ReportMetrics),
+    поэтому форматтер выбирается один раз на строку, а не для каждой ячейки.
+    Отсутствующие значения (None, NaN, пустая строка) выводятся как missing.
+    """
+
+    def __init__(
+            self, label: str, values: Iterable[Any],
+            value_type: str = NUMBER, missing: str = ''
+        ) -> None:
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        self.label = label
+        self.values = list(values)
+        self.value_type = value_type
+        self.missing = missing
+        self.formatter = FORMATTERS[value_type]
+
+    def cells(self) -> List[str]:
+        """
+        Возвращает отформатированные значения строки (без экранирования).
+
+        :return: Список значений ячеек.
+        """
+        formatter = self.formatter
+        missing = self.missing
+        return [
+            missing if _is_missing(value) else formatter(value)
+            for value in self.values
+        ]
+
+    def html_cells(self) -> List[str]:
+        """
+        Возвращает экранированные значения строки для HTML.
+        Отформатированные числа не содержат спецсимволов и не экранируются.
+
+        :return: Список значений ячеек.
+        """
+        if self.value_type == NUMBER:
+            missing = escape(self.missing)
+            return [
+                missing if _is_missing(value) else f'{value:.2f}'
+                for value in self.values
+            ]
+        return [escape(cell) for cell in self.cells()]
+
+    def raw_values(self) -> List[Any]:
+        """
+        Возвращает значения строки для JSON: числа - числами, отсутствующие - None.
+
+        :return: Список значений.
+        """
+        if self.value_type != NUMBER:
+            return ['' if value is None else str(value) for value in self.values]
+        return [None if _is_missing(value) else value for value in self.values]
+
+
+@lru_cache(maxsize=128)
+def _get_header_html(col_labels: Tuple[str, ...]) -> str:
+    """
+    Возвращает HTML код начала таблицы с заголовком.
+    Все таблицы отчета имеют одни и те же колонки, поэтому заголовок
+    экранируется один раз и берется из кеша.
+    """
+    return (
+        "<div class='table-responsive'> <table id='report-table' "
+        "class='table table-bordered table-hover'><thead><tr><th></th>"
+        + ''.join(f'<th>{escape(label)}</th>' for label in col_labels)
+        + "</tr></thead> <tbody class='text-center align-middle'>"
+    )
+
+
+class ReportTable:
+    """
+    Таблица отчета: участники по колонкам, ряды показателей по строкам.
+    Одна модель таблицы выводится в HTML, CSV и JSON.
+    """
+
+    def __init__(self, col_labels: Sequence[str], rows: List[TableRow]) -> None:
+        self.col_labels = list(col_labels)
+        self.rows = rows
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        Последовательно выдает части HTML кода таблицы.
+        Все подписи и значения экранируются.
+
+        :return: Итератор частей HTML кода.
+        """
+        yield _get_header_html(tuple(self.col_labels))
+        for row in self.rows:
+            yield f'<tr><td>{escape(row.label)}</td>'
+            cells = row.html_cells()
+            if cells:
+                yield '<td>' + '</td><td>'.join(cells) + '</td>'
+            yield '</tr>'
+        yield '</tbody></table></div>'
+
+    def to_html(self) -> str:
+        """
+        Возвращает HTML код таблицы.
+
+        :return: HTML код таблицы.
+        """
+        return ''.join(self.iter_html())
+
+    def to_csv(self) -> str:
+        """
+        Возвращает таблицу в формате CSV.
+
+        :return: CSV с заголовком из подписей колонок.
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow([''] + self.col_labels)
+        for row in self.rows:
+            writer.writerow([row.label] + row.cells())
+        return output.getvalue()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Возвращает таблицу в виде словаря для JSON.
+
+        :return: Словарь с подписями колонок и строками.
+        """
+        return {
+            'columns': self.col_labels,
+            'rows': [
+                {'label': row.label, 'type': row.value_type, 'values': row.raw_values()}
+                for row in self.rows
+            ],
+        }
+
+    def to_json(self) -> str:
+        """
+        Возвращает таблицу в формате JSON.
+
+        :return: JSON строка.
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False)
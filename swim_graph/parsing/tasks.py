@@ -0,0 +1,128 @@
+"""Parsing Tasks"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from . import export, reports, rollups
+
+
+# Каталог архивов выгрузки отчетов внутри MEDIA_ROOT
+EXPORTS_DIR = 'exports'
+
+# Статусы выгрузки отчетов
+EXPORT_PENDING = 'pending'
+EXPORT_DONE = 'done'
+EXPORT_FAILED = 'failed'
+
+
+@shared_task
+def export_reports_task(export_id: str, session_ids: List[int], export_format: str) -> None:
+    """
+    Выгружает отчеты сессий в zip архив в фоне.
+    Архив записывается под временным именем и переименовывается по готовности,
+    статус выгрузки хранится в кеше.
+
+    :param export_id: Идентификатор выгрузки.
+    :param session_ids: Идентификаторы сессий парсинга.
+    :param export_format: Формат отчетов (html или xlsx).
+    """
+    path = get_export_path(export_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        count = export.export_reports(session_ids, export_format, f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+    except Exception:
+        set_export_status(export_id, {'status': EXPORT_FAILED})
+        raise
+    set_export_status(export_id, {'status': EXPORT_DONE, 'count': count})
+
+
+@shared_task
+def refresh_statistics_task(full: bool = False) -> int:
+    """
+    Обновляет сводные показатели по новым сессиям (запускается по расписанию Celery beat).
+
+    :param full: Пересчитать сводные показатели по всем сессиям.
+    :return: Количество учтенных сессий.
+    """
+    return rollups.refresh_statistics(full)
+
+
+@shared_task
+def prewarm_report_task(session_id: int) -> None:
+    """
+    Строит кеш отчета сессии в фоне после загрузки протоколов или сохранения
+    настроек отчета, чтобы первые открытия отчета не строили его сами.
+
+    :param session_id: Идентификатор сессии парсинга.
+    """
+    reports.prewarm_report(session_id)
+
+
+@shared_task
+def cleanup_exports_task() -> int:
+    """
+    Удаляет архивы выгрузки, статус которых уже истек
+    (запускается по расписанию Celery beat).
+
+    :return: Количество удаленных файлов.
+    """
+    return remove_expired_exports(settings.EXPORT_TTL)
+
+
+def remove_expired_exports(max_age: int) -> int:
+    """
+    Удаляет архивы выгрузки (в том числе недописанные) старше max_age секунд.
+
+    :param max_age: Время хранения архива (сек).
+    :return: Количество удаленных файлов.
+    """
+    exports_dir = os.path.join(settings.MEDIA_ROOT, EXPORTS_DIR)
+    if not os.path.isdir(exports_dir):
+        return 0
+
+    expired = time.time() - max_age
+    removed = 0
+    with os.scandir(exports_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < expired:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+    return removed
+
+
+def get_export_path(export_id: str) -> str:
+    """
+    Возвращает путь к архиву выгрузки.
+
+    :param export_id: Идентификатор выгрузки.
+    :return: Путь к архиву.
+    """
+    return os.path.join(settings.MEDIA_ROOT, EXPORTS_DIR, f'{export_id}.zip')
+
+
+def get_export_status(export_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Возвращает статус выгрузки (None - выгрузка не найдена).
+
+    :param export_id: Идентификатор выгрузки.
+    :return: Словарь со статусом выгрузки.
+    """
+    return cache.get(f'report_export:{export_id}')
+
+
+def set_export_status(export_id: str, status: Dict[str, Any]) -> None:
+    """
+    Сохраняет статус выгрузки.
+
+    :param export_id: Идентификатор выгрузки.
+    :param status: Словарь со статусом выгрузки.
+    """
+    cache.set(f'report_export:{export_id}', status, settings.EXPORT_TTL)
@@ -1,11 +1,25 @@
 from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from plotly.offline import get_plotlyjs_version
+
+from swim_graph_utils.time_utils import CENTISECONDS, format_centiseconds
 
 register = template.Library()
 
 @register.filter
 def time_format(value):
+    """Форматирует время в сотых долях секунды (мм:сс.сс или ч:мм:сс.сс)."""
+    if value:
+        return format_centiseconds(value)
+    return '-'
+
+
+@register.filter
+def seconds_format(value):
+    """Форматирует время в секундах так же, как time_format."""
     if value:
-        return value.strftime('%M:%S.%f')[:-4]
+        return format_centiseconds(round(value * CENTISECONDS))
     return '-'
 
 
@@ -20,3 +34,17 @@ def get_item(dictionary, key):
     if not value:
         return ""
     return value
+
+
+@register.simple_tag
+def plotly_js():
+    """
+    Подключает plotly.js один раз на страницу.
+    Версия библиотеки добавляется к адресу, чтобы браузер
+    мог кешировать файл до обновления plotly.
+    """
+    return format_html(
+        '<script src="{}?v={}" charset="utf-8"></script>',
+        static('plotly/plotly.min.js'),
+        get_plotlyjs_version()
+    )
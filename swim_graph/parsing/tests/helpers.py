@@ -0,0 +1,51 @@
+"""Вспомогательные функции тестов приложения parsing"""
+import copy
+from typing import Any, Dict
+
+from parsing import models
+from parsing.reports import SETTINGS_MAPPING
+from parsing.utils import save_parse_data
+
+
+# Модели настроек отчета с данными по участникам и ключи этих данных в report_data
+SETTINGS_DATA_KEYS = {
+    models.NumberCycles: 'number_cycles',
+    models.Pace: 'pace',
+    models.UnderwaterPart: 'underwater_part',
+    models.StartDistance: 'start_distance',
+}
+
+
+def create_report_session(data: Dict[str, Any]) -> models.ParsingSession:
+    """
+    Создает сессию парсинга по данным из report_data так же, как при загрузке протоколов,
+    и включает все разделы отчета.
+
+    :param data: Данные заплыва (см. report_data).
+    :return: Сессия парсинга.
+    """
+    session = models.ParsingSession.objects.create(
+        file_name=data['file_name'],
+        swim_length=data['swim_length'],
+        pool_length=data['pool_length'],
+    )
+    participants = copy.deepcopy(data['participants'])
+    for participant in participants:
+        participant['split_times'] = [
+            {'distance': distance, 'split_time': split_time}
+            for distance, split_time in sorted(participant.get('split_times', {}).items())
+        ]
+    save_parse_data({'participants': participants}, session)
+
+    participant_ids = dict(session.protocoldata_set.values_list('start_position', 'id'))
+    for model in SETTINGS_MAPPING:
+        if hasattr(model, 'data'):
+            values = data.get('settings', {}).get(SETTINGS_DATA_KEYS[model], {})
+            model.objects.create(parsing_session=session, status=True, data={
+                str(participant_ids[position]): value for position, value in values.items()
+            })
+        else:
+            model.objects.create(parsing_session=session, status=True)
+
+    session.refresh_from_db()
+    return session
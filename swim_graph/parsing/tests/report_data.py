@@ -0,0 +1,128 @@
+"""
+Данные заплывов для тестов отчета.
+
+Модуль не зависит от Django: по этим же данным построены эталоны
+в каталоге golden (время задано в сотых долях секунды).
+"""
+
+# Заплыв 200 м в бассейне 50 м: у всех участников есть все отрезки
+FINAL_200M = {
+    'file_name': 'Чемпионат. 200 м вольный стиль',
+    'swim_length': '200m',
+    'pool_length': '50m',
+    'participants': [
+        {
+            'initials': 'Иванов Иван', 'year_of_birth': 2006, 'final_category': 'Финал A',
+            'start_position': 4, 'final_position': 1, 'reaction_time': 65,
+            'result': 11234, 'points': 812,
+            'split_times': {50: 2675, 100: 5541, 150: 8412, 200: 11234},
+        },
+        {
+            'initials': 'Петров Петр', 'year_of_birth': 2005, 'final_category': 'Финал A',
+            'start_position': 5, 'final_position': 2, 'reaction_time': 71,
+            'result': 11302, 'points': 798,
+            'split_times': {50: 2660, 100: 5530, 150: 8450, 200: 11302},
+        },
+        {
+            'initials': 'Сидоров Сидор', 'year_of_birth': 2007, 'final_category': 'Финал A',
+            'start_position': 3, 'final_position': 3, 'reaction_time': 59,
+            'result': 11388, 'points': 780,
+            'split_times': {50: 2702, 100: 5610, 150: 8531, 200: 11388},
+        },
+        {
+            'initials': 'Кузнецов Алексей', 'year_of_birth': 2006, 'final_category': 'Финал A',
+            'start_position': 6, 'final_position': 4, 'reaction_time': None,
+            'result': 11450, 'points': 767,
+            'split_times': {50: 2719, 100: 5644, 150: 8590, 200: 11450},
+        },
+        {
+            'initials': 'Смирнов Олег', 'year_of_birth': 2008, 'final_category': 'Финал A',
+            'start_position': 2, 'final_position': 5, 'reaction_time': 80,
+            'result': 11517, 'points': 754,
+            'split_times': {50: 2733, 100: 5690, 150: 8655, 200: 11517},
+        },
+        {
+            'initials': 'Попов Денис', 'year_of_birth': 2005, 'final_category': 'Финал A',
+            'start_position': 7, 'final_position': 6, 'reaction_time': 68,
+            'result': 11603, 'points': 739,
+            'split_times': {50: 2751, 100: 5733, 150: 8712, 200: 11603},
+        },
+    ],
+    # Данные настроек отчета по стартовым позициям участников
+    'settings': {
+        'number_cycles': {4: '34', 5: '36', 3: '35', 6: '', 2: '37', 7: '36'},
+        'pace': {4: '10.50', 5: '10.75', 3: '11.20', 6: '10.10', 2: '11.00', 7: '10.90'},
+        'underwater_part': {4: '7.50', 5: '8', 3: '6.25', 6: '9', 2: '7', 7: '8.40'},
+        'start_distance': {4: '6.10', 5: '5.90', 3: '6.30', 6: '5.80', 2: '6', 7: '6.05'},
+    },
+}
+
+# Заплыв 50 м в бассейне 50 м: промежуточных отрезков нет
+FINAL_50M = {
+    'file_name': 'Чемпионат. 50 м баттерфляй',
+    'swim_length': '50m',
+    'pool_length': '50m',
+    'participants': [
+        {
+            'initials': 'Волков Игорь', 'year_of_birth': 2004, 'final_category': 'Финал A',
+            'start_position': 4, 'final_position': 1, 'reaction_time': 62,
+            'result': 2431, 'points': 845,
+        },
+        {
+            'initials': 'Зайцев Павел', 'year_of_birth': 2006, 'final_category': 'Финал A',
+            'start_position': 3, 'final_position': 2, 'reaction_time': None,
+            'result': 2467, 'points': 809,
+        },
+        {
+            'initials': 'Лебедев Глеб', 'year_of_birth': 2005, 'final_category': 'Финал A',
+            'start_position': 5, 'final_position': 3, 'reaction_time': 70,
+            'result': 2502, 'points': 776,
+        },
+        {
+            'initials': 'Козлов Артем', 'year_of_birth': 2007, 'final_category': 'Финал A',
+            'start_position': 6, 'final_position': 4, 'reaction_time': 66,
+            'result': 2540, 'points': 741,
+        },
+    ],
+    'settings': {
+        'number_cycles': {4: '18', 3: '19', 5: '20', 6: '19'},
+        'pace': {4: '12.40', 3: '12.10', 5: '11.90', 6: '12.00'},
+        'underwater_part': {4: '12', 3: '11.50', 5: '13', 6: '10.75'},
+        'start_distance': {4: '5.50', 3: '5.70', 5: '5.40', 6: '5.60'},
+    },
+}
+
+# Заплыв 100 м: у второго участника нет отрезка 100 м, у третьего нет отрезков
+FINAL_100M = {
+    'file_name': 'Первенство. 100 м вольный стиль',
+    'swim_length': '100m',
+    'pool_length': '50m',
+    'participants': [
+        {
+            'initials': 'Иванов Иван', 'year_of_birth': 2006, 'final_category': 'Финал A',
+            'start_position': 4, 'final_position': 1, 'reaction_time': 65,
+            'result': 5500, 'points': 700, 'split_times': {50: 2600, 100: 5500},
+        },
+        {
+            'initials': 'Петров Петр', 'year_of_birth': 2005, 'final_category': 'Финал A',
+            'start_position': 5, 'final_position': 2, 'reaction_time': None,
+            'result': 5600, 'points': 690, 'split_times': {50: 2500},
+        },
+        {
+            'initials': 'Сидоров Сидор', 'year_of_birth': 2007, 'final_category': 'Финал A',
+            'start_position': 3, 'final_position': 3, 'reaction_time': 70,
+            'result': 5800, 'points': 650,
+        },
+    ],
+    'settings': {
+        'number_cycles': {4: '12', 5: '', 3: 'abc'},
+        'pace': {4: '10.5', 5: '11.00', 3: '12.00'},
+        'underwater_part': {4: '7.5', 5: 'abc'},
+    },
+}
+
+# Заплывы, для которых построены эталоны отчета
+REPORT_SESSIONS = {
+    'final_200m': FINAL_200M,
+    'final_50m': FINAL_50M,
+}
@@ -0,0 +1,166 @@
+"""Тесты показателей отрезков, рассчитанных в базе данных."""
+import math
+from typing import Any, Dict, List
+
+from django.test import TestCase
+
+from parsing.analytics import get_session_split_metrics, get_split_aggregates
+from parsing.models import ParsingSession
+from .helpers import create_report_session
+from .report_data import FINAL_100M, FINAL_200M
+
+
+def without_ids(split_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Убирает из строк отрезков идентификаторы участников, различающиеся между сессиями.
+
+    :param split_rows: Строки отрезков.
+    :return: Строки отрезков без protocol_data_id.
+    """
+    return [
+        {key: value for key, value in split_row.items() if key != 'protocol_data_id'}
+        for split_row in split_rows
+    ]
+
+
+class SplitMetricsTest(TestCase):
+    """Показатели отрезков сессий с построчными и упакованными отрезками."""
+
+    def create_sessions(self, data: Dict[str, Any]) -> List[ParsingSession]:
+        """
+        Создает две сессии по одним данным: с построчными и с упакованными отрезками.
+
+        :param data: Данные заплыва (см. report_data).
+        :return: Сессии с построчными и упакованными отрезками.
+        """
+        sessions = []
+        for packed_splits in (False, True):
+            with self.settings(PACKED_SPLITS=packed_splits):
+                sessions.append(create_report_session(data))
+        self.assertEqual(sessions[0].split_distances, [])
+        self.assertNotEqual(sessions[1].split_distances, [])
+        return sessions
+
+    def assertRowsAlmostEqual(
+            self, first: List[Dict[str, Any]], second: List[Dict[str, Any]]
+        ) -> None:
+        """
+        Сравнивает строки показателей, числа с плавающей точкой - приближенно.
+
+        :param first: Проверяемые строки.
+        :param second: Ожидаемые строки.
+        """
+        self.assertEqual(len(first), len(second))
+        for first_row, second_row in zip(first, second):
+            self.assertEqual(sorted(first_row), sorted(second_row))
+            for key, value in first_row.items():
+                if isinstance(value, float):
+                    self.assertTrue(
+                        math.isclose(value, second_row[key], abs_tol=1e-9), (key, first_row)
+                    )
+                else:
+                    self.assertEqual(value, second_row[key], (key, first_row))
+
+    def test_packed_rows_match_row_splits(self) -> None:
+        for data in (FINAL_200M, FINAL_100M):
+            with self.subTest(session=data['file_name']):
+                row_session, packed_session = self.create_sessions(data)
+                self.assertRowsAlmostEqual(
+                    without_ids(get_session_split_metrics(packed_session)),
+                    without_ids(get_session_split_metrics(row_session)),
+                )
+
+    def test_split_values(self) -> None:
+        row_session, _ = self.create_sessions(FINAL_100M)
+        split_rows = without_ids(get_session_split_metrics(row_session))
+        # Хранимые отрезки накопленные: время отрезка 100 м лидера - 55.00 - 26.00.
+        # У третьего участника нет отрезков, у второго - отрезка 100 м
+        self.assertRowsAlmostEqual(split_rows, [
+            {
+                'protocol_data__final_position': 1, 'protocol_data__initials': 'Иванов Иван',
+                'distance': 50, 'lap_seconds': 26.0, 'cumulative_seconds': 26.0,
+                'lap_speed': 50 / 26, 'leader_lap_seconds': 26.0, 'leader_gap': 0.0,
+                'cumulative_gap': 0.0, 'speed_drop': 100.0,
+            },
+            {
+                'protocol_data__final_position': 1, 'protocol_data__initials': 'Иванов Иван',
+                'distance': 100, 'lap_seconds': 29.0, 'cumulative_seconds': 55.0,
+                'lap_speed': 50 / 29, 'leader_lap_seconds': 29.0, 'leader_gap': 0.0,
+                'cumulative_gap': 0.0, 'speed_drop': 26 / 29 * 100,
+            },
+            {
+                'protocol_data__final_position': 2, 'protocol_data__initials': 'Петров Петр',
+                'distance': 50, 'lap_seconds': 25.0, 'cumulative_seconds': 25.0,
+                'lap_speed': 2.0, 'leader_lap_seconds': 26.0, 'leader_gap': -1.0,
+                'cumulative_gap': -1.0, 'speed_drop': 100.0,
+            },
+        ])
+
+    def test_laps_from_cumulative_splits(self) -> None:
+        for session in self.create_sessions(FINAL_200M):
+            with self.subTest(packed=bool(session.split_distances)):
+                split_row = next(
+                    split_row for split_row in get_session_split_metrics(session)
+                    if split_row['protocol_data__final_position'] == 2
+                    and split_row['distance'] == 100
+                )
+                # Отрезок 100 м: 55.30 - 26.60 у участника и 55.41 - 26.75 у лидера
+                self.assertAlmostEqual(split_row['lap_seconds'], 28.70)
+                self.assertAlmostEqual(split_row['cumulative_seconds'], 55.30)
+                self.assertAlmostEqual(split_row['lap_speed'], 50 / 28.70)
+                self.assertAlmostEqual(split_row['leader_lap_seconds'], 28.66)
+                self.assertAlmostEqual(split_row['leader_gap'], 0.04)
+                self.assertAlmostEqual(split_row['cumulative_gap'], -0.11)
+                self.assertAlmostEqual(split_row['speed_drop'], 26.60 / 28.70 * 100)
+
+    def test_aggregates_combine_row_and_packed_sessions(self) -> None:
+        row_session, packed_session = self.create_sessions(FINAL_100M)
+        single = get_split_aggregates(ParsingSession.objects.filter(id=row_session.id))
+        combined = get_split_aggregates(
+            ParsingSession.objects.filter(id__in=[row_session.id, packed_session.id])
+        )
+        self.assertEqual([row['count'] for row in single], [2, 1])
+        self.assertEqual([row['count'] for row in combined], [4, 2])
+        self.assertEqual(combined[0]['best_lap_seconds'], 25.0)
+        self.assertAlmostEqual(combined[0]['lap_seconds'], 25.5)
+        self.assertAlmostEqual(combined[0]['leader_gap'], -0.5)
+        self.assertRowsAlmostEqual(
+            [{key: value for key, value in row.items() if key != 'count'} for row in combined],
+            [{key: value for key, value in row.items() if key != 'count'} for row in single],
+        )
+
+
+class SplitsApiTest(TestCase):
+    """Показатели отрезков в REST API."""
+
+    def setUp(self) -> None:
+        self.session = create_report_session(FINAL_100M)
+
+    def test_session_splits(self) -> None:
+        response = self.client.get(f'/api/v1/sessions/{self.session.id}/splits/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['session'], self.session.id)
+        self.assertEqual(len(response.json()['splits']), 3)
+
+        not_modified = self.client.get(
+            f'/api/v1/sessions/{self.session.id}/splits/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_split_aggregates_require_lengths(self) -> None:
+        for params in ({}, {'pool_length': '50m'}, {'swim_length': '100m'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/v1/sessions/splits/', params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_split_aggregates(self) -> None:
+        response = self.client.get(
+            '/api/v1/sessions/splits/', {'pool_length': '50m', 'swim_length': '100m'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['distance'] for row in response.json()], [50, 100])
+
+        response = self.client.get(
+            '/api/v1/sessions/splits/', {'pool_length': '25m', 'swim_length': '100m'}
+        )
+        self.assertEqual(response.json(), [])
@@ -0,0 +1,86 @@
+"""Тесты пакетной выгрузки сессий в формате NDJSON."""
+import json
+from typing import Any, Dict, List
+from unittest import mock
+
+from django.test import TestCase
+
+from parsing.api import BATCH_MAX_SESSIONS
+from parsing.models import SessionMetrics
+from .helpers import create_report_session
+from .report_data import FINAL_50M, FINAL_100M, FINAL_200M
+
+# Адрес пакетной выгрузки
+BATCH_URL = '/api/v1/sessions/batch/'
+
+
+class SessionBatchTest(TestCase):
+    """Пакетная выгрузка /api/v1/sessions/batch/."""
+
+    def setUp(self) -> None:
+        self.sessions = [
+            create_report_session(data) for data in (FINAL_200M, FINAL_50M, FINAL_100M)
+        ]
+
+    def get_lines(self, ids: str) -> List[Dict[str, Any]]:
+        """
+        Запрашивает пакетную выгрузку и разбирает строки ответа.
+
+        :param ids: Значение параметра ids.
+        :return: Строки ответа в разобранном виде.
+        """
+        response = self.client.get(BATCH_URL, {'ids': ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('\n'))
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_order_and_missing_sessions(self) -> None:
+        first, second, third = (session.id for session in self.sessions)
+        missing = third + 1000
+        lines = self.get_lines(f'{third},{missing},{first},{third},{second}')
+
+        self.assertEqual([line['id'] for line in lines], [third, missing, first, second])
+        self.assertEqual(lines[1], {'id': missing, 'detail': 'Сессия не найдена'})
+        self.assertEqual(
+            [len(line['participants']) for line in (lines[0], lines[2], lines[3])], [3, 6, 4]
+        )
+        self.assertEqual(lines[2]['participants'][0]['final_position'], 1)
+        self.assertEqual(
+            sorted(lines[2]['metrics']['participant_ids']),
+            sorted(participant['id'] for participant in lines[2]['participants'])
+        )
+
+    def test_chunks_keep_order(self) -> None:
+        ids = ','.join(str(session.id) for session in reversed(self.sessions))
+        expected = self.get_lines(ids)
+        with mock.patch('parsing.api.BATCH_CHUNK_SIZE', 1):
+            self.assertEqual(self.get_lines(ids), expected)
+
+    def test_recalculates_missing_metrics(self) -> None:
+        session = self.sessions[0]
+        stored = SessionMetrics.objects.get(parsing_session=session).data
+        SessionMetrics.objects.filter(parsing_session=session).delete()
+
+        # Внутри транзакции TestCase update_or_create выполняет еще две команды SAVEPOINT
+        with mock.patch('parsing.api.BATCH_RECALCULATION_QUERIES', 6):
+            lines = self.get_lines(str(session.id))
+        self.assertEqual(lines[0]['metrics'], stored)
+        self.assertTrue(SessionMetrics.objects.filter(parsing_session=session).exists())
+
+    def test_session_cap(self) -> None:
+        ids = ','.join(str(session_id) for session_id in range(1, BATCH_MAX_SESSIONS + 2))
+        response = self.client.get(BATCH_URL, {'ids': ids})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ids', response.json())
+
+        # Повторяющиеся идентификаторы не учитываются в ограничении
+        ids = ','.join([str(self.sessions[0].id)] * (BATCH_MAX_SESSIONS + 1))
+        self.assertEqual(len(self.get_lines(ids)), 1)
+
+    def test_invalid_ids(self) -> None:
+        for ids in ('', ',', '1,a', '1.5'):
+            with self.subTest(ids=ids):
+                response = self.client.get(BATCH_URL, {'ids': ids})
+                self.assertEqual(response.status_code, 400)
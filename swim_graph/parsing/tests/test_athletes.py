@@ -0,0 +1,117 @@
+"""Тесты определения спортсменов по имени и году рождения."""
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from parsing.athletes import (
+    UNPARSED_NAME, AthleteResolver, get_athlete_key, is_athlete_name, normalize_athlete_name
+)
+from parsing.models import Athlete, ParsingSession, ProtocolData
+from parsing.utils import save_parse_data
+from .helpers import create_report_session
+from .report_data import FINAL_100M, FINAL_200M
+
+
+class AthleteNameTest(SimpleTestCase):
+    """Нормализация имени спортсмена."""
+
+    def test_normalize(self) -> None:
+        self.assertEqual(normalize_athlete_name('  Иванов   Артём '), 'ИВАНОВ АРТЕМ')
+        self.assertEqual(normalize_athlete_name('ёлкин\tфёдор'), 'ЕЛКИН ФЕДОР')
+        self.assertEqual(
+            get_athlete_key('Иванов Артём', 2006), get_athlete_key('ИВАНОВ  АРТЕМ', 2006)
+        )
+        self.assertNotEqual(
+            get_athlete_key('Иванов Артём', 2006), get_athlete_key('Иванов Артём', None)
+        )
+
+    def test_is_athlete_name(self) -> None:
+        self.assertTrue(is_athlete_name('Иванов Иван'))
+        for name in ('', '   ', None, UNPARSED_NAME):
+            with self.subTest(name=name):
+                self.assertFalse(is_athlete_name(name))
+
+
+class AthleteResolverTest(TestCase):
+    """Поиск и создание спортсменов пачкой."""
+
+    def test_resolve_many(self) -> None:
+        resolver = AthleteResolver()
+        athletes = [
+            ('Иванов Артём', 2006), ('ИВАНОВ  Артем', 2006),
+            ('Петров Петр', None), (' Петров Петр', None),
+        ]
+        # Поиск, создание недостающих и повторный поиск созданных
+        with self.assertNumQueries(3):
+            athlete_ids = resolver.resolve_many(athletes)
+        self.assertEqual(Athlete.objects.count(), 2)
+        self.assertEqual(
+            set(Athlete.objects.values_list('name', 'name_key', 'year_of_birth')),
+            {('Иванов Артём', 'ИВАНОВ АРТЕМ', 2006), ('Петров Петр', 'ПЕТРОВ ПЕТР', None)}
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve_many(athletes), athlete_ids)
+            self.assertEqual(
+                resolver.resolve('Иванов Артем', 2006),
+                athlete_ids[('ИВАНОВ АРТЕМ', 2006)]
+            )
+
+        # Новый экземпляр находит существующих спортсменов одним запросом
+        with self.assertNumQueries(1):
+            self.assertEqual(AthleteResolver().resolve_many(athletes), athlete_ids)
+
+    def test_ingest_skips_unnamed_participants(self) -> None:
+        session = ParsingSession.objects.create(
+            file_name='Заплыв', swim_length='50m', pool_length='50m'
+        )
+        participants = []
+        for position, name in enumerate(['Иванов Иван', '', UNPARSED_NAME], start=1):
+            participants.append({
+                'initials': name, 'year_of_birth': 2006, 'final_category': 'Финал A',
+                'start_position': position, 'final_position': position,
+                'reaction_time': 65, 'result': 2600 + position, 'points': 700,
+                'split_times': [],
+            })
+        save_parse_data({'participants': participants}, session)
+
+        self.assertEqual(
+            dict(session.protocoldata_set.values_list('initials', 'athlete__name')),
+            {'Иванов Иван': 'Иванов Иван', '': None, UNPARSED_NAME: None}
+        )
+        self.assertEqual(Athlete.objects.count(), 1)
+
+
+class BackfillAthletesTest(TestCase):
+    """Заполнение ссылок на спортсменов у существующих участников."""
+
+    def setUp(self) -> None:
+        self.sessions = [create_report_session(data) for data in (FINAL_100M, FINAL_200M)]
+        ProtocolData.objects.update(athlete=None)
+        Athlete.objects.all().delete()
+        for name in ('', '  ', UNPARSED_NAME, UNPARSED_NAME):
+            ProtocolData.objects.create(
+                parsing_session=self.sessions[0], initials=name, year_of_birth=2006
+            )
+
+    def test_backfill(self) -> None:
+        call_command('backfill_athletes', batch_size=2, stdout=io.StringIO())
+
+        named = ProtocolData.objects.filter(
+            initials__in=['Иванов Иван', 'Петров Петр', 'Сидоров Сидор']
+        )
+        self.assertFalse(named.filter(athlete__isnull=True).exists())
+        self.assertEqual(
+            named.filter(initials='Иванов Иван').values('athlete').distinct().count(), 1
+        )
+        self.assertEqual(
+            Athlete.objects.count(),
+            ProtocolData.objects.exclude(initials__in=['', '  ', UNPARSED_NAME])
+            .values('initials', 'year_of_birth').distinct().count()
+        )
+        self.assertEqual(ProtocolData.objects.filter(athlete__isnull=True).count(), 4)
+
+        # Повторный запуск не изменяет данные
+        call_command('backfill_athletes', stdout=io.StringIO())
+        self.assertEqual(ProtocolData.objects.filter(athlete__isnull=True).count(), 4)
@@ -0,0 +1,110 @@
+"""Тесты статических изображений диаграмм и их кеша."""
+import copy
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from parsing import chart_images
+from parsing.chart_images import (
+    CHART_IMAGES_DIR, get_chart_image_path, render_chart_image, render_chart_images
+)
+from parsing.metrics import ReportMetrics
+from parsing.reports import get_report_participants
+from parsing.utils import ChartGenerator
+from .helpers import create_report_session
+from .report_data import FINAL_100M, FINAL_200M
+
+# Признаки содержимого изображений по форматам
+IMAGE_SIGNATURES = {
+    'png': b'\x89PNG\r\n\x1a\n',
+    'svg': b'<svg',
+}
+
+
+@override_settings(CHART_IMAGE_WORKERS=1)
+class ChartImagesTest(TestCase):
+    """Отрисовка диаграмм отчета и кеш изображений в MEDIA_ROOT."""
+
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def get_specs(self, data: dict) -> dict:
+        """
+        Строит описания всех диаграмм отчета для заплыва.
+
+        :param data: Данные заплыва (см. report_data).
+        :return: Описания диаграмм по названиям.
+        """
+        session = create_report_session(data)
+        participants = sorted(
+            get_report_participants(session, with_splits=False), key=lambda x: x.start_position
+        )
+        charts = ChartGenerator(session, participants, ReportMetrics(session, participants))
+        return charts.generate_chart_specs(ChartGenerator.FIGURE_BUILDERS)['charts']
+
+    def test_render_all_charts(self) -> None:
+        # В заплыве на 100 м у участников нет части отрезков
+        for data in (FINAL_200M, FINAL_100M):
+            specs = self.get_specs(data)
+            self.assertEqual(set(specs), set(ChartGenerator.FIGURE_BUILDERS))
+            for image_format, signature in IMAGE_SIGNATURES.items():
+                images = render_chart_images(specs, image_format)
+                for chart_name, image in images.items():
+                    with self.subTest(swim_length=data['swim_length'], chart=chart_name):
+                        self.assertIn(signature, image[:200])
+
+    def test_image_path(self) -> None:
+        spec = self.get_specs(FINAL_100M)['average_speed_chart']
+        path = get_chart_image_path(spec, 'png')
+        self.assertEqual(get_chart_image_path(copy.deepcopy(spec), 'png'), path)
+        self.assertEqual(
+            get_chart_image_path(dict(reversed(list(spec.items()))), 'png'), path
+        )
+        self.assertTrue(path.startswith(os.path.join(self.media_root, CHART_IMAGES_DIR)))
+        self.assertTrue(path.endswith('.png'))
+
+        self.assertNotEqual(get_chart_image_path(spec, 'svg'), path)
+        changed = copy.deepcopy(spec)
+        changed['layout']['yaxis']['title']['text'] = 'Другая подпись'
+        self.assertNotEqual(get_chart_image_path(changed, 'png'), path)
+
+    def test_cached_images_are_not_rendered(self) -> None:
+        specs = self.get_specs(FINAL_100M)
+        render_patch = mock.patch.object(
+            chart_images, 'render_chart_image', wraps=render_chart_image
+        )
+        with render_patch as render:
+            images = render_chart_images(specs)
+            self.assertEqual(render.call_count, len(specs))
+            for spec in specs.values():
+                self.assertTrue(os.path.exists(get_chart_image_path(spec, 'png')))
+
+            render.reset_mock()
+            self.assertEqual(render_chart_images(specs), images)
+            render.assert_not_called()
+
+    def test_unsupported_format(self) -> None:
+        with self.assertRaises(ValueError):
+            render_chart_images({}, 'gif')
+
+    def test_view(self) -> None:
+        session = create_report_session(FINAL_100M)
+        response = self.client.get(
+            reverse('session_chart_image', args=[session.id, 'heat_map_chart', 'svg'])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn(b'<svg', response.content[:200])
+
+        response = self.client.get(
+            reverse('session_chart_image', args=[session.id, 'heat_map_chart', 'gif'])
+        )
+        self.assertEqual(response.status_code, 404)
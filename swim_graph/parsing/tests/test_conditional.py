@@ -0,0 +1,134 @@
+"""Тесты условных запросов (ETag, If-None-Match, If-Modified-Since) к отчету и API."""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from parsing.models import Pace, ParsingSession, ProtocolData
+from .helpers import create_report_session
+from .report_data import FINAL_100M
+
+
+@override_settings(REPORT_CACHE_GZIP=False)
+class ReportConditionalTest(TestCase):
+    """Ответы 304 для частей отчета по версии сессии."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.session = create_report_session(FINAL_100M)
+        self.urls = [
+            reverse('session_results', args=[self.session.id]),
+            reverse('session_chart_specs', args=[self.session.id]),
+            reverse('session_report_section', args=[self.session.id, 'leader_gap']),
+            f'/api/v1/sessions/{self.session.id}/',
+            f'/api/v1/sessions/{self.session.id}/metrics/',
+        ]
+
+    def test_not_modified(self) -> None:
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertEqual(etag, f'"{self.session.etag}"')
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=http_date(self.session.updated.timestamp())
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def assertEtagChanged(self, old_etag: str) -> None:
+        """
+        Проверяет, что после изменения отчета старый ETag больше не подходит.
+
+        :param old_etag: ETag до изменения.
+        """
+        session = ParsingSession.objects.get(id=self.session.id)
+        self.assertNotEqual(f'"{session.etag}"', old_etag)
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=old_etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['ETag'], f'"{session.etag}"')
+
+    def test_participant_change(self) -> None:
+        old_etag = f'"{self.session.etag}"'
+        participant = ProtocolData.objects.filter(parsing_session=self.session).first()
+        participant.points += 1
+        participant.save()
+        self.assertEtagChanged(old_etag)
+
+    def test_settings_change(self) -> None:
+        old_etag = f'"{self.session.etag}"'
+        pace = Pace.objects.get(parsing_session=self.session)
+        pace.status = False
+        pace.save()
+        self.assertEtagChanged(old_etag)
+
+    def test_session_change(self) -> None:
+        old_etag = f'"{self.session.etag}"'
+        version = self.session.version
+        self.session.file_name = 'Новое название'
+        self.session.save()
+        self.assertEqual(self.session.version, version + 1)
+        self.assertEtagChanged(old_etag)
+
+    def test_other_session_change(self) -> None:
+        etag = f'"{self.session.etag}"'
+        create_report_session(FINAL_100M)
+        response = self.client.get(self.urls[1], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(REPORT_CACHE_GZIP=True)
+class CompressedReportConditionalTest(TestCase):
+    """Сжатые и несжатые части отчета помечаются разными ETag."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.session = create_report_session(FINAL_100M)
+        self.url = reverse('session_chart_specs', args=[self.session.id])
+
+    def test_encoding_variants(self) -> None:
+        plain = self.client.get(self.url)
+        compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed['ETag'], f'"{self.session.etag}-gzip"')
+        self.assertNotEqual(plain['ETag'], compressed['ETag'])
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=plain['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class ApiListConditionalTest(TestCase):
+    """Списки API помечаются ETag по содержимому."""
+
+    def setUp(self) -> None:
+        self.session = create_report_session(FINAL_100M)
+
+    def test_content_etag(self) -> None:
+        url = '/api/v1/sessions/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.session.file_name = 'Новое название'
+        self.session.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
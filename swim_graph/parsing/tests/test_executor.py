@@ -0,0 +1,91 @@
+"""Тесты построения разделов отчета в пуле потоков и процессов."""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Dict
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase, override_settings
+
+from parsing import executor
+from parsing.executor import EXECUTOR_PROCESS, EXECUTOR_SERIAL, EXECUTOR_THREAD
+from parsing.metrics import ReportMetrics
+from parsing.reports import generate_tables, get_active_settings, get_report_participants
+from parsing.utils import ChartGenerator
+from .helpers import create_report_session
+from .report_data import FINAL_100M, FINAL_200M
+
+# Пулы построения разделов по режимам
+EXECUTOR_POOLS = {
+    EXECUTOR_THREAD: ThreadPoolExecutor,
+    EXECUTOR_PROCESS: ProcessPoolExecutor,
+}
+
+
+class RunSectionsTest(TestCase):
+    """Все режимы построения разделов дают одинаковый отчет."""
+
+    def setUp(self) -> None:
+        self.sessions = [create_report_session(data) for data in (FINAL_200M, FINAL_100M)]
+
+    def build_report(self, mode: str) -> Dict[str, Any]:
+        """
+        Строит таблицы и описания диаграмм сессий в указанном режиме
+        на отдельном пуле, который закрывается после построения.
+
+        :param mode: Режим построения (настройка REPORT_EXECUTOR).
+        :return: Таблицы и описания диаграмм по сессиям.
+        """
+        report = {}
+        with override_settings(REPORT_EXECUTOR=mode, REPORT_EXECUTOR_WORKERS=2), \
+                mock.patch.object(executor, '_executor', None):
+            for session in self.sessions:
+                participants = sorted(
+                    get_report_participants(session), key=lambda x: x.start_position
+                )
+                charts = ChartGenerator(session, participants)
+                report[session.id] = {
+                    'tables': generate_tables(
+                        session, participants, get_active_settings(session)
+                    ),
+                    'charts': charts.generate_chart_specs(ChartGenerator.FIGURE_BUILDERS),
+                }
+            pool = executor._executor
+            if mode == EXECUTOR_SERIAL:
+                self.assertIsNone(pool)
+            else:
+                self.assertIsInstance(pool, EXECUTOR_POOLS[mode])
+                pool.shutdown()
+        return report
+
+    def test_modes_produce_identical_output(self) -> None:
+        serial = self.build_report(EXECUTOR_SERIAL)
+        for mode in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            with self.subTest(mode=mode):
+                self.assertEqual(self.build_report(mode), serial)
+
+
+class MetricsSnapshotTest(TestCase):
+    """Снимок показателей для передачи в пул."""
+
+    def test_snapshot_is_read_only(self) -> None:
+        session = create_report_session(FINAL_100M)
+        participants = sorted(get_report_participants(session), key=lambda x: x.start_position)
+        metrics = ReportMetrics(session, participants)
+        self.assertIs(metrics.snapshot(), metrics)
+
+        properties = [
+            name for name, value in vars(ReportMetrics).items()
+            if isinstance(value, cached_property)
+        ]
+        self.assertTrue(set(properties) <= set(vars(metrics)))
+        arrays = [value for value in vars(metrics).values() if isinstance(value, np.ndarray)]
+        self.assertTrue(arrays)
+        for array in arrays:
+            self.assertFalse(array.flags.writeable)
+        with self.assertRaises(ValueError):
+            metrics.split_seconds[0, 0] = 0.0
+
+        # Снимок не обращается к базе данных
+        with self.assertNumQueries(0):
+            ChartGenerator(session, participants, metrics).build_heat_map_spec()
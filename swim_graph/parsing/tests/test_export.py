@@ -0,0 +1,151 @@
+"""Тесты выгрузки отчетов в архив."""
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from parsing import export, tasks
+from .helpers import create_report_session
+from .report_data import FINAL_50M, FINAL_100M
+
+
+class ExportTestMixin:
+    """Временный каталог MEDIA_ROOT для архивов выгрузки."""
+
+    def setUp(self) -> None:
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.exports_dir = os.path.join(media_root, tasks.EXPORTS_DIR)
+
+
+# Выгрузка выполняется в запросе независимо от наличия брокера Celery
+@mock.patch.object(
+    tasks.export_reports_task, 'delay', lambda *args: tasks.export_reports_task(*args)
+)
+class ReportsExportViewTest(ExportTestMixin, TransactionTestCase):
+    """
+    Запуск выгрузки, статус и скачивание архива.
+    Отчеты строятся в отдельных потоках со своими подключениями к базе данных,
+    поэтому данные теста сохраняются без транзакции TestCase.
+    """
+
+    # Настройки, добавленные миграциями (Number_participants), восстанавливаются после теста
+    serialized_rollback = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.sessions = [create_report_session(data) for data in (FINAL_100M, FINAL_50M)]
+        self.staff = get_user_model().objects.create_user(
+            'staff', password='password', is_staff=True
+        )
+
+    def start_export(self, export_format: str, session_ids: list) -> HttpResponse:
+        """
+        Запускает выгрузку отчетов.
+
+        :param export_format: Формат отчетов.
+        :param session_ids: Идентификаторы сессий.
+        :return: Ответ представления выгрузки.
+        """
+        return self.client.post(
+            reverse('reports_export'), {'format': export_format, 'session': session_ids}
+        )
+
+    def test_staff_only(self) -> None:
+        self.client.force_login(
+            get_user_model().objects.create_user('user', password='password')
+        )
+        urls = [
+            reverse('reports_export'),
+            reverse('reports_export_status', args=['abc']),
+            reverse('reports_export_download', args=['abc']),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.post(url, {'session': [self.sessions[0].id]})
+                self.assertEqual(response.status_code, 302)
+                self.assertIn(reverse('admin:login'), response['Location'])
+
+    def test_xlsx_export(self) -> None:
+        self.client.force_login(self.staff)
+        session_ids = [session.id for session in self.sessions]
+        response = self.start_export(export.EXPORT_XLSX, session_ids + [session_ids[0], 0])
+        self.assertEqual(response.status_code, 202)
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], tasks.EXPORT_DONE)
+        self.assertEqual(status['count'], 2)
+
+        download = self.client.get(status['download_url'])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(download.streaming_content)))
+        self.assertEqual(archive.namelist(), [
+            f'{export.get_export_name(session)}.xlsx' for session in self.sessions
+        ])
+
+        workbook = load_workbook(io.BytesIO(archive.read(archive.namelist()[0])))
+        rows = list(workbook['Результаты заплыва'].values)
+        # Колонки отрезков - все дистанции сессии, отсутствующий отрезок - прочерк
+        self.assertEqual(list(rows[0][-2:]), [50, 100])
+        self.assertEqual(
+            {row[2]: row[-2:] for row in rows[1:]},
+            {
+                'Иванов Иван': ('00:26.00', '00:55.00'),
+                'Петров Петр': ('00:25.00', '-'),
+                'Сидоров Сидор': ('-', '-'),
+            }
+        )
+
+    def test_html_export(self) -> None:
+        self.client.force_login(self.staff)
+        response = self.start_export(export.EXPORT_HTML, [self.sessions[0].id])
+        status = self.client.get(response.json()['status_url']).json()
+        download = self.client.get(status['download_url'])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(download.streaming_content)))
+        self.assertIn(f'{export.get_export_name(self.sessions[0])}.html', archive.namelist())
+        self.assertIn(f'{export.EXPORT_ASSETS_DIR}/plotly.min.js', archive.namelist())
+
+    @override_settings(EXPORT_MAX_SESSIONS=1)
+    def test_session_limit(self) -> None:
+        self.client.force_login(self.staff)
+        response = self.start_export(
+            export.EXPORT_HTML, [session.id for session in self.sessions]
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_request(self) -> None:
+        self.client.force_login(self.staff)
+        self.assertEqual(self.start_export('pdf', [self.sessions[0].id]).status_code, 400)
+        self.assertEqual(self.start_export(export.EXPORT_HTML, [0]).status_code, 400)
+        response = self.client.get(reverse('reports_export_status', args=['abc']))
+        self.assertEqual(response.status_code, 404)
+
+
+class RemoveExpiredExportsTest(ExportTestMixin, TestCase):
+    """Удаление устаревших архивов выгрузки."""
+
+    def test_remove_expired(self) -> None:
+        self.assertEqual(tasks.remove_expired_exports(60), 0)
+
+        os.makedirs(self.exports_dir)
+        old_time = time.time() - 120
+        for name in ('old.zip', 'old.zip.tmp', 'new.zip'):
+            path = os.path.join(self.exports_dir, name)
+            with open(path, 'wb') as file:
+                file.write(b'zip')
+            if name.startswith('old'):
+                os.utime(path, (old_time, old_time))
+
+        self.assertEqual(tasks.remove_expired_exports(60), 2)
+        self.assertEqual(os.listdir(self.exports_dir), ['new.zip'])
@@ -0,0 +1,110 @@
+"""Тесты расчета показателей отчета ReportMetrics."""
+import numpy as np
+from django.test import TestCase, override_settings
+
+from parsing.metrics import ReportMetrics, to_cells
+from parsing.models import SessionMetrics
+from parsing.reports import get_report_participants
+from .helpers import create_report_session
+from .report_data import FINAL_100M
+
+
+class ReportMetricsTestMixin:
+    """Проверки рядов ReportMetrics для участников в порядке стартовых позиций."""
+
+    def setUp(self) -> None:
+        self.session = create_report_session(FINAL_100M)
+        self.participants = sorted(
+            get_report_participants(self.session), key=lambda x: x.start_position
+        )
+        self.metrics = ReportMetrics(self.session, self.participants)
+
+    def assertSeries(self, values: np.ndarray, expected: list) -> None:
+        """
+        Сравнивает ряд с ожидаемыми значениями, NaN равны между собой.
+
+        :param values: Рассчитанный ряд.
+        :param expected: Ожидаемые значения (np.nan - отсутствующее значение).
+        """
+        np.testing.assert_allclose(values, np.array(expected, dtype=np.float64))
+
+    def test_times(self) -> None:
+        self.assertEqual(self.metrics.distances.tolist(), [50, 100])
+        self.assertSeries(self.metrics.result_seconds, [58.0, 55.0, 56.0])
+        self.assertSeries(self.metrics.reaction_seconds, [0.7, 0.65, np.nan])
+        self.assertSeries(self.metrics.split_seconds, [
+            [np.nan, 26.0, 25.0],
+            [np.nan, 55.0, np.nan],
+        ])
+        # Отсутствующий отрезок заменяется итоговым результатом
+        self.assertSeries(self.metrics.report_times, [
+            [58.0, 26.0, 25.0],
+            [58.0, 55.0, 56.0],
+        ])
+
+    def test_speeds(self) -> None:
+        self.assertSeries(self.metrics.lap_speeds, [
+            [50 / 58, 50 / 26, 50 / 25],
+            [50 / 58, 50 / 55, 50 / 56],
+        ])
+        self.assertSeries(self.metrics.speed_drop, [
+            [100.0, 100.0, 100.0],
+            [np.nan, 26 / 55 * 100, np.nan],
+        ])
+
+    def test_leader_gaps(self) -> None:
+        self.assertEqual(self.metrics.leader_index, 1)
+        self.assertSeries(self.metrics.leader_times, [26.0, 55.0])
+        self.assertSeries(self.metrics.leader_gaps, [
+            [32.0, 0.0, -1.0],
+            [3.0, 0.0, 1.0],
+        ])
+
+    def test_start_finish_and_heat_map(self) -> None:
+        self.assertSeries(self.metrics.start_finish_deltas, [0.0, 29.0, 0.0])
+        self.assertEqual(self.metrics.heat_map_distances.tolist(), [50, 100])
+        self.assertSeries(self.metrics.heat_map, [
+            [np.nan, 26.0, 25.0],
+            [58.0, 55.0, np.nan],
+        ])
+
+    def test_settings_values(self) -> None:
+        self.assertEqual(self.metrics.number_cycles.tolist(), [0, 12, 0])
+        self.assertSeries(self.metrics.pace_per_minute, [np.nan, 12 / 10.5 * 60, np.nan])
+        self.assertSeries(self.metrics.underwater_parts, [0.0, 7.5, 0.0])
+        self.assertEqual(self.metrics.underwater_parts_raw, ['', '7.5', 'abc'])
+
+    def test_without_leader(self) -> None:
+        for participant in self.participants:
+            participant.final_position += 1
+        metrics = ReportMetrics(self.session, self.participants)
+        self.assertIsNone(metrics.leader_index)
+        self.assertSeries(metrics.leader_times, [0.0, 0.0])
+
+    def test_for_report_uses_stored_metrics(self) -> None:
+        stored = SessionMetrics.objects.get(parsing_session=self.session)
+        self.assertTrue(stored.is_actual(self.session))
+
+        metrics = ReportMetrics.for_report(self.session, self.participants)
+        self.assertIn('split_seconds', metrics.__dict__)
+        self.assertEqual(to_cells(metrics.leader_gaps), to_cells(self.metrics.leader_gaps))
+        self.assertEqual(to_cells(metrics.heat_map), to_cells(self.metrics.heat_map))
+        self.assertEqual(
+            to_cells(metrics.start_finish_deltas), to_cells(self.metrics.start_finish_deltas)
+        )
+
+    def test_load_rejects_other_participants(self) -> None:
+        stored = SessionMetrics.objects.get(parsing_session=self.session)
+        metrics = ReportMetrics(self.session, self.participants[:2])
+        self.assertFalse(metrics.load(stored.data))
+        self.assertNotIn('split_seconds', metrics.__dict__)
+
+
+@override_settings(PACKED_SPLITS=False)
+class RowSplitsMetricsTest(ReportMetricsTestMixin, TestCase):
+    """Показатели по отрезкам, сохраненным строками SwimSplitTime."""
+
+
+@override_settings(PACKED_SPLITS=True)
+class PackedSplitsMetricsTest(ReportMetricsTestMixin, TestCase):
+    """Показатели по отрезкам, упакованным в ProtocolData.packed_splits."""
@@ -0,0 +1,119 @@
+"""Тесты пагинации списка сессий по курсору."""
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from parsing.models import ParsingSession
+from parsing.pagination import (
+    COUNT_VERSION_CACHE_KEY, KEYSET_ORDERING, decode_cursor, encode_cursor, get_count_cache_key,
+    get_keyset_page, invalidate_sessions_count
+)
+
+
+class CursorTest(TestCase):
+    """Кодирование и декодирование курсора."""
+
+    def test_round_trip(self) -> None:
+        session = ParsingSession.objects.create(file_name='Заплыв')
+        for backwards in (False, True):
+            cursor = encode_cursor(session, backwards=backwards)
+            self.assertNotIn('=', cursor)
+            self.assertEqual(decode_cursor(cursor), (session.created, session.id, backwards))
+
+    def test_invalid_cursor(self) -> None:
+        for cursor in ('', 'abc', 'W10', 'WyJ4IiwgMSwgZmFsc2Vd'):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class KeysetPageTest(TestCase):
+    """Переходы по страницам курсора в обе стороны."""
+
+    def setUp(self) -> None:
+        created = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        for i in range(11):
+            session = ParsingSession.objects.create(file_name=f'Заплыв {i}')
+            # У пар сессий одинаковое время создания: порядок внутри пары задает id
+            ParsingSession.objects.filter(id=session.id).update(
+                created=created + timedelta(minutes=i // 2)
+            )
+        self.queryset = ParsingSession.objects.order_by(*KEYSET_ORDERING)
+        self.expected = [session.id for session in self.queryset]
+
+    def test_forward_and_backward(self) -> None:
+        first = list(self.queryset[:4])
+        pages = [first]
+        page = get_keyset_page(self.queryset, encode_cursor(first[-1]), 4)
+        while True:
+            pages.append(page.object_list)
+            self.assertTrue(page.has_previous())
+            if not page.has_next():
+                break
+            page = get_keyset_page(self.queryset, page.next_cursor, 4)
+
+        ids = [session.id for objects in pages for session in objects]
+        self.assertEqual(ids, self.expected)
+        self.assertEqual([len(objects) for objects in pages], [4, 4, 3])
+
+        previous = get_keyset_page(self.queryset, page.previous_cursor, 4)
+        self.assertEqual(previous.object_list, pages[1])
+        self.assertTrue(previous.has_next())
+        self.assertTrue(previous.has_previous())
+
+        previous = get_keyset_page(self.queryset, previous.previous_cursor, 4)
+        self.assertEqual(previous.object_list, pages[0])
+        self.assertFalse(previous.has_previous())
+
+    def test_empty_page(self) -> None:
+        last = self.queryset.last()
+        page = get_keyset_page(self.queryset, encode_cursor(last), 4)
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_next())
+        self.assertFalse(page.has_previous())
+
+
+class SessionsListCursorTest(TestCase):
+    """Список сессий с параметром cursor."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        for i in range(15):
+            ParsingSession.objects.create(file_name=f'Заплыв {i}')
+        self.expected = list(ParsingSession.objects.order_by(*KEYSET_ORDERING))
+
+    def test_cursor_page(self) -> None:
+        response = self.client.get(
+            reverse('sessions_list'), {'cursor': encode_cursor(self.expected[9])}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['sessions']), self.expected[10:])
+
+    def test_invalid_cursor_falls_back_to_page(self) -> None:
+        response = self.client.get(reverse('sessions_list'), {'cursor': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['sessions'].number, 1)
+        self.assertEqual(list(response.context['sessions']), self.expected[:10])
+
+
+class CountCacheKeyTest(TestCase):
+    """Версия ключа кеша количества сессий."""
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_invalidate(self) -> None:
+        key = get_count_cache_key('q=')
+        self.assertEqual(get_count_cache_key('q='), key)
+        invalidate_sessions_count()
+        self.assertNotEqual(get_count_cache_key('q='), key)
+
+    def test_evicted_version_is_not_reused(self) -> None:
+        old_keys = set()
+        for _ in range(3):
+            old_keys.add(get_count_cache_key('q='))
+            # Версия вытеснена из кеша, а количества под прежними версиями еще хранятся
+            cache.delete(COUNT_VERSION_CACHE_KEY)
+            invalidate_sessions_count()
+            self.assertNotIn(get_count_cache_key('q='), old_keys)
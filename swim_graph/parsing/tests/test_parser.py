@@ -0,0 +1,75 @@
+"""Тесты разбора отрезков протокола и их сохранения."""
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from parsing.models import ParsingSession, SwimSplitTime
+from parsing.utils import SwimParser, get_unique_split_times, save_parse_data
+
+
+class SplitTimesParserTest(SimpleTestCase):
+    """Разбор строк с промежуточными результатами."""
+
+    def setUp(self) -> None:
+        self.parser = SwimParser()
+        self.parser.parse_results['participants'].append({
+            **self.parser.participant_template,
+            'initials': 'Иванов Иван', 'year_of_birth': 2006, 'split_times': [],
+        })
+
+    def test_parse_split_times(self) -> None:
+        self.assertEqual(
+            self.parser.parse_split_times('100m: 28.90 55.00 50m: 26.10 26.10'),
+            {'split_times': [
+                {'distance': 50, 'split_time': 2610},
+                {'distance': 100, 'split_time': 5500},
+            ]}
+        )
+
+    def test_repeated_distance_replaces_time(self) -> None:
+        for line in ('50m: 26.10 26.10 100m: 28.90 55.00', '100m: 28.80 54.90 150m: 29.50 84.40'):
+            self.parser.update_participant(
+                'Иванов Иван', 2006, self.parser.parse_split_times(line)
+            )
+        participant = self.parser.parse_results['participants'][0]
+        self.assertEqual(participant['split_times'], [
+            {'distance': 50, 'split_time': 2610},
+            {'distance': 100, 'split_time': 5490},
+            {'distance': 150, 'split_time': 8440},
+        ])
+
+    def test_unique_split_times(self) -> None:
+        split_times = [
+            {'distance': 100, 'split_time': 5500},
+            {'distance': 50, 'split_time': 2600},
+            {'distance': 100, 'split_time': 5490},
+        ]
+        self.assertEqual(get_unique_split_times(split_times), [
+            {'distance': 50, 'split_time': 2600},
+            {'distance': 100, 'split_time': 5490},
+        ])
+        self.assertEqual(get_unique_split_times([]), [])
+
+
+@override_settings(PACKED_SPLITS=False)
+class SaveDuplicateSplitsTest(TestCase):
+    """Сохранение участника с повторяющимися дистанциями."""
+
+    def test_last_split_is_saved(self) -> None:
+        session = ParsingSession.objects.create(
+            file_name='Заплыв', swim_length='100m', pool_length='50m'
+        )
+        save_parse_data({'participants': [{
+            'initials': 'Иванов Иван', 'year_of_birth': 2006, 'final_category': 'Финал A',
+            'start_position': 4, 'final_position': 1, 'reaction_time': 65,
+            'result': 5490, 'points': 700,
+            'split_times': [
+                {'distance': 50, 'split_time': 2600},
+                {'distance': 100, 'split_time': 5500},
+                {'distance': 100, 'split_time': 5490},
+            ],
+        }]}, session)
+
+        splits = SwimSplitTime.objects.filter(protocol_data__parsing_session=session)
+        self.assertEqual(
+            list(splits.order_by('distance').values_list('distance', 'split_time')),
+            [(50, 2600), (100, 5490)]
+        )
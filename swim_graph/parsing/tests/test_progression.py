@@ -0,0 +1,113 @@
+"""Тесты динамики результатов спортсмена."""
+import json
+from datetime import datetime, timezone
+
+from django.test import TestCase
+from django.urls import reverse
+
+from parsing.models import Athlete, ParsingSession
+from parsing.progression import AthleteProgression, get_athlete_races
+from .helpers import create_report_session
+from .report_data import FINAL_100M, FINAL_200M
+
+
+class AthleteProgressionTest(TestCase):
+    """Заплывы спортсмена с построчными и упакованными отрезками."""
+
+    def setUp(self) -> None:
+        with self.settings(PACKED_SPLITS=False):
+            self.row_session = create_report_session(FINAL_100M)
+        with self.settings(PACKED_SPLITS=True):
+            self.packed_session = create_report_session(FINAL_200M)
+        ParsingSession.objects.filter(id=self.row_session.id).update(
+            created=datetime(2023, 5, 1, tzinfo=timezone.utc)
+        )
+        ParsingSession.objects.filter(id=self.packed_session.id).update(
+            created=datetime(2024, 5, 1, tzinfo=timezone.utc)
+        )
+        self.athlete = Athlete.objects.get(name='Иванов Иван', year_of_birth=2006)
+
+    def test_races(self) -> None:
+        races = get_athlete_races(self.athlete)
+        self.assertEqual(
+            [race['parsing_session_id'] for race in races],
+            [self.row_session.id, self.packed_session.id]
+        )
+        self.assertEqual(races[0]['split_distances'], [50, 100])
+        self.assertEqual(races[0]['split_times'], [2600, 5500])
+        self.assertEqual(races[1]['split_distances'], [50, 100, 150, 200])
+        self.assertEqual(races[1]['split_times'], [2675, 5541, 8412, 11234])
+        self.assertEqual([race['result'] for race in races], [5500, 11234])
+
+    def test_season(self) -> None:
+        races = get_athlete_races(self.athlete, 2024)
+        self.assertEqual([race['parsing_session_id'] for race in races], [self.packed_session.id])
+        self.assertEqual(get_athlete_races(self.athlete, 2022), [])
+
+    def test_constant_queries(self) -> None:
+        with self.assertNumQueries(1):
+            get_athlete_races(self.athlete)
+        for data in (FINAL_100M, FINAL_200M, FINAL_100M):
+            create_report_session(data)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_athlete_races(self.athlete)), 5)
+
+    def test_lap_speeds(self) -> None:
+        progression = AthleteProgression(self.athlete, get_athlete_races(self.athlete))
+        # Время отрезка - разность соседних накопленных отрезков
+        expected = [
+            [50 / 26.00, 50 / 29.00],
+            [50 / 26.75, 50 / 28.66, 50 / 28.71, 50 / 28.22],
+        ]
+        for speeds, expected_speeds in zip(progression.lap_speeds, expected):
+            self.assertEqual(len(speeds), len(expected_speeds))
+            for speed, expected_speed in zip(speeds, expected_speeds):
+                self.assertAlmostEqual(speed, expected_speed)
+
+    def test_missing_split(self) -> None:
+        athlete = Athlete.objects.get(name='Петров Петр', year_of_birth=2005)
+        races = get_athlete_races(athlete)
+        progression = AthleteProgression(athlete, races)
+        self.assertEqual(races[0]['split_times'], [2500])
+        self.assertEqual(progression.to_dict()['races'][0]['lap_speeds'], [2.0])
+
+
+class AthleteProgressionViewTest(TestCase):
+    """Страница и JSON динамики спортсмена."""
+
+    def setUp(self) -> None:
+        create_report_session(FINAL_100M)
+        self.athlete = Athlete.objects.get(name='Иванов Иван', year_of_birth=2006)
+        self.season = ParsingSession.objects.get().created.year
+
+    def test_page(self) -> None:
+        response = self.client.get(reverse('athlete_progression', args=[self.athlete.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Иванов Иван')
+        self.assertEqual(response.context['seasons'], [self.season])
+        self.assertEqual(len(response.context['races']), 1)
+
+        response = self.client.get(
+            reverse('athlete_progression', args=[self.athlete.id]), {'season': self.season - 1}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['races'], [])
+
+    def test_data(self) -> None:
+        url = reverse('athlete_progression_data', args=[self.athlete.id])
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual(data['athlete']['id'], self.athlete.id)
+        self.assertEqual(data['races'][0]['split_times'], [26.0, 55.0])
+        self.assertEqual(
+            sorted(data['charts']),
+            ['average_speed_chart', 'lap_speed_chart', 'reaction_chart', 'result_chart']
+        )
+
+        data = json.loads(self.client.get(url, {'season': self.season + 1}).content)
+        self.assertEqual(data['races'], [])
+
+    def test_missing_athlete(self) -> None:
+        for name in ('athlete_progression', 'athlete_progression_data'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=[self.athlete.id + 1000]))
+                self.assertEqual(response.status_code, 404)
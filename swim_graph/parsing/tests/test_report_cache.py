@@ -0,0 +1,130 @@
+"""Тесты кеша отчетов: одновременное построение частей и предварительный прогрев."""
+import threading
+import time
+from typing import Any, List
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from parsing.report_cache import (
+    _get_part_key, decode_report_payload, get_cached_report_part, get_cached_report_payload,
+    get_report_cache_stats, invalidate_report
+)
+from parsing.reports import prewarm_report
+from .helpers import create_report_session
+from .report_data import FINAL_100M
+
+# Кеш в памяти процесса: общий для потоков теста
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'report-cache-tests',
+    }
+}
+
+
+class CountingBuilder:
+    """Функция построения части отчета, считающая вызовы."""
+
+    def __init__(self, value: Any, delay: float = 0.0) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> Any:
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+@override_settings(CACHES=LOCMEM_CACHES, REPORT_BUILD_WAIT=5, REPORT_BUILD_LOCK_TIMEOUT=60)
+class SingleFlightTest(SimpleTestCase):
+    """Одновременные запросы части отчета строят ее один раз."""
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_concurrent_requests_build_once(self) -> None:
+        build = CountingBuilder({'charts': [1, 2, 3]}, delay=0.3)
+        barrier = threading.Barrier(6)
+        results: List[Any] = []
+
+        def request() -> None:
+            barrier.wait()
+            results.append(get_cached_report_part(1, 'charts', build))
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(build.calls, 1)
+        self.assertEqual(results, [{'charts': [1, 2, 3]}] * 6)
+        self.assertIsNone(cache.get(f'{_get_part_key(1, "charts")}:lock'))
+
+    def test_cached_part_is_not_rebuilt(self) -> None:
+        build = CountingBuilder('table')
+        for _ in range(3):
+            self.assertEqual(get_cached_report_part(1, 'table', build), 'table')
+        self.assertEqual(build.calls, 1)
+
+        invalidate_report(1)
+        self.assertEqual(get_cached_report_part(1, 'table', build), 'table')
+        self.assertEqual(build.calls, 2)
+
+    @override_settings(REPORT_BUILD_WAIT=0.2)
+    def test_builds_after_wait_timeout(self) -> None:
+        # Блокировку держит процесс, который не сохранит часть в кеш
+        cache.add(f'{_get_part_key(1, "table")}:lock', 1)
+        build = CountingBuilder('table')
+        started = time.monotonic()
+        self.assertEqual(get_cached_report_part(1, 'table', build), 'table')
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(build.calls, 1)
+
+    def test_lock_released_on_error(self) -> None:
+        def failing_build() -> None:
+            raise RuntimeError('ошибка построения')
+
+        with self.assertRaises(RuntimeError):
+            get_cached_report_part(1, 'table', failing_build)
+        self.assertIsNone(cache.get(f'{_get_part_key(1, "table")}:lock'))
+
+        build = CountingBuilder('table')
+        self.assertEqual(get_cached_report_part(1, 'table', build), 'table')
+        self.assertEqual(build.calls, 1)
+
+    def test_payload_encoding(self) -> None:
+        content = '<table>отчет</table>' * 50
+        with self.settings(REPORT_CACHE_GZIP=True):
+            payload = get_cached_report_payload(1, 'section', lambda: content)
+        self.assertEqual(payload['encoding'], 'gzip')
+        self.assertEqual(decode_report_payload(payload).decode(), content)
+        self.assertEqual(decode_report_payload(payload, 'gzip'), payload['content'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PrewarmReportTest(TestCase):
+    """Прогрев кеша отчета после загрузки."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.session = create_report_session(FINAL_100M)
+
+    def test_prewarm_builds_sections_and_charts(self) -> None:
+        prewarm_report(self.session.id)
+
+        def unexpected_build() -> str:
+            raise AssertionError('часть отчета должна быть в кеше')
+
+        for part in ('charts', 'section:leader_gap', 'section:average_speed'):
+            with self.subTest(part=part):
+                payload = get_cached_report_payload(self.session.id, part, unexpected_build)
+                self.assertTrue(decode_report_payload(payload))
+
+    def test_prewarm_missing_session(self) -> None:
+        prewarm_report(self.session.id + 1000)
+        self.assertEqual(get_report_cache_stats()['misses'], 0)
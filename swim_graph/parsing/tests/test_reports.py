@@ -0,0 +1,128 @@
+"""
+Сравнение диаграмм и таблиц отчета с эталонами.
+
+Эталоны в каталоге golden построены исходной реализацией отчета (коммит 30cb4fb:
+plotly graph_objects и строковые таблицы, время в TimeField) по данным report_data.
+Описания диаграмм сравниваются после проверки через graph_objects,
+числа с плавающей точкой - с точностью до 1e-9.
+"""
+import json
+import math
+from pathlib import Path
+from typing import Any
+
+import plotly.graph_objects as go
+from django.test import TestCase, override_settings
+from plotly.io.json import to_json_plotly
+
+from parsing.metrics import ReportMetrics
+from parsing.reports import CHARTS_MAPPING, generate_tables, get_active_settings, \
+    get_report_participants
+from parsing.utils import ChartGenerator
+from .helpers import create_report_session
+from .report_data import REPORT_SESSIONS
+
+# Каталог с эталонными диаграммами и таблицами
+GOLDEN_DIR = Path(__file__).resolve().parent / 'golden'
+
+# Исправленный в модели таблиц заголовок: в исходной реализации не было пробела между атрибутами
+GOLDEN_TABLE_FIXES = (
+    ("<table id='report-table'class=", "<table id='report-table' class="),
+)
+
+
+def normalize_table(html: str) -> str:
+    """
+    Применяет к эталонной таблице исправления разметки, сделанные после построения эталона.
+
+    :param html: HTML код таблицы из эталона.
+    :return: HTML код таблицы.
+    """
+    for old, new in GOLDEN_TABLE_FIXES:
+        html = html.replace(old, new)
+    return html
+
+
+def normalize_chart(spec: dict) -> dict:
+    """
+    Приводит описание диаграммы к виду, в котором оно сохранено в эталоне.
+
+    :param spec: Описание диаграммы.
+    :return: Описание диаграммы без шаблона оформления.
+    """
+    spec = go.Figure(spec).to_plotly_json()
+    spec['layout'].pop('template', None)
+    return json.loads(to_json_plotly(spec))
+
+
+class GoldenReportTestMixin:
+    """Проверки отчета по эталонам для каждого заплыва из report_data."""
+
+    def assertAlmostEqualTree(self, first: Any, second: Any, path: str = '') -> None:
+        """
+        Сравнивает вложенные словари и списки, числа - приближенно.
+
+        :param first: Проверяемое значение.
+        :param second: Ожидаемое значение.
+        :param path: Путь к значению для сообщения об ошибке.
+        """
+        if isinstance(first, float) or isinstance(second, float):
+            self.assertIsInstance(first, (int, float), path)
+            self.assertIsInstance(second, (int, float), path)
+            self.assertTrue(
+                math.isclose(first, second, abs_tol=1e-9), f'{path}: {first} != {second}'
+            )
+        elif isinstance(first, dict):
+            self.assertIsInstance(second, dict, path)
+            self.assertEqual(sorted(first), sorted(second), path)
+            for key in first:
+                self.assertAlmostEqualTree(first[key], second[key], f'{path}.{key}')
+        elif isinstance(first, list):
+            self.assertIsInstance(second, list, path)
+            self.assertEqual(len(first), len(second), path)
+            for index, (first_item, second_item) in enumerate(zip(first, second)):
+                self.assertAlmostEqualTree(first_item, second_item, f'{path}[{index}]')
+        else:
+            self.assertEqual(first, second, path)
+
+    def test_tables_match_golden(self) -> None:
+        for name, data in REPORT_SESSIONS.items():
+            with self.subTest(session=name):
+                golden = json.loads((GOLDEN_DIR / f'{name}.json').read_text(encoding='utf-8'))
+                session = create_report_session(data)
+                tables = generate_tables(
+                    session, get_report_participants(session), get_active_settings(session)
+                )
+                self.assertEqual(sorted(tables), sorted(golden['tables']))
+                for table_name, html in tables.items():
+                    self.assertEqual(
+                        html, normalize_table(golden['tables'][table_name]), table_name
+                    )
+
+    def test_charts_match_golden(self) -> None:
+        for name, data in REPORT_SESSIONS.items():
+            with self.subTest(session=name):
+                golden = json.loads((GOLDEN_DIR / f'{name}.json').read_text(encoding='utf-8'))
+                session = create_report_session(data)
+                participants = sorted(
+                    get_report_participants(session, with_splits=False),
+                    key=lambda x: x.start_position
+                )
+                charts = ChartGenerator(
+                    session, participants, ReportMetrics.for_report(session, participants)
+                ).generate_chart_specs(CHARTS_MAPPING)['charts']
+                self.assertEqual(sorted(charts), sorted(golden['charts']))
+                for chart_name, spec in charts.items():
+                    self.assertAlmostEqualTree(
+                        normalize_chart(spec), golden['charts'][chart_name], chart_name
+                    )
+
+
+@override_settings(PACKED_SPLITS=False)
+class RowSplitsReportTest(GoldenReportTestMixin, TestCase):
+    """Отчет по отрезкам, сохраненным строками SwimSplitTime."""
+
+
+@override_settings(PACKED_SPLITS=True)
+class PackedSplitsReportTest(GoldenReportTestMixin, TestCase):
+    """Отчет по отрезкам, упакованным в ProtocolData.packed_splits."""
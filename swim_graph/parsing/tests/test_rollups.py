@@ -0,0 +1,120 @@
+"""Тесты сводных показателей и страницы статистики."""
+import io
+from typing import Any, Dict, List, Type
+
+from django.core.management import call_command
+from django.db import models
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from parsing.models import ParsingSession, ResultStatistics, SplitStatistics, StatisticsRefresh
+from parsing.rollups import refresh_statistics
+from .helpers import create_report_session
+from .report_data import FINAL_50M, FINAL_100M, FINAL_200M
+
+
+def get_rows(model: Type[models.Model]) -> List[Dict[str, Any]]:
+    """
+    Возвращает сводные показатели без идентификаторов в постоянном порядке.
+
+    :param model: Модель сводных показателей.
+    :return: Строки сводных показателей.
+    """
+    rows = [
+        {field: value for field, value in row.items() if field != 'id'}
+        for row in model.objects.values()
+    ]
+    return sorted(rows, key=lambda row: str(sorted(row.items())))
+
+
+@override_settings(STATISTICS_REFRESH_DELAY=0)
+class RefreshStatisticsTest(TestCase):
+    """Пополнение сводных показателей новыми сессиями."""
+
+    def test_incremental_matches_full(self) -> None:
+        create_report_session(FINAL_100M)
+        self.assertEqual(refresh_statistics(), 1)
+        with self.settings(PACKED_SPLITS=True):
+            create_report_session(FINAL_100M)
+            create_report_session(FINAL_200M)
+        create_report_session(FINAL_50M)
+        self.assertEqual(refresh_statistics(), 3)
+        self.assertEqual(refresh_statistics(), 0)
+
+        results, splits = get_rows(ResultStatistics), get_rows(SplitStatistics)
+        call_command('refresh_statistics', '--full', stdout=io.StringIO())
+        self.assertEqual(get_rows(ResultStatistics), results)
+        self.assertEqual(get_rows(SplitStatistics), splits)
+        self.assertEqual(
+            StatisticsRefresh.objects.get().last_session_id,
+            ParsingSession.objects.order_by('id').last().id
+        )
+
+    def test_packed_and_row_splits_share_groups(self) -> None:
+        with self.settings(PACKED_SPLITS=False):
+            create_report_session(FINAL_100M)
+        refresh_statistics()
+        row_splits = get_rows(SplitStatistics)
+        self.assertEqual(len(row_splits), 3)
+
+        with self.settings(PACKED_SPLITS=True):
+            create_report_session(FINAL_100M)
+        refresh_statistics()
+        self.assertEqual(get_rows(SplitStatistics), [
+            {**row, 'split_count': row['split_count'] * 2, 'split_sum': row['split_sum'] * 2}
+            for row in row_splits
+        ])
+
+    def test_results(self) -> None:
+        create_report_session(FINAL_100M)
+        refresh_statistics()
+        first = ResultStatistics.objects.get(year_of_birth=2006)
+        self.assertEqual(
+            (first.participants, first.result_count, first.result_sum, first.result_best),
+            (1, 1, 5500, 5500)
+        )
+        self.assertEqual((first.reaction_count, first.reaction_best), (1, 65))
+        second = ResultStatistics.objects.get(year_of_birth=2005)
+        self.assertEqual((second.reaction_count, second.reaction_best), (0, None))
+
+    @override_settings(STATISTICS_REFRESH_DELAY=3600)
+    def test_skips_recent_sessions(self) -> None:
+        create_report_session(FINAL_100M)
+        self.assertEqual(refresh_statistics(), 0)
+        self.assertFalse(ResultStatistics.objects.exists())
+        self.assertEqual(StatisticsRefresh.objects.get().last_session_id, 0)
+
+
+@override_settings(STATISTICS_REFRESH_DELAY=0)
+class StatisticsViewTest(TestCase):
+    """Страница статистики с данными и без них."""
+
+    def test_without_data(self) -> None:
+        response = self.client.get(reverse('statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['season'])
+        self.assertEqual(response.context['results'], [])
+
+    def test_with_data(self) -> None:
+        session = create_report_session(FINAL_100M)
+        refresh_statistics()
+        season = session.created.year
+
+        response = self.client.get(reverse('statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['season'], season)
+        self.assertEqual(
+            [row['group'] for row in response.context['results']], [2005, 2006, 2007]
+        )
+        self.assertNotIn('split_rows', response.context)
+
+        response = self.client.get(reverse('statistics'), {
+            'season': season, 'group': 'final_category',
+            'pool_length': '50m', 'swim_length': '100m',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['split_distances'], [50, 100])
+        self.assertEqual(response.context['split_rows'], [{
+            'group': 'Финал A',
+            'splits': [{'best': 2500, 'average': 2550}, {'best': 5500, 'average': 5500}],
+        }])
@@ -0,0 +1,83 @@
+"""Тесты поиска сессий по названию и фасетам."""
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from parsing.models import ParsingSession
+from parsing.search import normalize_length, search_sessions
+
+
+def has_trigram_extension() -> bool:
+    """
+    Проверяет, что в базе данных установлено расширение pg_trgm (миграция 0014).
+
+    :return: True, если расширение установлено.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class NormalizeLengthTest(SimpleTestCase):
+    """Приведение введенной длины к формату хранения."""
+
+    def test_normalize(self) -> None:
+        for value in ('50', '50m', '50M', '50 м', '50м', ' 50 m'):
+            with self.subTest(value=value):
+                self.assertEqual(normalize_length(value), '50m')
+        self.assertEqual(normalize_length('финал'), 'финал')
+
+
+class SearchSessionsTest(TestCase):
+    """Фасеты, поиск по длине и ранжирование по названию."""
+
+    def setUp(self) -> None:
+        self.sessions = {
+            name: ParsingSession.objects.create(
+                file_name=name, pool_length=pool_length, swim_length=swim_length
+            )
+            for name, pool_length, swim_length in (
+                ('Final A', '50m', '100m'),
+                ('Final B', '25m', '50m'),
+                ('Relay', '25m', '200m'),
+                ('Semifinal', '50m', '200m'),
+            )
+        }
+
+    def search(self, *args, **kwargs) -> list:
+        """Возвращает названия найденных сессий в порядке выдачи."""
+        sessions = search_sessions(ParsingSession.objects.all(), *args, **kwargs)
+        return [session.file_name for session in sessions]
+
+    def test_facets(self) -> None:
+        self.assertEqual(self.search(), ['Semifinal', 'Relay', 'Final B', 'Final A'])
+        self.assertEqual(self.search(pool_length='25m'), ['Relay', 'Final B'])
+        self.assertEqual(self.search(swim_length='200m'), ['Semifinal', 'Relay'])
+        self.assertEqual(self.search(pool_length='50m', swim_length='200m'), ['Semifinal'])
+        # Недопустимые значения фасетов не применяются
+        self.assertEqual(len(self.search(pool_length='33m', swim_length='abc')), 4)
+
+    def test_length_term(self) -> None:
+        for term in ('50', '50 м', '50m', ' 50M '):
+            with self.subTest(term=term):
+                # Совпадение с длиной бассейна или заплыва
+                self.assertEqual(self.search(term), ['Semifinal', 'Final B', 'Final A'])
+        self.assertEqual(self.search('200', pool_length='25m'), ['Relay'])
+
+    def test_trigram_ranking(self) -> None:
+        if not has_trigram_extension():
+            self.skipTest('нет расширения pg_trgm')
+        # Более новая сессия с частичным совпадением слова ранжируется ниже
+        self.assertEqual(self.search('final'), ['Final B', 'Final A', 'Semifinal'])
+        self.assertEqual(self.search('final', pool_length='50m'), ['Final A', 'Semifinal'])
+        self.assertEqual(self.search('relay'), ['Relay'])
+        self.assertEqual(self.search('marathon'), [])
+
+    def test_sessions_list_view(self) -> None:
+        response = self.client.get(
+            reverse('sessions_list'), {'search': '50 м', 'pool_length': '25m'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [session.file_name for session in response.context['sessions']], ['Final B']
+        )
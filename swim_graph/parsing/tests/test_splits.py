@@ -0,0 +1,90 @@
+"""Тесты упакованного хранения отрезков."""
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from parsing.splits import (
+    MISSING_SPLIT, get_split_distances, pack_splits, unpack_split_list, unpack_splits
+)
+from .helpers import create_report_session
+from .report_data import FINAL_100M, FINAL_200M
+
+
+class PackSplitsTest(SimpleTestCase):
+    """Упаковка и распаковка времени отрезков."""
+
+    def test_round_trip(self) -> None:
+        distances = [50, 100, 150, 200]
+        split_times = {50: 2675, 100: 5541, 150: 8412, 200: 11234}
+        packed = pack_splits(distances, split_times)
+        self.assertEqual(len(packed), 4 * len(distances))
+        self.assertEqual(unpack_splits(packed).tolist(), [2675, 5541, 8412, 11234])
+        self.assertEqual(unpack_split_list(packed), [2675, 5541, 8412, 11234])
+
+    def test_missing_splits(self) -> None:
+        packed = pack_splits([50, 100, 150], {50: 2600, 150: None, 200: 11000})
+        self.assertEqual(unpack_splits(packed).tolist(), [2600, MISSING_SPLIT, MISSING_SPLIT])
+        self.assertEqual(unpack_split_list(packed), [2600, None, None])
+
+    def test_byte_order(self) -> None:
+        # int32 little-endian независимо от платформы
+        self.assertEqual(pack_splits([50], {50: 2705}), (2705).to_bytes(4, 'little'))
+        self.assertEqual(pack_splits([50], {}), (-1).to_bytes(4, 'little', signed=True))
+
+    def test_unpack_is_read_only(self) -> None:
+        values = unpack_splits(pack_splits([50, 100], {50: 2600, 100: 5500}))
+        self.assertFalse(values.flags.writeable)
+        with self.assertRaises(ValueError):
+            values[0] = 0
+
+    def test_empty(self) -> None:
+        self.assertEqual(pack_splits([], {50: 2600}), b'')
+        self.assertEqual(unpack_splits(b'').dtype, np.dtype('<i4'))
+        self.assertEqual(unpack_split_list(b''), [])
+
+    def test_split_distances(self) -> None:
+        split_times = [
+            {'distance': 100, 'split_time': 5500},
+            {'distance': 50, 'split_time': 2600},
+            {'distance': 100, 'split_time': None},
+        ]
+        self.assertEqual(get_split_distances(split_times), [50, 100])
+        self.assertEqual(get_split_distances([]), [])
+
+
+class PackedProtocolDataTest(TestCase):
+    """Отрезки участников при упакованном и построчном хранении."""
+
+    def get_split_times(self, packed_splits: bool, data: dict) -> dict:
+        """
+        Создает сессию и возвращает отрезки участников по стартовым позициям.
+
+        :param packed_splits: Значение настройки PACKED_SPLITS.
+        :param data: Данные заплыва (см. report_data).
+        :return: Словарь {стартовая позиция: {дистанция: время}}.
+        """
+        with self.settings(PACKED_SPLITS=packed_splits):
+            session = create_report_session(data)
+        return {
+            participant.start_position: {
+                split.distance: split.split_time for split in participant.split_times
+            }
+            for participant in session.protocoldata_set.select_related('parsing_session')
+        }
+
+    def test_split_times_match(self) -> None:
+        self.assertEqual(
+            self.get_split_times(True, FINAL_200M), self.get_split_times(False, FINAL_200M)
+        )
+
+    def test_missing_split_times(self) -> None:
+        # Упакованные отрезки возвращаются по всем дистанциям сессии, отсутствующие - None
+        self.assertEqual(self.get_split_times(True, FINAL_100M), {
+            4: {50: 2600, 100: 5500},
+            5: {50: 2500, 100: None},
+            3: {50: None, 100: None},
+        })
+        self.assertEqual(self.get_split_times(False, FINAL_100M), {
+            4: {50: 2600, 100: 5500},
+            5: {50: 2500},
+            3: {},
+        })
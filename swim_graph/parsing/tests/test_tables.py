@@ -0,0 +1,70 @@
+"""Тесты модели таблиц отчета."""
+import json
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from parsing.tables import INPUT, NUMBER, TEXT, ReportTable, TableRow
+
+
+class TableRowTest(SimpleTestCase):
+    """Форматирование значений строки таблицы."""
+
+    def test_number_row(self) -> None:
+        row = TableRow('Скорость', np.array([1.234, np.nan, 2.0]), NUMBER, missing='-')
+        self.assertEqual(row.cells(), ['1.23', '-', '2.00'])
+        self.assertEqual(row.html_cells(), ['1.23', '-', '2.00'])
+        self.assertEqual(row.raw_values(), [1.234, None, 2.0])
+
+    def test_missing_values(self) -> None:
+        row = TableRow('Время', [None, '', float('nan'), 0.0], NUMBER, missing='-')
+        self.assertEqual(row.cells(), ['-', '-', '-', '0.00'])
+        self.assertEqual(row.raw_values(), [None, None, None, 0.0])
+
+    def test_input_row(self) -> None:
+        row = TableRow('Подводная часть', ['7.5', '', 'около 8', None], INPUT)
+        self.assertEqual(row.cells(), ['7.50', '', 'около 8', ''])
+        self.assertEqual(row.raw_values(), ['7.5', '', 'около 8', ''])
+
+    def test_text_is_escaped(self) -> None:
+        row = TableRow('Темп', ['<b>10</b>', 'A & B'], TEXT)
+        self.assertEqual(row.cells(), ['<b>10</b>', 'A & B'])
+        self.assertEqual(row.html_cells(), ['&lt;b&gt;10&lt;/b&gt;', 'A &amp; B'])
+
+
+class ReportTableTest(SimpleTestCase):
+    """Вывод таблицы в HTML, CSV и JSON."""
+
+    def setUp(self) -> None:
+        self.table = ReportTable(['Иванов <Иван>', 'Петров Петр'], [
+            TableRow('Скорость', [1.5, np.nan], NUMBER, missing='-'),
+            TableRow('Подводная часть', ['7', '<i>8</i>'], INPUT),
+        ])
+
+    def test_html(self) -> None:
+        self.assertEqual(self.table.to_html(), (
+            "<div class='table-responsive'> <table id='report-table' "
+            "class='table table-bordered table-hover'><thead><tr><th></th>"
+            "<th>Иванов &lt;Иван&gt;</th><th>Петров Петр</th>"
+            "</tr></thead> <tbody class='text-center align-middle'>"
+            "<tr><td>Скорость</td><td>1.50</td><td>-</td></tr>"
+            "<tr><td>Подводная часть</td><td>7.00</td><td>&lt;i&gt;8&lt;/i&gt;</td></tr>"
+            "</tbody></table></div>"
+        ))
+        self.assertEqual(''.join(self.table.iter_html()), self.table.to_html())
+
+    def test_csv(self) -> None:
+        self.assertEqual(self.table.to_csv().splitlines(), [
+            ',Иванов <Иван>,Петров Петр',
+            'Скорость,1.50,-',
+            'Подводная часть,7.00,<i>8</i>',
+        ])
+
+    def test_json(self) -> None:
+        self.assertEqual(json.loads(self.table.to_json()), {
+            'columns': ['Иванов <Иван>', 'Петров Петр'],
+            'rows': [
+                {'label': 'Скорость', 'type': NUMBER, 'values': [1.5, None]},
+                {'label': 'Подводная часть', 'type': INPUT, 'values': ['7', '<i>8</i>']},
+            ],
+        })
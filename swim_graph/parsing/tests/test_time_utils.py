@@ -0,0 +1,53 @@
+"""Тесты разбора и форматирования времени в сотых долях секунды."""
+from django.test import SimpleTestCase
+
+from swim_graph_utils.time_utils import format_centiseconds, parse_centiseconds, to_seconds
+
+
+class ParseCentisecondsTest(SimpleTestCase):
+    """Разбор строк времени."""
+
+    def test_formats(self) -> None:
+        cases = {
+            '27.05': 2705,
+            '27.50': 2750,
+            '0.65': 65,
+            '1:02.34': 6234,
+            '15:01.09': 90109,
+            '1:00:00.01': 360001,
+        }
+        for time_str, centiseconds in cases.items():
+            with self.subTest(time_str=time_str):
+                self.assertEqual(parse_centiseconds(time_str), centiseconds)
+
+    def test_fraction_is_decimal(self) -> None:
+        # Одна цифра дробной части - десятые доли секунды, лишние цифры отбрасываются
+        self.assertEqual(parse_centiseconds('27.5'), 2750)
+        self.assertEqual(parse_centiseconds('10.5'), 1050)
+        self.assertEqual(parse_centiseconds('27.059'), 2705)
+
+    def test_invalid(self) -> None:
+        for time_str in ('', '27', 'abc', '27,05', '1:2:3:04.00', 'DSQ'):
+            with self.subTest(time_str=time_str):
+                with self.assertLogs('swim_graph_utils.time_utils', 'WARNING'):
+                    self.assertIsNone(parse_centiseconds(time_str))
+
+
+class FormatCentisecondsTest(SimpleTestCase):
+    """Форматирование и перевод времени."""
+
+    def test_format(self) -> None:
+        self.assertEqual(format_centiseconds(2705), '00:27.05')
+        self.assertEqual(format_centiseconds(6234), '01:02.34')
+        self.assertEqual(format_centiseconds(360001), '1:00:00.01')
+
+    def test_round_trip(self) -> None:
+        for centiseconds in (0, 65, 2750, 6234, 90109, 360001):
+            with self.subTest(centiseconds=centiseconds):
+                self.assertEqual(
+                    parse_centiseconds(format_centiseconds(centiseconds)), centiseconds
+                )
+
+    def test_to_seconds(self) -> None:
+        self.assertEqual(to_seconds(2750), 27.5)
+        self.assertIsNone(to_seconds(None))
@@ -12,7 +12,37 @@ urlpatterns = [
     path('sessions/',
          views.sessions_list_view,
          name='sessions_list'),
+    path('sessions/cache_stats/',
+         views.report_cache_stats_view,
+         name='report_cache_stats'),
+    path('sessions/export/',
+         views.reports_export_view,
+         name='reports_export'),
+    path('sessions/export/<slug:export_id>/',
+         views.reports_export_status_view,
+         name='reports_export_status'),
+    path('sessions/export/<slug:export_id>/download/',
+         views.reports_export_download_view,
+         name='reports_export_download'),
     path('sessions/<int:session_id>/',
          views.session_results_view,
          name='session_results'),
+    path('sessions/<int:session_id>/sections/<slug:section>/',
+         views.session_report_section_view,
+         name='session_report_section'),
+    path('sessions/<int:session_id>/charts/',
+         views.session_chart_specs_view,
+         name='session_chart_specs'),
+    path('sessions/<int:session_id>/charts/<slug:chart_name>.<slug:image_format>',
+         views.session_chart_image_view,
+         name='session_chart_image'),
+    path('statistics/',
+         views.statistics_view,
+         name='statistics'),
+    path('athletes/<int:athlete_id>/',
+         views.athlete_progression_view,
+         name='athlete_progression'),
+    path('athletes/<int:athlete_id>/progression/',
+         views.athlete_progression_data_view,
+         name='athlete_progression_data'),
 ]
@@ -1,21 +1,28 @@
 """Parsing Utilities"""
-from datetime import time
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 import pdfplumber
 import plotly.graph_objects as go
+import plotly.io as pio
+from django.conf import settings
 from django.contrib import messages
 from django.http import HttpRequest
 
 from swim_graph_utils.constants import (
     ParsingKeywords, PoolLength, SwimLength,
-    INTERMEDIATE_SWIM_LENGTHS
+    INTERMEDIATE_SWIM_LENGTHS, CHART_CONFIG
 )
+from swim_graph_utils.time_utils import parse_centiseconds
+from .chart_images import render_chart_images
+from .athletes import AthleteResolver, get_athlete_key, is_athlete_name
+from .executor import run_sections
+from .metrics import ReportMetrics, to_cells, update_session_metrics
 from .models import (
     ProtocolData, ParsingSession, SwimSplitTime,
-    ParsingSettings, StartDistance, NumberCycles,
-    Pace, UnderwaterPart
+    ParsingSettings
 )
+from .splits import get_split_distances, pack_splits
+from .tables import INPUT, ReportTable, TableRow
 
 
 class SwimParser:
@@ -148,7 +155,7 @@ class SwimParser:
                 updates = {
                     'final_position': final_position,
                     'reaction_time': self.convert_time_reaction(parts[-3]),
-                    'result': parse_time(parts[-2]),
+                    'result': parse_centiseconds(parts[-2]),
                     'points': self.convert_to_int(parts[-1]),
                 }
                 self.update_participant(initials, year_of_birth, updates)
@@ -180,9 +187,10 @@ class SwimParser:
                     participant['year_of_birth'] == year_of_birth):
                 for key, value in updates.items():
                     if key == 'split_times':
-                        if not participant['split_times']:
-                            participant['split_times'] = []
-                        participant['split_times'].extend(value)
+                        # Повторная дистанция заменяет ранее найденное время
+                        participant['split_times'] = get_unique_split_times(
+                            (participant['split_times'] or []) + value
+                        )
                     else:
                         participant[key] = value
                 break
@@ -213,7 +221,7 @@ class SwimParser:
                     key = distance.strip().replace('m', '')
                     split_times.append(
                         {'distance': int(key),
-                         'split_time': parse_time(time_values[1].strip())}
+                         'split_time': parse_centiseconds(time_values[1].strip())}
                     )
             split_times = sorted(split_times, key=lambda x: x['distance'])
 
@@ -291,818 +299,498 @@ class SwimParser:
         except (ValueError, TypeError) as error:
             return None
 
-    def convert_time_reaction(self, time_reaction: str) -> time:
+    def convert_time_reaction(self, time_reaction: str) -> Optional[int]:
         """
         Преобразовывает строки со временем реакции в число.
 
         :param time_reaction: Время реакции в исходном формате.
-        :return: Время реакции.
+        :return: Время реакции в сотых долях секунды.
         """
         try:
             time_reaction = time_reaction.replace(',', '.')
             time_reaction = time_reaction.replace('+', '')
-            return parse_time(time_reaction)
+            return parse_centiseconds(time_reaction)
         except (ValueError, TypeError) as error:
             return None
 
 
 class ChartGenerator:
-    """Класс для генерации диаграмм."""
+    """
+    Класс для генерации диаграмм.
+
+    Диаграммы собираются в виде словарей в том же виде, в каком их сериализует plotly,
+    без проверки свойств на каждом трейсе: данные приходят из ReportMetrics.
+    Проверку через graph_objects можно включить параметром validate.
+    """
 
-    def __init__(self, session: ParsingSession, participants: List[ProtocolData]) -> None:
+    # Методы построения диаграмм по названиям диаграмм отчета
+    FIGURE_BUILDERS = {
+        'average_speed_chart': 'build_average_speed_spec',
+        'number_cycles_chart': 'build_number_cycles_spec',
+        'underwater_part_chart': 'build_underwater_part_spec',
+        'start_reaction_chart': 'build_best_start_reaction_spec',
+        'start_finish_difference_chart': 'build_start_finish_difference_spec',
+        'heat_map_chart': 'build_heat_map_spec',
+    }
+
+    # Цветовая шкала тепловой карты в развернутом виде, как ее хранит plotly
+    HEAT_MAP_COLORSCALE = go.Heatmap(colorscale='YlGnBu').to_plotly_json()['colorscale']
+
+    def __init__(
+            self, session: ParsingSession, participants: List[ProtocolData],
+            metrics: Optional[ReportMetrics] = None, validate: bool = False
+        ) -> None:
         self.session = session
         self.participants = participants
+        self.metrics = metrics or ReportMetrics(session, participants)
+        self.validate = validate
 
-    def generate_average_speed_chart(self) -> str:
+    def _to_html(self, spec: Dict[str, Any]) -> str:
         """
-        Генерирует HTML код для столбчатой диаграммы средней скорости.
+        Преобразует описание диаграммы в HTML код без встроенной библиотеки plotly.js.
+        Библиотека подключается шаблоном отчета один раз на страницу.
+
+        :param spec: Описание диаграммы.
+        :return: HTML код диаграммы.
         """
-        distances = sorted({
-            split.distance
-            for participant in self.participants
-            for split in participant.swimsplittime_set.all()
-        }) or [int(self.session.swim_length.replace('m', ''))]
+        if not self.validate:
+            spec = {
+                'data': spec['data'],
+                'layout': {'template': get_chart_template(), **spec['layout']},
+            }
 
-        col_labels = [participant.initials for participant in self.participants]
-        speed_data = {dist: [] for dist in distances}
+        return pio.to_html(
+            spec,
+            full_html=False,
+            include_plotlyjs=False,
+            config=CHART_CONFIG,
+            validate=self.validate
+        )
 
-        for participant in self.participants:
-            for dist in distances:
-                speed = self._calculate_speed(participant, dist)
-                speed_data[dist].append(speed)
+    def generate_chart_specs(self, chart_names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Генерирует описания диаграмм для отрисовки на стороне клиента.
+        Шаблон оформления и настройки отображения передаются один раз
+        для всех диаграмм, а не в каждой из них.
 
-        fig = go.Figure()
+        :param chart_names: Названия диаграмм отчета.
+        :return: Словарь с настройками, шаблоном и описаниями диаграмм.
+        """
+        charts = run_sections(
+            self, {chart_name: self.FIGURE_BUILDERS[chart_name] for chart_name in chart_names}
+        )
+        if self.validate:
+            for chart_name, spec in charts.items():
+                spec = go.Figure(spec).to_plotly_json()
+                spec['layout'].pop('template', None)
+                charts[chart_name] = spec
+
+        return {
+            'config': CHART_CONFIG,
+            'template': get_chart_template(),
+            'charts': charts,
+        }
+
+    def generate_chart_images(
+            self, chart_names: Iterable[str], image_format: str = 'png'
+        ) -> Dict[str, bytes]:
+        """
+        Генерирует статические изображения диаграмм (PNG или SVG)
+        для печати и отправки по почте.
+
+        :param chart_names: Названия диаграмм отчета.
+        :param image_format: Формат изображений.
+        :return: Словарь с содержимым изображений по названиям диаграмм.
+        """
+        specs = run_sections(
+            self, {chart_name: self.FIGURE_BUILDERS[chart_name] for chart_name in chart_names}
+        )
+        return render_chart_images(specs, image_format)
+
+    def build_average_speed_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание столбчатой диаграммы средней скорости.
+        """
+        distances = self.metrics.report_distances.tolist()
+        col_labels = self.metrics.col_labels
+        speed_data = to_cells(self.metrics.lap_speeds)
 
         bar_width = 0.2
         colors = ['blue', 'green', 'red', 'cyan', 'magenta', 'yellow', 'black',
                   'orange', 'purple', 'pink', 'brown', 'grey', 'lime', 'olive',
                   'navy', 'teal']
+        data = []
         for i, dist in enumerate(distances):
-            speeds = speed_data[dist]
-            fig.add_trace(go.Bar(
-                x=col_labels,
-                y=speeds,
-                name=f'ср. скорость {distances[i-1] if i > 0 else 0}-{dist}м, м/сек',
-                marker_color=colors[i % len(colors)],
-                width=bar_width
-            ))
-
-        fig.update_layout(
-            barmode='group',
-            xaxis_tickangle=-45,
-            yaxis_title='Скорость (м/сек)',
-            legend_title='Дистанции',
-        )
+            data.append({
+                'marker': {'color': colors[i % len(colors)]},
+                'name': f'ср. скорость {distances[i-1] if i > 0 else 0}-{dist}м, м/сек',
+                'width': bar_width,
+                'x': col_labels,
+                'y': speed_data[i],
+                'type': 'bar',
+            })
+
+        return {
+            'data': data,
+            'layout': {
+                'xaxis': {'tickangle': -45},
+                'barmode': 'group',
+                'yaxis': {'title': {'text': 'Скорость (м/сек)'}},
+                'legend': {'title': {'text': 'Дистанции'}},
+            },
+        }
 
-        average_speed_chart = fig.to_html(
-            full_html=False,
-            config={
-                'displayModeBar': False,
-                'displaylogo': False,
-                'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
-            }
-        )
+    def generate_average_speed_chart(self) -> str:
+        """
+        Генерирует HTML код для столбчатой диаграммы средней скорости.
+        """
+        return self._to_html(self.build_average_speed_spec())
 
-        return average_speed_chart
+    def build_number_cycles_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание столбчатой диаграммы количества циклов на лучшем отрезке.
+        """
+        return {
+            'data': [{
+                'marker': {'color': 'blue'},
+                'name': 'Кол-во циклов на лучшем отрезке',
+                'x': self.metrics.col_labels,
+                'y': self.metrics.number_cycles.tolist(),
+                'type': 'bar',
+            }],
+            'layout': {
+                'yaxis': {'title': {'text': 'Кол-во циклов'}},
+                'barmode': 'group',
+            },
+        }
 
     def generate_number_cycles_chart(self) -> str:
         """
         Генерирует HTML код для столбчатой диаграммы количества циклов на лучшем отрезке.
         """
-        col_labels = [participant.initials for participant in self.participants]
-
-        number_cycles_data = NumberCycles.objects.filter(parsing_session=self.session).first()
-        values = self._get_number_cycles_data(self.participants, number_cycles_data)
-
-        fig = go.Figure(data=[go.Bar(
-            name='Кол-во циклов на лучшем отрезке',
-            x=col_labels,
-            y=values,
-            marker_color='blue'
-        )])
-
-        fig.update_layout(
-            yaxis_title='Кол-во циклов',
-            barmode='group'
-        )
-
-        number_cycles_chart = fig.to_html(
-            full_html=False,
-            config={
-                'displayModeBar': False,
-                'displaylogo': False,
-                'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
-            }
-        )
+        return self._to_html(self.build_number_cycles_spec())
 
-        return number_cycles_chart
+    def build_underwater_part_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание столбчатой диаграммы подводной части.
+        """
+        return {
+            'data': [{
+                'marker': {'color': 'green'},
+                'name': 'Подводная часть (м)',
+                'x': self.metrics.col_labels,
+                'y': self.metrics.underwater_parts.tolist(),
+                'type': 'bar',
+            }],
+            'layout': {
+                'xaxis': {'tickangle': -45},
+                'yaxis': {'title': {'text': 'Подводная часть (м)'}},
+            },
+        }
 
     def generate_underwater_part_chart(self) -> str:
         """
         Генерирует HTML код для столбчатой диаграммы подводной части.
         """
-        col_labels = [participant.initials for participant in self.participants]
-
-        underwater_parts_data = UnderwaterPart.objects.filter(parsing_session=self.session)
-        data = self._get_underwater_parts_data(self.participants, underwater_parts_data)
-
-        fig = go.Figure(data=[go.Bar(
-            x=col_labels,
-            y=data,
-            name='Подводная часть (м)',
-            marker_color='green'
-        )])
-
-        fig.update_layout(
-            xaxis_tickangle=-45,
-            yaxis_title='Подводная часть (м)',
-        )
+        return self._to_html(self.build_underwater_part_spec())
 
-        underwater_part_chart = fig.to_html(
-            full_html=False,
-            config={
-                'displayModeBar': False,
-                'displaylogo': False,
-                'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
-            }
-        )
+    def build_best_start_reaction_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание столбчатой диаграммы лучшей стартовой реакции.
+        """
+        reaction_times = [
+            0 if value is None else value
+            for value in to_cells(self.metrics.reaction_seconds)
+        ]
 
-        return underwater_part_chart
+        return {
+            'data': [{
+                'marker': {'color': 'blue'},
+                'name': 'Стартовая реакция (сек)',
+                'x': self.metrics.col_labels,
+                'y': reaction_times,
+                'type': 'bar',
+            }],
+            'layout': {
+                'xaxis': {'tickangle': -45},
+                'yaxis': {'title': {'text': 'Стартовая реакция (сек)'}},
+            },
+        }
 
     def generate_best_start_reaction_chart(self) -> str:
         """
         Генерирует HTML код для столбчатой диаграммы лучшей стартовой реакции.
         """
-        col_labels = [participant.initials for participant in self.participants]
-        reaction_times = [self._get_total_seconds(participant.reaction_time)
-                          if participant.reaction_time else 0
-                          for participant in self.participants]
-
-        fig = go.Figure(data=[go.Bar(
-            x=col_labels,
-            y=reaction_times,
-            name='Стартовая реакция (сек)',
-            marker_color='blue'
-        )])
-
-        fig.update_layout(
-            xaxis_tickangle=-45,
-            yaxis_title='Стартовая реакция (сек)',
-        )
+        return self._to_html(self.build_best_start_reaction_spec())
 
-        best_start_reaction_chart = fig.to_html(
-            full_html=False,
-            config={
-                'displayModeBar': False,
-                'displaylogo': False,
-                'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
-            }
-        )
-
-        return best_start_reaction_chart
+    def build_start_finish_difference_spec(self) -> Dict[str, Any]:
+        """
+        Строит описание столбчатой диаграммы
+        лучшего процента изменения стартового и финишного отрезков.
+        """
+        data = self.metrics.start_finish_deltas.tolist()
+
+        return {
+            'data': [{
+                'marker': {'color': 'purple'},
+                'text': [f"{val:.2f}" for val in data],
+                'x': self.metrics.col_labels,
+                'y': data,
+                'type': 'bar',
+            }],
+            'layout': {
+                'yaxis': {'title': {'text': 'Процент изменения (%)'}},
+            },
+        }
 
     def generate_start_finish_difference_chart(self) -> str:
         """
         Генерирует HTML код для столбчатой диаграммы
         лучшего процента изменения стартового и финишного отрезков.
         """
-        col_labels = [participant.initials for participant in self.participants]
-        data = self._get_start_finish_difference_data(self.participants)
-
-        fig = go.Figure(data=[go.Bar(
-            x=col_labels,
-            y=data,
-            marker_color='purple',
-            text=[f"{val:.2f}" for val in data]
-        )])
-
-        fig.update_layout(
-            yaxis={"title": 'Процент изменения (%)'},
-        )
-
-        start_finish_difference_chart = fig.to_html(
-            full_html=False,
-            config={
-                'displayModeBar': False,
-                'displaylogo': False,
-                'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
-            }
-        )
+        return self._to_html(self.build_start_finish_difference_spec())
 
-        return start_finish_difference_chart
-
-    def generate_heat_map_chart(self) -> str:
+    def build_heat_map_spec(self) -> Dict[str, Any]:
         """
-        Создает и возвращает тепловую карту для протокола данных.
-
-        :return: HTML-код для отображения тепловой карты.
+        Строит описание тепловой карты для протокола данных.
         """
-        data = []
-        row_labels = []
-        col_labels = set()
-
-        for participant in self.participants:
-            split_times = participant.swimsplittime_set.all()
-            if not split_times:
-                col_labels.add(int(self.session.swim_length.replace('m', '')))
-                break
-            for split in split_times:
-                distance = split.distance
-                col_labels.add(distance)
-
-        col_labels = sorted(col_labels)
-
-        for participant in self.participants:
-            row_labels.append(participant.initials)
-            split_times = participant.swimsplittime_set.all()
-            if not split_times:
-                total_seconds = self._get_total_seconds(participant.result)
-                row = {
-                    int(self.session.swim_length.replace('m', '')): total_seconds
-                }
-            else:
-                row = {
-                    split.distance:
-                        self._get_total_seconds(split.split_time) for split in split_times
-                }
-
-            row_data = [row.get(dist, None) for dist in col_labels]
-            data.append(row_data)
-
-        data = list(map(list, zip(*data)))
+        data = to_cells(self.metrics.heat_map)
 
         col_labels_with_ranges = []
         previous_dist = 0
-        for dist in col_labels:
+        for dist in self.metrics.heat_map_distances.tolist():
             col_labels_with_ranges.append(f"{previous_dist}-{dist}м")
             previous_dist = dist
 
-        fig = go.Figure(data=go.Heatmap(
-            z=data,
-            x=row_labels,
-            y=col_labels_with_ranges,
-            colorscale='YlGnBu',
-            text=[[f"{val:.2f}" if val is not None else "" for val in row] for row in data],
-            hoverinfo="text"
-        ))
-
-        fig.update_layout(
-            xaxis_nticks=36,
-            yaxis={'title': 'Дистанция (м)'},
-        )
-
-        heat_map_chart = fig.to_html(
-            full_html=False,
-            config={
-                'displayModeBar': False,
-                'displaylogo': False,
-                'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
-            }
-        )
-
-        return heat_map_chart
-
-    def _get_total_seconds(self, time_obj: Optional[time]) -> float:
-        """
-        Возвращает общее количество секунд для объекта времени.
-
-        :param time_obj: Объект времени.
-        :return: Общее количество секунд.
-        """
-        if time_obj:
-            return time_obj.minute * 60 + time_obj.second + time_obj.microsecond / 1e6
-        return 0.0
-
-    def _calculate_speed(self, participant: ProtocolData, distance: int) -> Optional[float]:
-        """
-        Рассчитывает скорость для участника на определенной дистанции.
-
-        :param participant: Данные участника.
-        :param distance: Дистанция.
-        :return: Скорость (м/сек).
-        """
-        pool_length = int(self.session.pool_length.replace('m', ''))
-        split_time = participant.swimsplittime_set.filter(distance=distance).first()
-        if split_time:
-            total_seconds = self._get_total_seconds(split_time.split_time)
-            return pool_length / total_seconds
-        if participant.result:
-            total_seconds = self._get_total_seconds(participant.result)
-            return pool_length / total_seconds
-        return None
+        return {
+            'data': [{
+                'colorscale': self.HEAT_MAP_COLORSCALE,
+                'hoverinfo': 'text',
+                'text': [[f"{val:.2f}" if val is not None else "" for val in row] for row in data],
+                'x': self.metrics.col_labels,
+                'y': col_labels_with_ranges,
+                'z': data,
+                'type': 'heatmap',
+            }],
+            'layout': {
+                'xaxis': {'nticks': 36},
+                'yaxis': {'title': {'text': 'Дистанция (м)'}},
+            },
+        }
 
-    def _get_start_finish_difference_data(self, participants: List[ProtocolData]) -> List[float]:
+    def generate_heat_map_chart(self) -> str:
         """
-        Получает данные для разницы времени между стартом и финишем.
+        Создает и возвращает тепловую карту для протокола данных.
 
-        :param participants: Список участников.
-        :return: Список разниц во времени (сек).
+        :return: HTML-код для отображения тепловой карты.
         """
-        data = []
-        for participant in participants:
-            split_times = sorted(participant.swimsplittime_set.all(), key=lambda x: x.distance)
-            if split_times:
-                start_time = split_times[0].split_time
-                end_time = split_times[-1].split_time
-                start_seconds = self._get_total_seconds(start_time)
-                end_seconds = self._get_total_seconds(end_time)
-                time_difference = end_seconds - start_seconds
-                data.append(time_difference)
-            else:
-                data.append(0)
-        return data
-
-    def _get_number_cycles_data(
-            self, participants: List[ProtocolData], number_cycles_data: Optional[NumberCycles]
-        ) -> List[int]:
-        """
-        Получает данные для количества циклов.
-
-        :param participants: Список участников.
-        :param number_cycles_data: Данные о количестве циклов.
-        :return: Список значений количества циклов.
-        """
-        if not number_cycles_data:
-            return [0] * len(participants)
-
-        data = number_cycles_data.data
-        return [int(data.get(str(participant.id), 0))
-                if data.get(str(participant.id)) else 0
-                for participant in participants]
-
-    def _get_underwater_parts_data(
-            self, participants: List[ProtocolData], underwater_parts_data: List[UnderwaterPart]
-        ) -> List[float]:
-        """
-        Получает данные для подводной части.
-
-        :param participants: Список участников.
-        :param underwater_parts_data: Данные о подводной части.
-        :return: Список значений подводной части.
-        """
-        underwater_parts = {}
-        for part in underwater_parts_data:
-            underwater_parts.update(part.data)
-
-        data = []
-        for participant in participants:
-            participant_id = str(participant.id)
-            if participant_id in underwater_parts:
-                value = underwater_parts[participant_id]
-                if value:
-                    try:
-                        value = float(value)
-                    except ValueError:
-                        value = 0
-                else:
-                    value = 0
-                data.append(value)
-            else:
-                data.append(0)
-
-        return data
+        return self._to_html(self.build_heat_map_spec())
 
 
 class TableGenerator:
-    """Класс для генерации таблиц."""
+    """
+    Класс для генерации таблиц.
 
-    def __init__(self, session, participants):
+    Методы build_*_table возвращают модель таблицы (ReportTable) с типизированными
+    строками, которую можно вывести в HTML, CSV или JSON; generate_*_table - ее HTML код.
+    """
+
+    def __init__(
+            self, session: ParsingSession, participants: List[ProtocolData],
+            metrics: Optional[ReportMetrics] = None
+        ) -> None:
         self.session = session
         self.participants = participants
+        self.metrics = metrics or ReportMetrics(session, participants)
 
-    def generate_average_speed_table(self) -> str:
+    def build_average_speed_table(self) -> ReportTable:
         """
-        Генерирует HTML код для таблицы средней скорости.
+        Строит таблицу средней скорости.
 
-        :return: HTML код таблицы.
+        :return: Таблица.
         """
-        distances = sorted({
-            split.distance
-            for participant in self.participants
-            for split in participant.swimsplittime_set.all()
-        })
+        distances = self.metrics.distances.tolist()
+        pool_length = self.metrics.pool_length
 
         row_labels = [
-            f"{dist - int(self.session.pool_length.replace('m', '')) if i > 0 else 0}-{dist}м, м/сек"
+            f"{dist - pool_length if i > 0 else 0}-{dist}м, м/сек"
             for i, dist in enumerate(distances)
         ] or [f"0-{self.session.swim_length.replace('m', '')}м, м/сек"]
-        col_labels = [participant.initials for participant in self.participants]
-        data = self._get_speed_data(self.participants, distances)
-
-        average_speed_table = self._generate_table_html(row_labels, col_labels, data)
 
-        return average_speed_table
+        return ReportTable(self.metrics.col_labels, [
+            TableRow(label, values)
+            for label, values in zip(row_labels, self.metrics.lap_speeds.tolist())
+        ])
 
-    def generate_speed_drop_table(self) -> str:
+    def generate_average_speed_table(self) -> str:
         """
-        Генерирует HTML код для таблицы падения скорости.
+        Генерирует HTML код для таблицы средней скорости.
 
         :return: HTML код таблицы.
         """
-        distances = sorted({
-            split.distance
-            for participant in self.participants
-            for split in participant.swimsplittime_set.all()
-        })
+        return self.build_average_speed_table().to_html()
+
+    def build_speed_drop_table(self) -> ReportTable:
+        """
+        Строит таблицу падения скорости.
+
+        :return: Таблица.
+        """
+        distances = self.metrics.distances.tolist()
+        pool_length = self.metrics.pool_length
 
         row_labels = [
-            f"{dist - int(self.session.pool_length.replace('m', '')) if i > 0 else 0}-{dist}м, %"
+            f"{dist - pool_length if i > 0 else 0}-{dist}м, %"
             for i, dist in enumerate(distances)
         ]
-        col_labels = [participant.initials for participant in self.participants]
-        data = self._get_speed_drop_data(self.participants, distances)
 
-        speed_drop_table = self._generate_table_html(row_labels, col_labels, data)
+        return ReportTable(self.metrics.col_labels, [
+            TableRow(label, values)
+            for label, values in zip(row_labels, self.metrics.speed_drop.tolist())
+        ])
 
-        return speed_drop_table
-
-    def generate_leader_gap_table(self) -> str:
+    def generate_speed_drop_table(self) -> str:
         """
-        Генерирует HTML код для таблицы отставания от лидера.
+        Генерирует HTML код для таблицы падения скорости.
 
         :return: HTML код таблицы.
         """
-        leader = next((p for p in self.participants if p.final_position == 1), None)
+        return self.build_speed_drop_table().to_html()
+
+    def build_leader_gap_table(self) -> ReportTable:
+        """
+        Строит таблицу отставания от лидера.
 
-        if not leader:
+        :return: Таблица.
+        """
+        if self.metrics.leader_index is None:
             raise ValueError("Лидер не найден")
 
-        distances = sorted({
-            split.distance
-            for participant in self.participants
-            for split in participant.swimsplittime_set.all()
-        }) or [int(self.session.swim_length.replace('m', ''))]
+        distances = self.metrics.report_distances.tolist()
+        pool_length = self.metrics.pool_length
 
         row_labels = [
-            f"{dist - int(self.session.pool_length.replace('m', '')) if i > 0 else 0}-{dist}м"
+            f"{dist - pool_length if i > 0 else 0}-{dist}м"
             for i, dist in enumerate(distances)
-        ] or [f"0-{self.session.swim_length}м"]
-        col_labels = [participant.initials for participant in self.participants]
-        data = self._get_leader_gap_data(self.participants, distances, leader)
-
-        leader_gap_table = self._generate_table_html(row_labels, col_labels, data)
+        ]
 
-        return leader_gap_table
+        return ReportTable(self.metrics.col_labels, [
+            TableRow(label, values)
+            for label, values in zip(row_labels, self.metrics.leader_gaps.tolist())
+        ])
 
-    def generate_best_start_reaction_table(self) -> str:
+    def generate_leader_gap_table(self) -> str:
         """
-        Генерирует HTML код для таблицы лучшей стартовой реакции.
+        Генерирует HTML код для таблицы отставания от лидера.
 
         :return: HTML код таблицы.
         """
-        col_labels = [participant.initials for participant in self.participants]
-        data = [
-            self._get_total_seconds(participant.reaction_time)
-            if participant.reaction_time else '-'
-            for participant in self.participants
-        ]
-        row_labels = ['Лучшая стартовая реакция, сек']
-
-        best_start_reaction_table = self._generate_table_html(row_labels, col_labels, [data])
-
-        return best_start_reaction_table
+        return self.build_leader_gap_table().to_html()
 
-    def generate_start_finish_difference_table(self) -> str:
+    def build_best_start_reaction_table(self) -> ReportTable:
         """
-        Генерирует HTML код для таблицы лучшего процента изменения стартового и финишного отрезков.
+        Строит таблицу лучшей стартовой реакции.
 
-        :return: HTML код таблицы.
+        :return: Таблица.
         """
-        row_labels = ["% изменения стартового и финишного отрезков, с"]
-        col_labels = [participant.initials for participant in self.participants]
-
-        data = self._get_start_finish_difference_data(self.participants)
-
-        start_finish_difference_table = self._generate_table_html(row_labels, col_labels, [data])
-
-        return start_finish_difference_table
+        return ReportTable(self.metrics.col_labels, [
+            TableRow(
+                'Лучшая стартовая реакция, сек',
+                self.metrics.reaction_seconds, missing='-'
+            )
+        ])
 
-    def generate_start_distance_table(self) -> str:
+    def generate_best_start_reaction_table(self) -> str:
         """
-        Генерирует HTML код для таблицы стартового отрезка 0-15.
+        Генерирует HTML код для таблицы лучшей стартовой реакции.
 
         :return: HTML код таблицы.
         """
-        col_labels = [participant.initials for participant in self.participants]
-        row_labels = ['Стартовый отрезок 0-15, сек']
-
-        start_distance_data = StartDistance.objects.filter(parsing_session=self.session).first()
-        data = self._get_start_distance_data(self.participants, start_distance_data)
-
-        start_distance_table = self._generate_table_html(row_labels, col_labels, data)
-
-        return start_distance_table
+        return self.build_best_start_reaction_table().to_html()
 
-
-    def generate_pace_table(self) -> str:
+    def build_start_finish_difference_table(self) -> ReportTable:
         """
-        Генерирует HTML код для таблицы темпа в циклах на минуту на лучшем отрезке.
+        Строит таблицу лучшего процента изменения стартового и финишного отрезков.
 
-        :return: HTML код таблицы.
+        :return: Таблица.
         """
-        col_labels = [participant.initials for participant in self.participants]
-
-        number_cycles_data = NumberCycles.objects.filter(parsing_session=self.session).first()
-        pace_data = Pace.objects.filter(parsing_session=self.session).first()
-
-        data = self._get_pace_data(self.participants, number_cycles_data, pace_data)
-        row_labels = ['Темп ц/мин на лучшем отрезке']
-
-        pace_table = self._generate_table_html(row_labels, col_labels, [data])
-
-        return pace_table
+        return ReportTable(self.metrics.col_labels, [
+            TableRow(
+                '% изменения стартового и финишного отрезков, с',
+                self.metrics.start_finish_deltas
+            )
+        ])
 
-    def generate_underwater_part_table(self) -> str:
+    def generate_start_finish_difference_table(self) -> str:
         """
-        Генерирует HTML код для таблицы подводной части.
+        Генерирует HTML код для таблицы лучшего процента изменения стартового и финишного отрезков.
 
         :return: HTML код таблицы.
         """
-        row_labels = ["Подводная часть, м"]
-        col_labels = [participant.initials for participant in self.participants]
-
-        underwater_parts_data = UnderwaterPart.objects.filter(parsing_session=self.session)
-        data = self._get_underwater_parts_data(self.participants, underwater_parts_data)
+        return self.build_start_finish_difference_table().to_html()
 
-        underwater_part_table = self._generate_table_html(row_labels, col_labels, [data])
-        return underwater_part_table
-
-    def _generate_table_html(
-            self, row_labels: List[str], col_labels: List[str], data: List[List[Any]]
-        ) -> str:
+    def build_start_distance_table(self) -> ReportTable:
         """
-        Генерирует HTML код для таблицы.
+        Строит таблицу стартового отрезка 0-15.
 
-        :param row_labels: Список меток строк.
-        :param col_labels: Список меток колонок.
-        :param data: Список списков данных для таблицы.
-        :return: HTML код таблицы.
+        :return: Таблица.
         """
-        table_html = "<div class='table-responsive'> <table id='report-table'" \
-                     "class='table table-bordered table-hover'><thead><tr><th></th>"
-        for col in col_labels:
-            table_html += f"<th>{col}</th>"
-        table_html += "</tr></thead> <tbody class='text-center align-middle'>"
-
-        for i, row in enumerate(data):
-            table_html += f"<tr><td>{row_labels[i]}</td>"
-            for cell in row:
-                if cell is not None:
-                    try:
-                        cell = float(cell)
-                        table_html += f"<td>{cell:.2f}</td>"
-                    except ValueError:
-                        table_html += f"<td>{cell}</td>"
-                else:
-                    table_html += "<td></td>"
-            table_html += "</tr>"
-
-        table_html += "</tbody></table></div>"
+        start_distance = self.metrics.start_distance
 
-        return table_html
+        return ReportTable(self.metrics.col_labels, [
+            TableRow(
+                'Стартовый отрезок 0-15, сек',
+                start_distance if start_distance is not None else [], INPUT
+            )
+        ])
 
-    def _get_total_seconds(self, time_obj: Optional[time]) -> float:
+    def generate_start_distance_table(self) -> str:
         """
-        Возвращает общее количество секунд для объекта времени.
+        Генерирует HTML код для таблицы стартового отрезка 0-15.
 
-        :param time_obj: Объект времени.
-        :return: Общее количество секунд.
+        :return: HTML код таблицы.
         """
-        if time_obj:
-            return time_obj.minute * 60 + time_obj.second + time_obj.microsecond / 1e6
-        return 0.0
+        return self.build_start_distance_table().to_html()
 
-    def _get_speed_data(
-            self, participants: List[ProtocolData], distances: List[int]
-        ) -> List[List[Optional[float]]]:
+    def build_pace_table(self) -> ReportTable:
         """
-        Получает данные о скорости для каждого участника и каждой дистанции.
+        Строит таблицу темпа в циклах на минуту на лучшем отрезке.
 
-        :param participants: Список участников.
-        :param distances: Список дистанций.
-        :return: Данные о скорости.
+        :return: Таблица.
         """
-        data = []
-        pool_length = int(self.session.pool_length.replace('m', ''))
-        for dist in distances or [int(self.session.swim_length.replace('m', ''))]:
-            row = []
-            for participant in participants:
-                split_time = participant.swimsplittime_set.filter(distance=dist).first()
-                if split_time:
-                    total_seconds = self._get_total_seconds(split_time.split_time)
-                    speed = pool_length / total_seconds
-                elif not split_time and participant.result:
-                    total_seconds = self._get_total_seconds(participant.result)
-                    speed = pool_length / total_seconds
-                else:
-                    speed = None
-                row.append(speed)
-            data.append(row)
-        return data
-
-    def _get_speed_drop_data(
-            self, participants: List[ProtocolData], distances: List[int]
-        ) -> List[List[Optional[float]]]:
-        """
-        Получает данные о падении скорости для каждого участника и каждой дистанции.
-
-        :param participants: Список участников.
-        :param distances: Список дистанций.
-        :return: Данные о падении скорости.
-        """
-        speed_data = {participant.initials: [] for participant in participants}
-        pool_length = int(self.session.pool_length.replace('m', ''))
-
-        for participant in participants:
-            for dist in distances:
-                split_time = participant.swimsplittime_set.filter(distance=dist).first()
-                if split_time:
-                    total_seconds = self._get_total_seconds(split_time.split_time)
-                    speed = pool_length / total_seconds
-                    speed_data[participant.initials].append(speed)
-                else:
-                    speed_data[participant.initials].append('-')
-
-        data = []
-        for dist_index, dist in enumerate(distances):
-            row = []
-            for participant in participants:
-                initial_speed = speed_data[participant.initials][0]
-                current_speed = speed_data[participant.initials][dist_index]
-                if initial_speed and current_speed:
-                    speed_drop = (current_speed / initial_speed) * 100
-                elif dist_index == 0:
-                    # Первая дистанция всегда 100%
-                    speed_drop = 100.0
-                else:
-                    speed_drop = None
-                row.append(speed_drop)
-            data.append(row)
+        label = 'Темп ц/мин на лучшем отрезке'
+        if self.metrics.number_cycles_data and self.metrics.pace_data:
+            row = TableRow(label, self.metrics.pace_per_minute, missing='-')
+        else:
+            row = TableRow(label, [None] * len(self.participants))
 
-        return data
+        return ReportTable(self.metrics.col_labels, [row])
 
-    def _get_leader_gap_data(
-            self, participants: List[ProtocolData], distances: List[int], leader: ProtocolData
-        ) -> List[List[Optional[float]]]:
+    def generate_pace_table(self) -> str:
         """
-        Получает данные об отставании от лидера для каждого участника и каждой дистанции.
+        Генерирует HTML код для таблицы темпа в циклах на минуту на лучшем отрезке.
 
-        :param participants: Список участников.
-        :param distances: Список дистанций.
-        :param leader: Лидер гонки.
-        :return: Данные об отставании от лидера.
+        :return: HTML код таблицы.
         """
-        leader_times = {split.distance:
-                            self._get_total_seconds(split.split_time)
-                            for split in leader.swimsplittime_set.all()}
-        if not leader_times:
-            leader_times = {int(self.session.swim_length.replace('m', '')):
-                                self._get_total_seconds(leader.result)}
-
-        data = []
-        for dist in distances:
-            row = []
-            leader_time = leader_times.get(dist, 0)
-            for participant in participants:
-                if participant.final_position == 1:
-                    row.append(0.0)
-                else:
-                    split_time = participant.swimsplittime_set.filter(distance=dist).first()
-                    if split_time:
-                        total_seconds = self._get_total_seconds(split_time.split_time)
-                        gap = total_seconds - leader_time
-                    elif not split_time and participant.result:
-                        total_seconds = self._get_total_seconds(participant.result)
-                        gap = total_seconds - leader_time
-                    else:
-                        gap = None
-                    row.append(gap)
-            data.append(row)
-        return data
+        return self.build_pace_table().to_html()
 
-    def _get_start_finish_difference_data(self, participants: List[ProtocolData]) -> List[float]:
+    def build_underwater_part_table(self) -> ReportTable:
         """
-        Получает данные для разницы времени между стартом и финишем.
+        Строит таблицу подводной части.
 
-        :param participants: Список участников.
-        :return: Список разниц во времени (сек).
+        :return: Таблица.
         """
-        data = []
-        for participant in participants:
-            split_times = sorted(participant.swimsplittime_set.all(), key=lambda x: x.distance)
-            if split_times:
-                start_time = split_times[0].split_time
-                end_time = split_times[-1].split_time
-                start_seconds = self._get_total_seconds(start_time)
-                end_seconds = self._get_total_seconds(end_time)
-                time_difference = end_seconds - start_seconds
-                data.append(time_difference)
-            else:
-                data.append(0)
-        return data
-
-    def _get_start_distance_data(
-            self, participants: List[ProtocolData], start_distance_data: Optional[StartDistance]
-        ) -> List[List[str]]:
-        """
-        Получает данные для стартового отрезка 0-15.
-
-        :param participants: Список участников.
-        :param start_distance_data: Данные о стартовом отрезке.
-        :return: Данные о стартовом отрезке.
-        """
-        if not start_distance_data:
-            return [[]]
-
-        data = start_distance_data.data
-        return [[data.get(str(participant.id), '') for participant in participants]]
-
-    def _get_pace_data(
-            self, participants: List[ProtocolData],
-            number_cycles_data: Optional[NumberCycles], pace_data: Optional[Pace]
-        ) -> List[str]:
-        """
-        Получает данные для темпа.
-
-        :param participants: Список участников.
-        :param number_cycles_data: Данные о количестве циклов.
-        :param pace_data: Данные о темпе.
-        :return: Данные о темпе.
-        """
-        if not (number_cycles_data and pace_data):
-            return [""] * len(participants)
-
-        cycles = number_cycles_data.data
-        paces = pace_data.data
-
-        values = []
-        for participant in participants:
-            participant_id = str(participant.id)
-            if participant_id in cycles and participant_id in paces:
-                try:
-                    cycle_count = int(cycles[participant_id])
-                    pace_value = parse_time(paces[participant_id])
-                    if pace_value is not None:
-                        pace_in_seconds = self._get_total_seconds(pace_value)
-                        pace_per_minute = (cycle_count / pace_in_seconds) * 60
-                        values.append(f"{pace_per_minute:.2f}")
-                    else:
-                        values.append("-")
-                except (ValueError, ZeroDivisionError):
-                    values.append("-")
-            else:
-                values.append("-")
-        return values
+        return ReportTable(self.metrics.col_labels, [
+            TableRow('Подводная часть, м', self.metrics.underwater_parts_raw, INPUT)
+        ])
 
-    def _get_underwater_parts_data(
-            self, participants: List[ProtocolData], underwater_parts_data: List[UnderwaterPart]
-        ) -> List[str]:
+    def generate_underwater_part_table(self) -> str:
         """
-        Получает данные для подводной части.
+        Генерирует HTML код для таблицы подводной части.
 
-        :param participants: Список участников.
-        :param underwater_parts_data: Данные о подводной части.
-        :return: Данные о подводной части.
+        :return: HTML код таблицы.
         """
-        underwater_parts = {}
-        for part in underwater_parts_data:
-            underwater_parts.update(part.data)
-
-        data = []
-        for participant in participants:
-            participant_id = str(participant.id)
-            if participant_id in underwater_parts:
-                value = underwater_parts[participant_id]
-                data.append(f"{value}")
-            else:
-                data.append("")
-
-        return data
-
-
-def parse_time(time_str: str) -> Optional[time]:
-    """
-    Преобразует строку времени в объект time.
-
-    :param time_str: строка времени в форматах minute:second.millisecond или second.millisecond.
-    :return: объект time.
-    """
-    try:
-        if ':' in time_str:
-            minute, rest = time_str.split(':')
-            second, millisecond = rest.split('.')
-        else:
-            minute = 0
-            second, millisecond = time_str.split('.')
-
-        minute = int(minute)
-        second = int(second)
-        millisecond = int(millisecond)
-
-        return time(minute=minute, second=second, microsecond=millisecond * 10000)
-    except ValueError as error:
-        print(f"Ошибка при преобразовании значения времени: {error}, {time_str}")
-        return None
+        return self.build_underwater_part_table().to_html()
 
 
 def save_raw_data(data: List[str], output_path: str) -> None:
@@ -1119,7 +807,10 @@ def save_raw_data(data: List[str], output_path: str) -> None:
 
 def save_parse_data(protocol_data: Dict[str, Any], session: ParsingSession) -> None:
     """
-    Сохраняет спарсенные данные по протоколам в ProtocolData и SwimSplitTime.
+    Сохраняет спарсенные данные по протоколам в ProtocolData и SwimSplitTime
+    и рассчитывает по ним показатели отчета. При включенной настройке
+    PACKED_SPLITS отрезки упаковываются в ProtocolData.packed_splits
+    по промежуточным дистанциям сессии вместо строк SwimSplitTime.
 
     :param protocol_data: Спарсенные данные из протоколов.
     :param session: Сессия парсинга.
@@ -1133,24 +824,75 @@ def save_parse_data(protocol_data: Dict[str, Any], session: ParsingSession) -> N
 
     max_number_participants = int(get_setting_value('Number_participants'))
 
-    for participant_data in sorted_participants:
+    saved_participants = [
+        participant_data for participant_data in sorted_participants
         if (participant_data['result'] and
-                participant_data['final_position'] is not None and
-                participant_data['final_position'] <= max_number_participants):
-            participant_data['parsing_session'] = session
-            filtered_data = {
-                key: value for key, value in participant_data.items()if key in protocol_fields
-            }
+            participant_data['final_position'] is not None and
+            participant_data['final_position'] <= max_number_participants)
+    ]
+
+    split_distances = []
+    if settings.PACKED_SPLITS:
+        split_distances = get_split_distances(
+            split_time
+            for participant_data in saved_participants
+            for split_time in participant_data.get('split_times', [])
+        )
+        session.split_distances = split_distances
+        session.save(update_fields=['split_distances'])
 
-            protocol_entry = ProtocolData.objects.create(**filtered_data)
+    athlete_ids = AthleteResolver().resolve_many(
+        (participant_data['initials'], participant_data['year_of_birth'])
+        for participant_data in saved_participants
+        if is_athlete_name(participant_data['initials'])
+    )
 
-            split_times_data = participant_data.get('split_times', [])
-            split_times = [
-                SwimSplitTime(protocol_data=protocol_entry, **split_time)
+    # Участники и отрезки добавляются через bulk_create без сигналов:
+    # показатели рассчитываются и версия сессии увеличивается один раз после загрузки
+    protocol_entries = []
+    split_times_by_entry = []
+    for participant_data in saved_participants:
+        participant_data['parsing_session'] = session
+        filtered_data = {
+            key: value for key, value in participant_data.items()if key in protocol_fields
+        }
+        if is_athlete_name(participant_data['initials']):
+            filtered_data['athlete_id'] = athlete_ids[get_athlete_key(
+                participant_data['initials'], participant_data['year_of_birth']
+            )]
+
+        split_times_data = get_unique_split_times(participant_data.get('split_times', []))
+        if split_distances:
+            filtered_data['packed_splits'] = pack_splits(split_distances, {
+                split_time['distance']: split_time['split_time']
                 for split_time in split_times_data
-            ]
+            })
+            split_times_data = []
+
+        protocol_entries.append(ProtocolData(**filtered_data))
+        split_times_by_entry.append(split_times_data)
+
+    ProtocolData.objects.bulk_create(protocol_entries)
+    SwimSplitTime.objects.bulk_create([
+        SwimSplitTime(protocol_data=protocol_entry, **split_time)
+        for protocol_entry, split_times_data in zip(protocol_entries, split_times_by_entry)
+        for split_time in split_times_data
+    ])
+
+    session.save(update_fields=['version', 'updated'])
+    update_session_metrics(session)
+
+
+def get_unique_split_times(split_times: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Оставляет по одному отрезку на дистанцию (последний из найденных),
+    как того требует ограничение unique_split_distance.
 
-            SwimSplitTime.objects.bulk_create(split_times)
+    :param split_times: Отрезки вида {'distance': ..., 'split_time': ...}.
+    :return: Отрезки, отсортированные по дистанции.
+    """
+    unique = {split_time['distance']: split_time for split_time in split_times}
+    return [unique[distance] for distance in sorted(unique)]
 
 
 def get_setting_value(setting_name: str) -> Optional[str]:
@@ -1165,3 +907,12 @@ def get_setting_value(setting_name: str) -> Optional[str]:
         return setting.setting_value
     except ParsingSettings.DoesNotExist:
         return None
+
+
+def get_chart_template() -> Dict[str, Any]:
+    """
+    Возвращает шаблон оформления plotly по умолчанию в виде словаря.
+
+    :return: Шаблон оформления диаграмм.
+    """
+    return pio.templates[pio.templates.default].to_plotly_json()
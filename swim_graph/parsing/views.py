@@ -1,27 +1,58 @@
 """parsing Views"""
-from typing import Any, Dict, List
-from django.http import HttpResponse, HttpResponseRedirect
-from django.core.paginator import Paginator
+import uuid
+from typing import Any, Dict, Iterator, Optional
+from django.conf import settings
+from django.db import transaction
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseBadRequest,
+    HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
-
-from . import models, utils
+from django.contrib.admin.views.decorators import staff_member_required
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+)
+from django.utils.http import http_date
+from plotly.io.json import to_json_plotly
+
+from swim_graph_utils.constants import PoolLength, SwimLength
+
+from . import export, models, rollups, tasks, utils
+from .chart_images import IMAGE_FORMATS
 from .forms import UploadFileForm, ReportSetupForm
+from .metrics import ReportMetrics, update_session_metrics
+from .pagination import (
+    KEYSET_ORDERING, CachedCountPaginator,
+    encode_cursor, get_count_cache_key, get_keyset_page
+)
+from .progression import AthleteProgression, get_athlete_races
+from .reports import (
+    CHARTS_MAPPING, REPORT_SECTION_MARKER, REPORT_SECTIONS, SETTINGS_MAPPING,
+    get_active_settings, get_report_participants, get_report_participants_queryset,
+    render_chart_specs, render_report_section
+)
+from .report_cache import (
+    decode_report_payload, get_cached_report_part,
+    get_cached_report_payload, get_report_cache_stats
+)
+from .search import search_sessions
+
+
+# Метка строк таблицы результатов при потоковой отправке
+RESULTS_ROWS_MARKER = '<!--report-results-rows-->'
+
+# Количество участников в одной части таблицы результатов при потоковой отправке
+RESULTS_CHUNK_SIZE = 50
 
+# Количество сессий на странице списка отчетов
+SESSIONS_PER_PAGE = 10
 
-# Переменные для отображения моделей и полей формы
-SETTINGS_MAPPING = {
-    models.StartDistance: 'status_start_distance',
-    models.AverageSpeed: 'status_average_speed',
-    models.NumberCycles: 'status_number_cycles',
-    models.Pace: 'status_pace',
-    models.SpeedDrop: 'status_speed_drop',
-    models.LeaderGap: 'status_leader_gap',
-    models.UnderwaterPart: 'status_underwater_part',
-    models.BestStartReaction: 'status_best_start_reaction',
-    models.BestStartFinishPercentage: 'status_best_start_finish_percentage',
-    models.HeatMap: 'status_heat_map',
-}
+# Количество первых страниц списка, доступных по номеру страницы
+SHALLOW_PAGES = 10
 
 
 def upload_file_view(request) -> HttpResponse:
@@ -62,6 +93,7 @@ def upload_file_view(request) -> HttpResponse:
                 pool_length=parser.parse_results['pool_length'],
             )
             utils.save_parse_data(parser.parse_results, session)
+            schedule_report_prewarm(session.id)
 
             return redirect('report_setup', session_id=session.id)
 
@@ -104,11 +136,19 @@ def report_setup_view(request, session_id: int) -> HttpResponse:
     if request.method == 'POST':
         form = ReportSetupForm(request.POST)
         if form.is_valid():
+            lengths_changed = (
+                session.pool_length != form.cleaned_data['pool_length'] or
+                session.swim_length != form.cleaned_data['swim_length']
+            )
             session.file_name = form.cleaned_data['file_name']
             session.pool_length = form.cleaned_data['pool_length']
             session.swim_length = form.cleaned_data['swim_length']
             session.save()
 
+            # Пересчет показателей при изменении длины бассейна или заплыва
+            if lengths_changed:
+                update_session_metrics(session)
+
             # Сохранение статусов моделей
             for model, form_field in SETTINGS_MAPPING.items():
                 status = form.cleaned_data[form_field]
@@ -145,6 +185,8 @@ def report_setup_view(request, session_id: int) -> HttpResponse:
                             defaults={'status': status}
                         )
 
+            schedule_report_prewarm(session.id)
+
         return redirect('session_results', session_id=session_id)
 
     form = ReportSetupForm(initial=initial_data)
@@ -163,27 +205,57 @@ def sessions_list_view(request) -> HttpResponse:
     """
     Отображает список всех сессий (отчетов) парсинга.
     """
-    reports = models.ParsingSession.objects.all().order_by('-created')
-    search_term = ''
+    search_term = request.GET.get('search', '')
+    pool_length = request.GET.get('pool_length', '')
+    swim_length = request.GET.get('swim_length', '')
 
-    # Поиск по наименованию отчета, длине заплыва и метражу бассейна
-    if 'search' in request.GET:
-        search_term = request.GET['search']
-        reports = (reports.filter(file_name__icontains=search_term) |
-                   reports.filter(swim_length__icontains=search_term) |
-                   reports.filter(pool_length__icontains=search_term))
+    # Поиск по наименованию отчета с фильтрами по длине заплыва и метражу бассейна
+    reports = search_sessions(
+        models.ParsingSession.objects.all(), search_term, pool_length, swim_length
+    )
 
-    # Пагинация
-    paginator = Paginator(reports, 10)
-    page = request.GET.get('page')
-    sessions = paginator.get_page(page)
     get_dict_copy = request.GET.copy()
-    params = get_dict_copy.pop('page', True) and get_dict_copy.urlencode()
+    get_dict_copy.pop('page', None)
+    get_dict_copy.pop('cursor', None)
+    params = get_dict_copy.urlencode()
+
+    # Пагинация: по номерам для первых страниц, далее по курсору (created, id)
+    keyset = reports.query.order_by == KEYSET_ORDERING
+    cursor = request.GET.get('cursor') if keyset else None
+    sessions = page_range = next_cursor = None
+    if cursor:
+        try:
+            sessions = get_keyset_page(reports, cursor, SESSIONS_PER_PAGE)
+        except ValueError:
+            sessions = None
+
+    if sessions is None:
+        paginator = CachedCountPaginator(
+            reports, SESSIONS_PER_PAGE, get_count_cache_key(params)
+        )
+        sessions = paginator.get_page(request.GET.get('page'))
+        page_range = paginator.get_elided_page_range(
+            sessions.number, on_each_side=2, on_ends=1
+        )
+        if keyset:
+            # Дальние страницы открываются по курсору, ссылки на них по номеру не выводятся
+            page_range = [
+                num_page for num_page in page_range
+                if num_page == paginator.ELLIPSIS or num_page <= SHALLOW_PAGES
+            ]
+            if sessions.has_next() and sessions.number >= SHALLOW_PAGES:
+                next_cursor = encode_cursor(sessions[-1])
 
     context = {
         'sessions': sessions,
+        'page_range': page_range,
+        'next_cursor': next_cursor,
         'params': params,
         'search_term': search_term,
+        'pool_length': pool_length,
+        'swim_length': swim_length,
+        'pool_lengths': PoolLength.choices(),
+        'swim_lengths': SwimLength.choices(),
     }
 
     return render(request, 'parsing/reports_list.html', context=context)
@@ -191,105 +263,441 @@ def sessions_list_view(request) -> HttpResponse:
 
 def session_results_view(request, session_id: int) -> HttpResponse:
     """
-    Отображает отчет для указанной сессии.
+    Отображает каркас отчета для указанной сессии.
+    Разделы отчета загружаются отдельно (session_report_section_view),
+    когда они появляются в области просмотра.
+
+    В потоковом режиме (?stream=1 или настройка REPORT_STREAMING) страница
+    отдается целиком через StreamingHttpResponse: начало страницы и каждый
+    раздел отправляются по мере готовности, таблица результатов - частями.
+
+    Страница помечается версией сессии: если отчет не менялся, повторный
+    запрос получает 304 без обращения к кешу и генераторам отчета.
     """
-    num_participants = utils.get_setting_value('Number_participants')
     session = models.ParsingSession.objects.get(id=session_id)
-    protocol_data = models.ProtocolData.objects.filter(
-        parsing_session=session
-    ).order_by('final_position').prefetch_related('swimsplittime_set')
-    protocol_data = list(protocol_data[:num_participants])
+    # Непоказанные сообщения выводятся на странице, поэтому ее нужно отрисовать
+    if not messages.get_messages(request):
+        not_modified = get_not_modified_response(request, session)
+        if not_modified is not None:
+            return not_modified
 
-    active_settings = {}
-    for model, form_field in SETTINGS_MAPPING.items():
-        active_settings[form_field] = model.objects.filter(
-            parsing_session=session, status=True
-        ).exists()
-
-    tables, charts = generate_tables_and_charts(session, protocol_data, active_settings)
+    active_settings = get_cached_report_part(
+        session.id, 'active_settings', lambda: get_active_settings(session)
+    )
 
     context = {
         'session': session,
-        'protocol_data': protocol_data,
         'active_settings': active_settings,
-        'tables': tables,
-        'charts': charts,
     }
 
-    return render(request, 'parsing/report.html', context=context)
-
-
-def generate_tables_and_charts(
-        session: models.ParsingSession,
-        protocol_data: List[models.ProtocolData],
-        active_settings: Dict[str, bool]
-    ) -> Dict[str, Any]:
-    """
-    Генерирует таблицы и диаграммы для сессии.
-    """
-    participants = sorted(protocol_data, key=lambda x: x.start_position)
-    session_tables = utils.TableGenerator(session, participants)
-    session_charts = utils.ChartGenerator(session, participants)
-    tables = {
-        'start_distance_table': (
-            session_tables.generate_start_distance_table()
-            if active_settings.get('status_start_distance') else None
-        ),
-        'average_speed_table': (
-            session_tables.generate_average_speed_table()
-            if active_settings.get('status_average_speed') else None
-        ),
-        'pace_table': (
-            session_tables.generate_pace_table()
-            if active_settings.get('status_pace') and active_settings.get('status_number_cycles')
-            else None
-        ),
-        'speed_drop_table': (
-            session_tables.generate_speed_drop_table()
-            if active_settings.get('status_speed_drop') else None
-        ),
-        'leader_gap_table': (
-            session_tables.generate_leader_gap_table()
-            if active_settings.get('status_leader_gap') else None
-        ),
-        'underwater_part_table': (
-            session_tables.generate_underwater_part_table()
-            if active_settings.get('status_underwater_part') else None
-        ),
-        'start_reaction_table': (
-            session_tables.generate_best_start_reaction_table()
-            if active_settings.get('status_best_start_reaction') else None
-        ),
-        'start_finish_difference_table': (
-            session_tables.generate_start_finish_difference_table()
-            if active_settings.get('status_best_start_finish_percentage') else None
-        ),
+    stream = request.GET.get('stream', '1' if settings.REPORT_STREAMING else '0') == '1'
+    if stream:
+        context['stream'] = True
+        return patch_session_validators(
+            StreamingHttpResponse(iter_report_page(request, session, active_settings, context)),
+            session
+        )
+
+    return patch_session_validators(
+        render(request, 'parsing/report.html', context=context), session
+    )
+
+
+def session_report_section_view(request, session_id: int, section: str) -> HttpResponse:
+    """
+    Возвращает HTML фрагмент раздела отчета.
+    Фрагмент берется из кеша отчета и помечается версией сессии.
+    """
+    session = get_object_or_404(models.ParsingSession, id=session_id)
+    encoding = get_payload_encoding(request)
+    not_modified = get_not_modified_response(request, session, encoding)
+    if not_modified is not None:
+        return not_modified
+
+    section_settings = REPORT_SECTIONS.get(section)
+    if section_settings is None:
+        raise Http404('Раздел отчета не найден')
+
+    active_settings = get_cached_report_part(
+        session.id, 'active_settings', lambda: get_active_settings(session)
+    )
+    if section_settings['setting'] and not active_settings.get(section_settings['setting']):
+        raise Http404('Раздел отчета отключен')
+
+    payload = get_cached_report_payload(
+        session.id, f'section:{section}',
+        lambda: render_report_section(session, section, active_settings)
+    )
+
+    return get_payload_response(session, payload, encoding, 'text/html; charset=utf-8')
+
+
+def session_chart_specs_view(request, session_id: int) -> HttpResponse:
+    """
+    Возвращает JSON описания всех включенных диаграмм отчета одним запросом.
+    Ответ берется из кеша отчета и помечается версией сессии, поэтому повторный
+    запрос без изменений получает 304 без передачи тела и построения диаграмм.
+    """
+    session = get_object_or_404(models.ParsingSession, id=session_id)
+    encoding = get_payload_encoding(request)
+    not_modified = get_not_modified_response(request, session, encoding)
+    if not_modified is not None:
+        return not_modified
+
+    payload = get_cached_report_payload(
+        session.id, 'charts', lambda: render_chart_specs(session)
+    )
+
+    return get_payload_response(session, payload, encoding, 'application/json')
+
+
+def session_chart_image_view(
+        request, session_id: int, chart_name: str, image_format: str
+    ) -> HttpResponse:
+    """
+    Возвращает статическое изображение диаграммы отчета (PNG или SVG).
+    """
+    session = get_object_or_404(models.ParsingSession, id=session_id)
+    if chart_name not in CHARTS_MAPPING or image_format not in IMAGE_FORMATS:
+        raise Http404('Диаграмма не найдена')
+    not_modified = get_not_modified_response(request, session)
+    if not_modified is not None:
+        return not_modified
+
+    active_settings = get_cached_report_part(
+        session.id, 'active_settings', lambda: get_active_settings(session)
+    )
+    if not active_settings.get(CHARTS_MAPPING[chart_name]):
+        raise Http404('Диаграмма отключена')
+
+    participants = sorted(
+        get_report_participants(session, with_splits=False), key=lambda x: x.start_position
+    )
+    session_metrics = ReportMetrics.for_report(session, participants)
+    session_charts = utils.ChartGenerator(session, participants, session_metrics)
+    image = session_charts.generate_chart_images([chart_name], image_format)[chart_name]
+
+    response = HttpResponse(image, content_type=IMAGE_FORMATS[image_format])
+    response['Content-Disposition'] = f'inline; filename="{chart_name}.{image_format}"'
+    return patch_session_validators(response, session)
+
+
+def get_payload_response(
+        session: models.ParsingSession, payload: Dict[str, Any],
+        encoding: Optional[str], content_type: str
+    ) -> HttpResponse:
+    """
+    Формирует ответ из закешированного тела части отчета.
+    Сжатое тело отдается клиентам, принимающим gzip, без повторного сжатия.
+
+    :param session: Сессия парсинга.
+    :param payload: Тело ответа из кеша отчета.
+    :param encoding: Кодировка ответа (см. get_payload_encoding).
+    :param content_type: Тип содержимого ответа.
+    :return: Ответ.
+    """
+    response = HttpResponse(decode_report_payload(payload, encoding), content_type=content_type)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return patch_session_validators(response, session, encoding)
+
+
+def get_payload_encoding(request) -> Optional[str]:
+    """
+    Возвращает кодировку, в которой клиенту отдается тело части отчета.
+
+    :param request: Запрос.
+    :return: gzip, если тела хранятся сжатыми и клиент принимает gzip, иначе None.
+    """
+    if settings.REPORT_CACHE_GZIP and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        return 'gzip'
+    return None
+
+
+def get_session_etag(session: models.ParsingSession, variant: Optional[str] = None) -> str:
+    """
+    Возвращает сильный ETag ответа по версии сессии.
+
+    :param session: Сессия парсинга.
+    :param variant: Вариант представления ответа (например, кодировка тела).
+    :return: ETag в кавычках.
+    """
+    return quote_etag(f'{session.etag}-{variant}' if variant else session.etag)
+
+
+def get_not_modified_response(
+        request, session: models.ParsingSession, variant: Optional[str] = None
+    ) -> Optional[HttpResponse]:
+    """
+    Проверяет условные заголовки запроса (If-None-Match, If-Modified-Since)
+    по версии и дате изменения сессии. Не обращается к базе данных и кешу.
+
+    :param request: Запрос.
+    :param session: Сессия парсинга.
+    :param variant: Вариант представления ответа (см. get_session_etag).
+    :return: Ответ 304, если отчет не менялся, иначе None.
+    """
+    response = get_conditional_response(
+        request,
+        etag=get_session_etag(session, variant),
+        last_modified=int(session.updated.timestamp()),
+    )
+    if response is None:
+        return None
+    return patch_session_validators(response, session, variant)
+
+
+def patch_session_validators(
+        response: HttpResponse, session: models.ParsingSession, variant: Optional[str] = None
+    ) -> HttpResponse:
+    """
+    Добавляет к ответу ETag, Last-Modified и Cache-Control: браузер хранит
+    ответ, но перед использованием проверяет его условным запросом.
+    Части отчета отдаются сжатыми или нет в зависимости от Accept-Encoding.
+
+    :param response: Ответ.
+    :param session: Сессия парсинга.
+    :param variant: Вариант представления ответа (см. get_session_etag).
+    :return: Ответ.
+    """
+    response.headers['ETag'] = get_session_etag(session, variant)
+    response.headers['Last-Modified'] = http_date(session.updated.timestamp())
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@staff_member_required
+def report_cache_stats_view(request) -> JsonResponse:
+    """
+    Возвращает статистику обращений к кешу отчетов.
+    """
+    return JsonResponse(get_report_cache_stats())
+
+
+@staff_member_required
+@require_POST
+def reports_export_view(request) -> JsonResponse:
+    """
+    Запускает выгрузку отчетов выбранных сессий (параметры session и format) в фоне.
+    Возвращает идентификатор выгрузки и адрес проверки ее статуса.
+    Выгрузка доступна персоналу и ограничена EXPORT_MAX_SESSIONS сессиями.
+    Без брокера Celery (CELERY_TASK_ALWAYS_EAGER) архив строится в этом запросе.
+    """
+    export_format = request.POST.get('format', export.EXPORT_HTML)
+    session_ids = export.get_export_session_ids([
+        int(session_id) for session_id in request.POST.getlist('session')
+        if session_id.isdigit()
+    ])
+    if export_format not in export.EXPORT_FORMATS or not session_ids:
+        return HttpResponseBadRequest('Не выбраны сессии или формат выгрузки')
+    if len(session_ids) > settings.EXPORT_MAX_SESSIONS:
+        return HttpResponseBadRequest(
+            f'В одной выгрузке не больше {settings.EXPORT_MAX_SESSIONS} сессий'
+        )
+
+    export_id = uuid.uuid4().hex
+    tasks.set_export_status(export_id, {'status': tasks.EXPORT_PENDING})
+    tasks.export_reports_task.delay(export_id, session_ids, export_format)
+
+    return JsonResponse({
+        'id': export_id,
+        'status_url': reverse('reports_export_status', args=[export_id]),
+    }, status=202)
+
+
+@staff_member_required
+def reports_export_status_view(request, export_id: str) -> JsonResponse:
+    """
+    Возвращает статус выгрузки отчетов и адрес архива, когда он готов.
+    """
+    status = tasks.get_export_status(export_id)
+    if status is None:
+        raise Http404('Выгрузка не найдена')
+
+    if status['status'] == tasks.EXPORT_DONE:
+        status = {**status, 'download_url': reverse('reports_export_download', args=[export_id])}
+    return JsonResponse(status)
+
+
+@staff_member_required
+def reports_export_download_view(request, export_id: str) -> FileResponse:
+    """
+    Отдает архив выгрузки отчетов.
+    """
+    status = tasks.get_export_status(export_id)
+    if status is None or status['status'] != tasks.EXPORT_DONE:
+        raise Http404('Выгрузка не найдена')
+
+    return FileResponse(
+        open(tasks.get_export_path(export_id), 'rb'),  # pylint: disable=consider-using-with
+        as_attachment=True,
+        filename='reports.zip'
+    )
+
+
+def athlete_progression_view(request, athlete_id: int) -> HttpResponse:
+    """
+    Отображает динамику результатов спортсмена по всем сессиям (или за сезон ?season=).
+    Описания диаграмм встраиваются в страницу, поэтому заплывы запрашиваются один раз.
+    """
+    athlete = get_object_or_404(models.Athlete, id=athlete_id)
+    season = request.GET.get('season', '')
+    season = int(season) if season.isdigit() else None
+    progression = get_athlete_progression(athlete, season)
+
+    seasons = models.ProtocolData.objects.filter(athlete=athlete).dates(
+        'parsing_session__created', 'year', order='DESC'
+    )
+    data_url = reverse('athlete_progression_data', args=[athlete.id])
+    context = {
+        'athlete': athlete,
+        'season': season,
+        'seasons': [date.year for date in seasons],
+        'races': progression['races'],
+        'chart_specs': to_json_plotly({
+            key: progression[key] for key in ('config', 'template', 'charts')
+        }).replace('</', '<\\/'),
+        'data_url': f'{data_url}?season={season}' if season else data_url,
     }
-    charts = {
-        'average_speed_chart': (
-            session_charts.generate_average_speed_chart()
-            if active_settings.get('status_average_speed') else None
-        ),
-        'number_cycles_chart': (
-            session_charts.generate_number_cycles_chart()
-            if active_settings.get('status_number_cycles') else None
-        ),
-        'underwater_part_chart': (
-            session_charts.generate_underwater_part_chart()
-            if active_settings.get('status_underwater_part') else None
-        ),
-        'start_reaction_chart': (
-            session_charts.generate_best_start_reaction_chart()
-            if active_settings.get('status_best_start_reaction') else None
-        ),
-        'start_finish_difference_chart': (
-            session_charts.generate_start_finish_difference_chart()
-            if active_settings.get('status_best_start_finish_percentage') else None
-        ),
-        'heat_map_chart': (
-            session_charts.generate_heat_map_chart()
-            if active_settings.get('status_heat_map') else None
-        ),
+    return render(request, 'parsing/athlete_progression.html', context=context)
+
+
+def athlete_progression_data_view(request, athlete_id: int) -> JsonResponse:
+    """
+    Возвращает JSON с заплывами спортсмена, рядами показателей и описаниями диаграмм.
+    """
+    athlete = get_object_or_404(models.Athlete, id=athlete_id)
+    season = request.GET.get('season', '')
+    progression = get_athlete_progression(athlete, int(season) if season.isdigit() else None)
+    return HttpResponse(to_json_plotly(progression), content_type='application/json')
+
+
+def statistics_view(request) -> HttpResponse:
+    """
+    Отображает сводные показатели за сезон: результаты и стартовую реакцию по заплывам,
+    а для выбранного заплыва - время на промежуточных дистанциях.
+    Группировка по году рождения или категории финала (?group=).
+    """
+    filters = rollups.get_statistics_filters()
+    season = request.GET.get('season', '')
+    if season.isdigit():
+        season = int(season)
+    else:
+        season = filters['seasons'][0] if filters['seasons'] else None
+    group_by = request.GET.get('group')
+    if group_by not in rollups.STATISTICS_GROUPS:
+        group_by = 'year_of_birth'
+    pool_length = request.GET.get('pool_length')
+    if pool_length not in filters['pool_lengths']:
+        pool_length = None
+    swim_length = request.GET.get('swim_length')
+    if swim_length not in filters['swim_lengths']:
+        swim_length = None
+
+    context = {
+        **filters,
+        'season': season,
+        'group_by': group_by,
+        'group_title': rollups.STATISTICS_GROUPS[group_by],
+        'groups': rollups.STATISTICS_GROUPS,
+        'pool_length': pool_length,
+        'swim_length': swim_length,
+        'results': [],
     }
+    if season:
+        context['results'] = rollups.get_result_statistics(
+            season, group_by, pool_length, swim_length
+        )
+    if season and pool_length and swim_length:
+        context['split_distances'], context['split_rows'] = rollups.get_split_statistics(
+            season, group_by, pool_length, swim_length
+        )
+    return render(request, 'parsing/statistics.html', context=context)
+
+
+def get_athlete_progression(athlete: models.Athlete, season: Optional[int]) -> Dict[str, Any]:
+    """
+    Возвращает заплывы спортсмена, ряды показателей и описания диаграмм.
+
+    :param athlete: Спортсмен.
+    :param season: Год сессий (None - все сессии).
+    :return: Словарь для JSON (AthleteProgression.to_dict).
+    """
+    return AthleteProgression(athlete, get_athlete_races(athlete, season)).to_dict()
+
 
-    return tables, charts
+def schedule_report_prewarm(session_id: int) -> None:
+    """
+    Ставит построение кеша отчета в очередь после фиксации транзакции
+    (настройка REPORT_PREWARM).
+
+    :param session_id: Идентификатор сессии парсинга.
+    """
+    if settings.REPORT_PREWARM:
+        transaction.on_commit(lambda: tasks.prewarm_report_task.delay(session_id))
+
+
+def iter_report_page(
+        request, session: models.ParsingSession,
+        active_settings: Dict[str, bool], context: Dict[str, Any]
+    ) -> Iterator[str]:
+    """
+    Последовательно выдает части страницы отчета для потоковой отправки.
+    Каркас страницы рендерится один раз с метками на месте разделов,
+    разделы подставляются по мере построения (из кеша отчета),
+    таблица результатов выдается частями.
+
+    :param request: Запрос.
+    :param session: Сессия парсинга.
+    :param active_settings: Включенные разделы отчета.
+    :param context: Контекст шаблона отчета.
+    :return: Итератор частей HTML кода страницы.
+    """
+    page = render_to_string('parsing/report.html', context, request=request)
+    parts = REPORT_SECTION_MARKER.split(page)
+
+    yield parts[0]
+    for section, text in zip(parts[1::2], parts[2::2]):
+        yield '<div class="report-section">'
+        if section == 'results':
+            yield from iter_results_section(session)
+        else:
+            payload = get_cached_report_payload(
+                session.id, f'section:{section}',
+                lambda section=section: render_report_section(session, section, active_settings)
+            )
+            yield decode_report_payload(payload).decode()
+        yield '</div>'
+        yield text
+
+
+def iter_results_section(session: models.ParsingSession) -> Iterator[str]:
+    """
+    Последовательно выдает HTML код таблицы результатов заплыва.
+    Участники читаются из базы данных частями по RESULTS_CHUNK_SIZE,
+    поэтому память на запрос не зависит от количества участников.
+
+    :param session: Сессия парсинга.
+    :return: Итератор частей HTML кода таблицы.
+    """
+    participants = get_report_participants_queryset(session).iterator(
+        chunk_size=RESULTS_CHUNK_SIZE
+    )
+    first_participant = next(participants, None)
+    chunk = [first_participant] if first_participant else []
+
+    table = render_to_string(
+        'parsing/report_results.html', {'protocol_data': chunk, 'stream': True}
+    )
+    head, tail = table.split(RESULTS_ROWS_MARKER)
+
+    yield head
+    for participant in participants:
+        chunk.append(participant)
+        if len(chunk) == RESULTS_CHUNK_SIZE:
+            yield render_to_string('parsing/report_results_rows.html', {'protocol_data': chunk})
+            chunk = []
+    if chunk:
+        yield render_to_string('parsing/report_results_rows.html', {'protocol_data': chunk})
+    yield tail
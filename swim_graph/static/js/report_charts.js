@@ -0,0 +1,52 @@
+(function() {
+    const chartSpecsUrl = document.currentScript.dataset.url;
+    let chartSpecs = null;
+
+    function loadChartSpecs() {
+        // Выгруженный отчет содержит описания диаграмм в самой странице
+        const inlineSpecs = document.getElementById('report-chart-specs');
+        if (!chartSpecs && inlineSpecs) {
+            chartSpecs = Promise.resolve(JSON.parse(inlineSpecs.textContent));
+        }
+        if (!chartSpecs) {
+            chartSpecs = fetch(chartSpecsUrl, {headers: {'Accept': 'application/json'}})
+                .then(function(response) {
+                    if (!response.ok) {
+                        throw new Error(response.statusText);
+                    }
+                    return response.json();
+                })
+                .catch(function(error) {
+                    // Следующий вызов (например, для загруженного позже раздела) повторит запрос
+                    chartSpecs = null;
+                    throw error;
+                });
+        }
+        return chartSpecs;
+    }
+
+    window.renderReportCharts = function(root) {
+        const chartContainers = root.querySelectorAll('[data-chart]');
+        if (!chartContainers.length) {
+            return;
+        }
+
+        loadChartSpecs().then(function(specs) {
+            const config = Object.assign({responsive: true}, specs.config);
+
+            chartContainers.forEach(function(container) {
+                const chart = specs.charts[container.dataset.chart];
+                if (!chart) {
+                    return;
+                }
+
+                const layout = Object.assign({template: specs.template}, chart.layout);
+                Plotly.newPlot(container, chart.data, layout, config);
+            });
+        }).catch(function() {
+            chartContainers.forEach(function(container) {
+                container.innerHTML = '<div class="text-center text-danger">Не удалось загрузить диаграмму</div>';
+            });
+        });
+    };
+})();
@@ -0,0 +1,43 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const reportSections = document.querySelectorAll('.report-section[data-url]');
+
+    // Разделы, полученные вместе со страницей (потоковый режим), уже содержат HTML код
+    document.querySelectorAll('.report-section:not([data-url])').forEach(function(section) {
+        window.renderReportCharts(section);
+    });
+
+    function loadSection(section) {
+        fetch(section.dataset.url)
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(function(html) {
+                section.innerHTML = html;
+                window.renderReportCharts(section);
+            })
+            .catch(function() {
+                section.innerHTML = '<div class="card-body text-center text-danger">Не удалось загрузить раздел</div>';
+            });
+    }
+
+    if (!('IntersectionObserver' in window)) {
+        reportSections.forEach(loadSection);
+        return;
+    }
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(function(entry) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadSection(entry.target);
+            }
+        });
+    }, {rootMargin: '200px 0px'});
+
+    reportSections.forEach(function(section) {
+        observer.observe(section);
+    });
+});
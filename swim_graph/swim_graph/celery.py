@@ -0,0 +1,11 @@
+"""swim_graph Celery"""
+import os
+
+from celery import Celery
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'swim_graph.settings')
+
+app = Celery('swim_graph')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -33,7 +33,9 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
+    'django_celery_beat',
     'swim_graph',
     'parsing',
 ]
@@ -80,6 +82,89 @@ DATABASES = {
     }
 }
 
+# Cache
+# Без REDIS_URL используется память процесса: кеш не общий для нескольких процессов
+REDIS_URL = env('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Report cache
+REPORT_CACHE_TIMEOUT = env.int('REPORT_CACHE_TIMEOUT', default=60 * 60 * 24)
+REPORT_CACHE_GZIP = env.bool('REPORT_CACHE_GZIP', default=True)
+
+# Report cache single-flight: одновременные запросы части отчета ждут первый (сек),
+# блокировка построения снимается по истечении таймаута (сек)
+REPORT_BUILD_WAIT = env.int('REPORT_BUILD_WAIT', default=10)
+REPORT_BUILD_LOCK_TIMEOUT = env.int('REPORT_BUILD_LOCK_TIMEOUT', default=60)
+
+# Report prewarm: строить кеш отчета в фоне после загрузки и сохранения настроек
+REPORT_PREWARM = env.bool('REPORT_PREWARM', default=True)
+
+# Report streaming: отдавать страницу отчета целиком по мере построения разделов
+REPORT_STREAMING = env.bool('REPORT_STREAMING', default=False)
+
+# Report sections executor: serial, thread or process
+# Разделы строятся за доли миллисекунды, поэтому по замерам быстрее всего serial
+REPORT_EXECUTOR = env('REPORT_EXECUTOR', default='serial')
+REPORT_EXECUTOR_WORKERS = env.int('REPORT_EXECUTOR_WORKERS', default=4)
+
+# Celery: фоновые задачи (выгрузка отчетов)
+# Без брокера задачи выполняются сразу в текущем процессе
+CELERY_BROKER_URL = env('CELERY_BROKER_URL', default=REDIS_URL)
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=not CELERY_BROKER_URL)
+CELERY_TASK_IGNORE_RESULT = True
+
+# Celery beat: расписание хранится в базе данных (django-celery-beat),
+# задачи из CELERY_BEAT_SCHEDULE добавляются в него при запуске beat
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    'refresh-statistics': {
+        'task': 'parsing.tasks.refresh_statistics_task',
+        'schedule': env.int('STATISTICS_REFRESH_INTERVAL', default=15 * 60),
+    },
+    'cleanup-exports': {
+        'task': 'parsing.tasks.cleanup_exports_task',
+        'schedule': 60 * 60,
+    },
+}
+
+# Report export: время хранения архива и его статуса (сек),
+# наибольшее количество сессий в одной выгрузке, запущенной из веб-интерфейса
+EXPORT_TTL = env.int('EXPORT_TTL', default=60 * 60 * 24)
+EXPORT_MAX_SESSIONS = env.int('EXPORT_MAX_SESSIONS', default=50)
+
+# Statistics: сессии моложе задержки (сек) не попадают в сводные показатели,
+# пока не завершится загрузка протоколов
+STATISTICS_REFRESH_DELAY = env.int('STATISTICS_REFRESH_DELAY', default=5 * 60)
+
+# Chart images: количество процессов отрисовки PNG/SVG (1 - в текущем процессе)
+CHART_IMAGE_WORKERS = env.int('CHART_IMAGE_WORKERS', default=4)
+
+# Packed splits: хранить отрезки новых загрузок в ProtocolData.packed_splits вместо SwimSplitTime
+PACKED_SPLITS = env.bool('PACKED_SPLITS', default=False)
+
+# REST API: только чтение, без аутентификации, версия в пути (/api/v1/)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'UNAUTHENTICATED_USER': None,
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    'ALLOWED_VERSIONS': ['v1'],
+    'DEFAULT_VERSION': 'v1',
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -110,7 +195,15 @@ USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
-STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATICFILES_DIRS = [
+    os.path.join(BASE_DIR, 'static'),
+]
+# plotly.min.js публикуется из пакета plotly отдельным поиском (остальные файлы пакета не нужны)
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'parsing.finders.PlotlyFinder',
+]
 
 # Media files
 MEDIA_URL = '/media/'
@@ -1,6 +1,6 @@
 """swim_graph URL Configuration"""
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from .views import home_view
 
 
@@ -8,4 +8,5 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home_view, name='home'),
     path('parsing/', include('parsing.urls')),
+    re_path(r'^api/(?P<version>v1)/', include('parsing.api_urls')),
 ]
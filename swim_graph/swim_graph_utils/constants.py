@@ -76,3 +76,9 @@ INTERMEDIATE_SWIM_LENGTHS = (
     '375m',
     '400m',
 )
+
+CHART_CONFIG = {
+    'displayModeBar': False,
+    'displaylogo': False,
+    'modeBarButtonsToAdd': ['toImage', 'zoomIn2d', 'zoomOut2d', 'autoScale2d']
+}
@@ -0,0 +1,65 @@
+"""swim_graph Time Utilities"""
+import logging
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Количество сотых долей секунды в секунде: время хранится в сотых долях
+CENTISECONDS = 100
+
+
+def parse_centiseconds(time_str: str) -> Optional[int]:
+    """
+    Преобразует строку времени в количество сотых долей секунды.
+    Дробная часть читается как десятичная дробь секунды: "27.5" - 27.50 сек,
+    "27.05" - 27.05 сек, знаки после второго отбрасываются. Прежний parse_time
+    считал одну цифру сотыми ("27.5" - 27.05 сек); в протоколах дробная часть
+    всегда из двух цифр, поэтому результаты разбора протоколов не изменились.
+
+    :param time_str: строка времени в форматах hour:minute:second.centisecond,
+        minute:second.centisecond или second.centisecond.
+    :return: время в сотых долях секунды.
+    """
+    try:
+        *parts, rest = time_str.split(':')
+        if len(parts) > 2:
+            raise ValueError('слишком много разделителей')
+        second, centisecond = rest.split('.')
+        hour, minute = ([0, 0] + [int(part) for part in parts])[-2:]
+
+        return (
+            ((hour * 60 + minute) * 60 + int(second)) * CENTISECONDS
+            + int(centisecond.ljust(2, '0')[:2])
+        )
+    except ValueError as error:
+        logger.warning('Ошибка при преобразовании значения времени: %s, %s', error, time_str)
+        return None
+
+
+def to_seconds(centiseconds: Optional[int]) -> Optional[float]:
+    """
+    Переводит время в сотых долях секунды в секунды.
+
+    :param centiseconds: Время в сотых долях секунды.
+    :return: Время в секундах или None.
+    """
+    if centiseconds is None:
+        return None
+    return centiseconds / CENTISECONDS
+
+
+def format_centiseconds(centiseconds: int) -> str:
+    """
+    Форматирует время в сотых долях секунды как minute:second.centisecond,
+    а время от часа - как hour:minute:second.centisecond.
+
+    :param centiseconds: Время в сотых долях секунды.
+    :return: Строка времени.
+    """
+    seconds, centisecond = divmod(int(centiseconds), CENTISECONDS)
+    minutes, second = divmod(seconds, 60)
+    hours, minute = divmod(minutes, 60)
+    if hours:
+        return f'{hours}:{minute:02d}:{second:02d}.{centisecond:02d}'
+    return f'{minute:02d}:{second:02d}.{centisecond:02d}'